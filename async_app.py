@@ -0,0 +1,349 @@
+# async_app.py - asyncio HTTP front end sharing RecipeHandler's pages
+import asyncio
+import html
+import json
+import os
+import signal
+import urllib.parse
+from http import HTTPStatus
+from typing import AsyncIterator, Dict, Optional, Tuple, Union
+
+from recipe_export import json_default
+from recipe_manager import AsyncRecipeManager
+from simple_app import SIMILAR_RECIPES, RecipeHandler
+
+# (status, headers, body) - body is bytes, or an async iterator of bytes for streamed responses
+Response = Tuple[int, Dict[str, str], Union[bytes, AsyncIterator[bytes]]]
+
+MAX_REQUEST_LINE = 8192
+MAX_HEADERS = 100
+
+class BadRequest(Exception):
+    """❌ Malformed HTTP request, answered with `status` before the connection is closed"""
+    
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+def html_response(page: str, status: int = 200) -> Response:
+    """📄 Build an HTML response"""
+    return status, {'Content-Type': 'text/html; charset=utf-8'}, page.encode('utf-8')
+
+def json_response(payload, status: int = 200) -> Response:
+    """📤 Build a JSON response"""
+    return status, {'Content-Type': 'application/json'}, json.dumps(payload, default=json_default).encode('utf-8')
+
+def redirect_response(location: str) -> Response:
+    """↪️ Build a 302 redirect"""
+    return 302, {'Location': location}, b''
+
+def error_response(status: int, message: Optional[str] = None) -> Response:
+    """🚫 Build an error page in the same format as BaseHTTPRequestHandler.send_error"""
+    phrase = HTTPStatus(status).phrase
+    body = RecipeHandler.error_message_format % {
+        'code': status,
+        'message': html.escape(message or phrase, quote=False),
+        'explain': html.escape(HTTPStatus(status).description, quote=False)
+    }
+    return status, {'Content-Type': RecipeHandler.error_content_type}, body.encode('utf-8', 'replace')
+
+class AsyncRecipeApp:
+    """
+    ⚡ asyncio request router over stream connections
+    
+    Serves the same routes and pages as RecipeHandler. Idle keep-alive connections
+    are just parked coroutines, so thousands of them cost no OS threads.
+    """
+    
+    def __init__(self, manager: Optional[AsyncRecipeManager] = None, idle_timeout: float = 15.0):
+        self.manager = manager or AsyncRecipeManager()
+        self.idle_timeout = idle_timeout
+        self._connections: Dict[asyncio.Task, bool] = {}  # task -> busy handling a request
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """🔁 Serve requests on one connection until it closes or goes idle"""
+        task = asyncio.current_task()
+        self._connections[task] = False
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                
+                self._connections[task] = True
+                try:
+                    method, version, keep_alive, response = await self._handle_request(request_line, reader)
+                except BadRequest as e:
+                    method, version, keep_alive, response = 'GET', 'HTTP/1.1', False, error_response(e.status, str(e))
+                
+                if isinstance(response[2], bytes):
+                    self._write_response(writer, method, response, keep_alive)
+                    await writer.drain()
+                else:
+                    keep_alive = await self._write_stream(writer, method, response, keep_alive,
+                                                          chunked=version == 'HTTP/1.1')
+                self._connections[task] = False
+                
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    
+    async def _handle_request(self, request_line: bytes, reader: asyncio.StreamReader):
+        """📥 Parse one request and dispatch it"""
+        if len(request_line) > MAX_REQUEST_LINE:
+            raise BadRequest("Request line too long")
+        
+        parts = request_line.decode('iso-8859-1').rstrip('\r\n').split()
+        if len(parts) != 3:
+            raise BadRequest(f"Bad request syntax ({request_line!r})")
+        method, path, version = parts
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise BadRequest("Too many headers")
+            name, _, value = line.decode('iso-8859-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        if 'transfer-encoding' in headers:
+            # Chunked bodies are not supported; the body cannot be skipped, so the connection closes
+            if 'content-length' not in headers:
+                raise BadRequest("Content-Length required", 411)
+            raise BadRequest("Transfer-Encoding is not supported")
+        try:
+            content_length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise BadRequest("Bad Content-Length")
+        if content_length < 0:
+            raise BadRequest("Bad Content-Length")
+        body = await reader.readexactly(content_length) if content_length else b''
+        
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.1':
+            keep_alive = connection != 'close'
+        else:
+            keep_alive = connection == 'keep-alive'
+        
+        try:
+            response = await self.dispatch(method, path, body)
+        except Exception as e:
+            response = error_response(500, f"Error handling request: {str(e)}")
+        return method, version, keep_alive, response
+    
+    @staticmethod
+    def _head(status: int, headers: Dict[str, str], keep_alive: bool) -> bytes:
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        for name, value in headers.items():
+            lines.append(f"{name}: {value}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1', 'replace')
+    
+    def _write_response(self, writer: asyncio.StreamWriter, method: str, response: Response, keep_alive: bool):
+        status, headers, body = response
+        head = self._head(status, {**headers, 'Content-Length': str(len(body))}, keep_alive)
+        writer.write(head if method == 'HEAD' else head + body)
+    
+    async def _write_stream(self, writer: asyncio.StreamWriter, method: str, response: Response,
+                            keep_alive: bool, chunked: bool) -> bool:
+        """🌊 Write a streamed body; returns whether the connection can be kept alive"""
+        status, headers, body = response
+        if chunked:
+            headers = {**headers, 'Transfer-Encoding': 'chunked'}
+        else:
+            keep_alive = False  # HTTP/1.0: the body ends when the connection closes
+        writer.write(self._head(status, headers, keep_alive))
+        if method == 'HEAD':
+            await writer.drain()
+            return keep_alive
+        
+        try:
+            async for chunk in body:
+                writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk) if chunked else chunk)
+                await writer.drain()
+            if chunked:
+                writer.write(b'0\r\n\r\n')
+            await writer.drain()
+        except ConnectionError:
+            raise
+        except Exception as e:
+            # Headers are gone already: drop the connection so the client sees a truncated body
+            print(f"❌ Error streaming export: {e}")
+            return False
+        return keep_alive
+    
+    async def dispatch(self, method: str, path: str, body: bytes) -> Response:
+        """🧭 Route a request - mirrors RecipeHandler.do_GET / do_POST"""
+        url = urllib.parse.urlsplit(path)
+        path = url.path
+        
+        if method in ('GET', 'HEAD'):
+            try:
+                if path in ('/recipes', '/favorites') or path.startswith('/filter/'):
+                    page_size, cursor = RecipeHandler.parse_page_params(urllib.parse.parse_qs(url.query))
+                
+                if path == '/recipes':
+                    recipes = await self.manager.get_all_recipes_page(page_size, cursor, summary=True)
+                    return html_response(RecipeHandler.render_recipes_page(recipes))
+                elif path == '/favorites':
+                    favorites = await self.manager.get_favorite_recipes_page(page_size, cursor, summary=True)
+                    return html_response(RecipeHandler.render_favorites_page(favorites))
+                elif path.startswith('/filter/'):
+                    status = path.split('/')[-1]
+                    recipes = await self.manager.get_recipes_by_status_page(status, page_size, cursor, summary=True)
+                    return html_response(RecipeHandler.render_filtered_page(status, recipes))
+            except ValueError as e:
+                return error_response(400, str(e))
+            
+            if path == '/':
+                return html_response(RecipeHandler.render_homepage())
+            elif path.startswith('/recipe/'):
+                recipe_id = path.split('/')[-1]
+                recipe, similar = await asyncio.gather(self.manager.get_recipe_by_id(recipe_id),
+                                                       self.manager.similar_recipes(recipe_id, k=SIMILAR_RECIPES))
+                if not recipe:
+                    return error_response(404, "Recipe not found")
+                return html_response(RecipeHandler.render_recipe_detail(recipe, similar))
+            elif path == '/stats':
+                stats = await self.manager.get_recipe_stats()
+                return html_response(RecipeHandler.render_stats_page(stats))
+            elif path == '/api/cache':
+                return json_response(await self.manager.get_cache_stats())
+            elif path in ('/pantry', '/api/pantry'):
+                try:
+                    pantry, k, min_coverage, assume_staples = RecipeHandler.parse_pantry_params(
+                        urllib.parse.parse_qs(url.query))
+                except ValueError as e:
+                    return error_response(400, str(e))
+                matches = await self.manager.find_by_pantry(pantry, k, min_coverage, assume_staples) if pantry else []
+                if path == '/api/pantry':
+                    return json_response(RecipeHandler.pantry_payload(pantry, matches), 503 if matches is None else 200)
+                return html_response(RecipeHandler.render_pantry_page(pantry, matches))
+            elif path == '/export':
+                try:
+                    format_type, batch_size, compress = RecipeHandler.parse_export_params(
+                        urllib.parse.parse_qs(url.query))
+                    chunks = await self.manager.stream_export(format_type, batch_size, compress)
+                except ValueError as e:
+                    return error_response(400, str(e))
+                return 200, RecipeHandler.export_headers(format_type, compress), self.manager.iterate(chunks)
+            return error_response(404)
+        
+        if method == 'POST':
+            post_data = body.decode('utf-8')
+            if path == '/add_recipe':
+                try:
+                    recipe = RecipeHandler.parse_recipe_form(post_data)
+                    await self.manager.add_recipe(recipe)
+                except Exception as e:
+                    return error_response(500, f"Error adding recipe: {str(e)}")
+                return redirect_response('/recipes')
+            elif path.startswith('/delete/'):
+                if await self.manager.delete_recipe(path.split('/')[-1]):
+                    return json_response({"success": True})
+                return error_response(404, "Recipe not found")
+            elif path.startswith('/toggle_favorite/'):
+                updated = await self.manager.toggle_favorite(path.split('/')[-1])
+                if updated:
+                    return json_response({"success": True, **updated})
+                return error_response(404, "Recipe not found")
+            elif path == '/update_status':
+                data = urllib.parse.parse_qs(post_data)
+                try:
+                    recipe_id, new_status = data['recipe_id'][0], data['status'][0]
+                except KeyError as e:
+                    return error_response(500, f"Error updating status: {str(e)}")
+                updated = await self.manager.update_recipe_status(recipe_id, new_status)
+                if updated:
+                    return json_response({"success": True, **updated})
+                return error_response(400, "Failed to update status")
+            elif path == '/search':
+                query = urllib.parse.parse_qs(post_data).get('search_query', [''])[0]
+                if not query:
+                    return redirect_response('/')
+                results = await self.manager.search_recipes(query, summary=True)
+                return html_response(RecipeHandler.render_search_results(query, results))
+            elif path == '/api/batch':
+                try:
+                    results = await self.manager.apply_batch(RecipeHandler.parse_batch(post_data))
+                except ValueError as e:
+                    return json_response({"success": False, "error": str(e)}, 400)
+                except Exception as e:
+                    return error_response(500, f"Error applying batch: {str(e)}")
+                return json_response({"success": all(result['ok'] for result in results), "results": results})
+            return error_response(404)
+        
+        return error_response(501, f"Unsupported method ({method!r})")
+    
+    async def drain(self, timeout: float = 10.0):
+        """🚰 Close idle connections and wait for in-flight requests to finish"""
+        for task, busy in list(self._connections.items()):
+            if not busy:
+                task.cancel()
+        pending = list(self._connections)
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+
+async def serve(host: str, port: int, app: Optional[AsyncRecipeApp] = None):
+    """🚀 Serve until SIGINT/SIGTERM, then drain gracefully"""
+    app = app or AsyncRecipeApp()
+    server = await asyncio.start_server(app.handle_connection, host, port, reuse_address=True)
+    watcher = app.manager.manager.watch_changes()
+    # 🔎 Build the full-text index now rather than inside the first search
+    app.manager.manager.start_search_index_build()
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows - Ctrl+C raises KeyboardInterrupt instead
+    
+    async with server:
+        await stop.wait()
+        server.close()
+        await app.drain()
+    
+    if watcher:
+        watcher.stop()
+    await loop.run_in_executor(None, app.manager.close)
+
+def run_async_server(host=None, port=None, idle_timeout=None):
+    """
+    ⚡ Start the asyncio web server
+    
+    Args:
+        host: Interface to bind (default localhost)
+        port: Port to bind (default 8080)
+        idle_timeout: Seconds before an idle keep-alive connection is closed
+    """
+    host = host or os.getenv('SERVER_HOST', 'localhost')
+    port = int(port or os.getenv('SERVER_PORT', '8080'))
+    idle_timeout = float(idle_timeout or os.getenv('SERVER_IDLE_TIMEOUT', '15'))
+    
+    print("🍳 Starting Recipe Management Web Server...")
+    print(f"🌐 Server running at: http://{host}:{port}")
+    print("⚡ asyncio mode - press Ctrl+C to stop the server")
+    
+    try:
+        asyncio.run(serve(host, port, AsyncRecipeApp(idle_timeout=idle_timeout)))
+    except KeyboardInterrupt:
+        pass
+    print("\n👋 Server stopped!")
+
+if __name__ == "__main__":
+    run_async_server()
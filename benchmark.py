@@ -0,0 +1,332 @@
+# benchmark.py - Load and micro benchmarks against a running MongoDB
+import asyncio
+import http.client
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+BENCH_HOST = '127.0.0.1'
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def report(label: str, latencies: List[float], elapsed: float):
+    """📊 Print throughput and latency percentiles"""
+    print(f"{label:<28} {len(latencies) / elapsed:>9.1f} req/s   "
+          f"p50 {statistics.median(latencies) * 1000:>7.2f} ms   "
+          f"p99 {_percentile(latencies, 99) * 1000:>7.2f} ms")
+
+def run_load(port: int, paths: List[str], requests: int, concurrency: int, idle: int = 0) -> Dict:
+    """
+    🔥 Drive GET requests at a server from `concurrency` keep-alive clients
+    
+    Args:
+        port: Server port on localhost
+        paths: Paths to cycle through
+        requests: Total number of requests
+        concurrency: Number of concurrent client connections
+        idle: Extra connections opened (and held idle) before the run starts
+    
+    Returns:
+        Dict with latencies and elapsed wall time
+    """
+    idle_sockets = []
+    for _ in range(idle):
+        conn = http.client.HTTPConnection(BENCH_HOST, port, timeout=30)
+        conn.connect()
+        idle_sockets.append(conn)
+    
+    per_client = max(1, requests // concurrency)
+    
+    def client(worker: int) -> List[float]:
+        conn = http.client.HTTPConnection(BENCH_HOST, port, timeout=30)
+        samples = []
+        for i in range(per_client):
+            path = paths[(worker + i) % len(paths)]
+            start = time.perf_counter()
+            conn.request('GET', path)
+            conn.getresponse().read()
+            samples.append(time.perf_counter() - start)
+        conn.close()
+        return samples
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - start
+    
+    for conn in idle_sockets:
+        conn.close()
+    
+    return {'latencies': [s for samples in results for s in samples], 'elapsed': elapsed}
+
+def _start_threaded(port: int, threads: int):
+    from simple_app import PooledHTTPServer, RecipeHandler
+    httpd = PooledHTTPServer((BENCH_HOST, port), RecipeHandler, max_workers=threads)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    
+    def stop():
+        httpd.shutdown()
+        httpd.server_close()
+    return stop
+
+def _start_async(port: int):
+    from async_app import AsyncRecipeApp
+    loop = asyncio.new_event_loop()
+    app = AsyncRecipeApp(idle_timeout=60)
+    ready = threading.Event()
+    stop_event = asyncio.Event()
+    
+    async def main():
+        server = await asyncio.start_server(app.handle_connection, BENCH_HOST, port, reuse_address=True)
+        ready.set()
+        async with server:
+            await stop_event.wait()
+            server.close()
+            await app.drain()
+    
+    thread = threading.Thread(target=lambda: loop.run_until_complete(main()), daemon=True)
+    thread.start()
+    ready.wait()
+    
+    def stop():
+        loop.call_soon_threadsafe(stop_event.set)
+        thread.join(timeout=5)
+    return stop
+
+def bench_http(requests: int = 2000, concurrency: int = 32, idle: int = 0, threads: int = 16):
+    """⚖️ Compare the threaded server against the asyncio server on the same routes"""
+    paths = ['/', '/recipes', '/favorites', '/filter/tried', '/stats']
+    print(f"🏁 HTTP benchmark: {requests} requests, {concurrency} clients, {idle} idle connections")
+    
+    for label, start_server, port in (
+        (f"threaded ({threads} threads)", lambda p: _start_threaded(p, threads), 8181),
+        ("asyncio", _start_async, 8182),
+    ):
+        stop = start_server(port)
+        try:
+            run_load(port, paths, concurrency, concurrency)  # warm up pools and caches
+            result = run_load(port, paths, requests, concurrency, idle)
+            report(label, result['latencies'], result['elapsed'])
+        finally:
+            stop()
+
+def _synthetic_recipes(count: int, seed: int = 7):
+    """🎲 Generate recipe-shaped documents from the sample data vocabulary"""
+    import random
+    from bson import ObjectId
+    from generate_sample_data import generate_sample_recipes
+    from recipe_parsing import INGREDIENT_KEYS_FIELD, INGREDIENT_NAMES_FIELD, ingredient_keys, parse_ingredient
+    
+    rng = random.Random(seed)
+    samples = [recipe.to_dict() for recipe in generate_sample_recipes()]
+    ingredients = [ing for doc in samples for ing in doc['ingredients']]
+    # Parse each distinct line once, as Recipe.to_dict would on write
+    parsed = {ing: parse_ingredient(ing)['names'] for ing in ingredients}
+    instructions = [step for doc in samples for step in doc['instructions']]
+    words = sorted({word for doc in samples for word in doc['name'].split()})
+    tags = sorted({tag for doc in samples for tag in doc['metadata'].get('tags', [])})
+    
+    for i in range(count):
+        lines = rng.sample(ingredients, rng.randint(4, 12))
+        names = list(dict.fromkeys(name for line in lines for name in parsed[line]))
+        yield {
+            '_id': ObjectId(),
+            'name': f"{' '.join(rng.sample(words, 3))} #{i}",
+            'ingredients': lines,
+            INGREDIENT_NAMES_FIELD: names,
+            INGREDIENT_KEYS_FIELD: ingredient_keys(names),
+            'instructions': rng.sample(instructions, rng.randint(3, 9)),
+            'metadata': {
+                'tags': rng.sample(tags, 2),
+                'cuisine': rng.choice(samples)['metadata'].get('cuisine'),
+                'difficulty': rng.choice(['easy', 'medium', 'hard']),
+                'servings': rng.randint(1, 8),
+                'prep_time': f"{rng.randint(1, 6) * 5} minutes",
+                'cook_time': f"{rng.randint(0, 12) * 5} minutes"
+            },
+            'is_favorite': rng.random() < 0.25,
+            'status': rng.choice(['want_to_try', 'tried', 'made_before'])
+        }
+
+def bench_search(count: int = 100000, queries: int = 200):
+    """🔎 Build the inverted index over synthetic recipes and time top-k queries"""
+    from search_index import SearchIndex
+    
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.build(_synthetic_recipes(count))
+    print(f"🏗️ Indexed {count} recipes in {time.perf_counter() - start:.2f}s")
+    
+    terms = ['chicken', 'olive oil', 'tomato basil', 'chocolate', 'garlic ginger', 'vegetarian']
+    latencies = []
+    start = time.perf_counter()
+    for i in range(queries):
+        query_start = time.perf_counter()
+        index.search(terms[i % len(terms)], k=20)
+        latencies.append(time.perf_counter() - query_start)
+    report(f"search top-20 @ {count}", latencies, time.perf_counter() - start)
+
+def bench_pantry(count: int = 500000, queries: int = 200):
+    """🥫 Build the pantry index over synthetic recipes and time top-k coverage queries"""
+    from pantry_index import PantryIndex
+    
+    index = PantryIndex()
+    start = time.perf_counter()
+    index.load(_synthetic_recipes(count))
+    print(f"🏗️ Indexed {count} recipes in {time.perf_counter() - start:.2f}s")
+    
+    pantries = [
+        ['eggs', 'flour', 'butter', 'sugar', 'dark chocolate'],
+        ['chicken thighs', 'coconut milk', 'green curry paste', 'jasmine rice', 'garlic'],
+        ['olive oil', 'garlic', 'tomatoes', 'basil', 'mozzarella', 'pizza dough', 'red onion', 'feta cheese'],
+        ['soy sauce', 'ginger', 'green onions'],
+    ]
+    latencies = []
+    start = time.perf_counter()
+    for i in range(queries):
+        query_start = time.perf_counter()
+        index.match(pantries[i % len(pantries)], k=20)
+        latencies.append(time.perf_counter() - query_start)
+    report(f"pantry top-20 @ {count}", latencies, time.perf_counter() - start)
+
+def bench_similar(count: int = 500000, queries: int = 200):
+    """🧲 Build the MinHash/LSH index over synthetic recipes and time nearest-neighbour lookups"""
+    import random
+    from similarity_index import SimilarityIndex
+    
+    index = SimilarityIndex()
+    start = time.perf_counter()
+    index.load(_synthetic_recipes(count))
+    print(f"🏗️ Indexed {count} recipes in {time.perf_counter() - start:.2f}s")
+    
+    rng = random.Random(7)
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(queries):
+        query_start = time.perf_counter()
+        index.similar(rng.choice(index.ids), k=5)
+        latencies.append(time.perf_counter() - query_start)
+    report(f"similar top-5 @ {count}", latencies, time.perf_counter() - start)
+
+def bench_models(count: int = 100000):
+    """🧱 Memory and time to load documents as Recipe vs the slotted RecipeView"""
+    import tracemalloc
+    from models import Recipe, RecipeView
+    
+    docs = list(_synthetic_recipes(count))
+    for model in (Recipe, RecipeView):
+        tracemalloc.start()
+        start = time.perf_counter()
+        loaded = [model.from_dict(doc) for doc in docs]
+        elapsed = time.perf_counter() - start
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{model.__name__:<12} {size / len(loaded):>7.0f} bytes/recipe   {elapsed * 1000:>8.1f} ms for {count}")
+        del loaded
+
+def bench_decode(count: int = 50000, runs: int = 5):
+    """🧾 Per-document cost of decoding a cursor batch into dicts vs RawBSONDocument"""
+    import json
+    import bson
+    from bson.codec_options import CodecOptions
+    from bson.raw_bson import RawBSONDocument
+    from models import RecipeView
+    from recipe_export import json_default
+    
+    # One buffer shaped like a cursor batch
+    data = b''.join(bson.encode(doc) for doc in _synthetic_recipes(count))
+    encoder = json.JSONEncoder(default=json_default)
+    
+    def card(doc):
+        # The fields a recipe list page renders
+        view = RecipeView(doc)
+        return view.name, view.is_favorite, view.status, view.metadata.get('cuisine')
+    
+    def full(doc):
+        view = RecipeView(doc)
+        return view.name, view.metadata, view.ingredients, view.instructions
+    
+    for codec_label, options in (("dict", CodecOptions()), ("raw", CodecOptions(document_class=RawBSONDocument))):
+        for touch_label, touch in (("untouched", None), ("list fields", card),
+                                   ("all fields", full), ("export", encoder.encode)):
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                docs = bson.decode_all(data, options)
+                if touch:
+                    for doc in docs:
+                        touch(doc)
+                timings.append(time.perf_counter() - start)
+                del docs
+            best = min(timings)
+            print(f"{codec_label:<5} {touch_label:<12} {best / count * 1e6:>7.2f} us/doc")
+    print("ℹ️ raw only saves the decode of documents nothing reads; a read document costs the same")
+
+def _bench_manager(count: int, collection_name: str = 'bench_recipes'):
+    """🧪 A RecipeManager pointed at a scratch collection filled with synthetic recipes"""
+    from database import db_connection
+    from recipe_manager import RecipeManager
+    from recipe_stats import StatsStore
+    
+    manager = RecipeManager()
+    manager.collection = db_connection.get_collection(collection_name)
+    manager.stats_store = StatsStore(db_connection.db, f"{collection_name}_stats")
+    manager.collection.drop()
+    batch = []
+    for doc in _synthetic_recipes(count):
+        batch.append(doc)
+        if len(batch) == 1000:
+            manager.collection.insert_many(batch)
+            batch = []
+    if batch:
+        manager.collection.insert_many(batch)
+    print(f"🧪 Loaded {count} synthetic recipes into '{collection_name}'")
+    return manager
+
+def bench_stats(count: int = 50000, runs: int = 5):
+    """📊 Compare the materialized stats document, the $facet aggregation and the Python fallback"""
+    manager = _bench_manager(count)
+    try:
+        manager.stats_store.rebuild(manager.collection)
+        results = {}
+        for label, options in (
+            ("stats materialized doc", {}),
+            ("stats $facet aggregation", {'use_materialized': False}),
+            ("stats python fallback", {'use_materialized': False, 'use_aggregation': False}),
+        ):
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(runs):
+                run_start = time.perf_counter()
+                results[label] = manager.get_recipe_stats(**options)
+                latencies.append(time.perf_counter() - run_start)
+            report(label, latencies, time.perf_counter() - start)
+        print(f"🟰 Results identical: {len(set(map(repr, results.values()))) == 1}")
+    finally:
+        manager.collection.drop()
+        manager.stats_store.summary.drop()
+        manager.stats_store.ingredients.drop()
+
+BENCHMARKS = {
+    'http': bench_http,
+    'search': bench_search,
+    'pantry': bench_pantry,
+    'similar': bench_similar,
+    'stats': bench_stats,
+    'models': bench_models,
+    'decode': bench_decode,
+}
+
+if __name__ == "__main__":
+    # Usage: python benchmark.py <name> [int args...]
+    name = sys.argv[1] if len(sys.argv) > 1 else 'http'
+    if name not in BENCHMARKS:
+        print(f"❌ Unknown benchmark: {name} (available: {', '.join(BENCHMARKS)})")
+        sys.exit(1)
+    BENCHMARKS[name](*(int(arg) for arg in sys.argv[2:]))
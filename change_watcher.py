@@ -0,0 +1,159 @@
+# change_watcher.py - Cross-process cache invalidation from MongoDB writes
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+# 📍 Resume tokens / poll marks survive restarts here
+WATCHER_STATE_COLLECTION = 'watcher_state'
+
+# Server error codes
+CHANGE_STREAMS_UNSUPPORTED = 40573  # standalone server (needs a replica set)
+CHANGE_STREAM_HISTORY_LOST = 286    # resume token fell off the oplog
+CHANGE_STREAM_FATAL = 280
+
+# Polling re-reads this far back to tolerate clock skew between app servers
+POLL_OVERLAP = timedelta(seconds=5)
+
+# Callback: list of changed _ids, or None when anything may have changed
+Invalidator = Callable[[Optional[List]], None]
+
+class ChangeWatcher:
+    """
+    👀 Follow writes to a collection from every process and invalidate caches
+    
+    Uses a change stream when the deployment supports one (replica set, even a
+    single-node one), resuming from a token persisted in `watcher_state`.
+    On a standalone server it falls back to polling `metadata.updated_at`
+    (deletes are detected by the document count shrinking).
+    
+    Modes (CHANGE_WATCHER env var): 'auto' (default), 'stream', 'poll', 'off'.
+    """
+    
+    def __init__(self, collection, name: str = 'recipes', mode: Optional[str] = None,
+                 poll_interval: Optional[float] = None, token_flush_interval: float = 1.0):
+        self.collection = collection
+        self.state = collection.database[WATCHER_STATE_COLLECTION]
+        self.name = name
+        self.mode = mode or os.getenv('CHANGE_WATCHER', 'auto')
+        self.poll_interval = float(poll_interval or os.getenv('CHANGE_POLL_INTERVAL', '2'))
+        self.token_flush_interval = token_flush_interval
+        self.active_mode: Optional[str] = None  # 'stream' or 'poll' once running
+        self.changes_seen = 0
+        self._callbacks: List[Invalidator] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def register(self, callback: Invalidator) -> Invalidator:
+        """📝 Invalidate `callback` on every change (by _id list, or None for everything)"""
+        self._callbacks.append(callback)
+        return callback
+    
+    def start(self) -> 'ChangeWatcher':
+        """▶️ Start following changes in a background thread"""
+        if self.mode == 'off' or (self._thread and self._thread.is_alive()):
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"change-watcher-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self, timeout: float = 5.0):
+        """⏹️ Stop the watcher (the last resume token is saved)"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+    
+    def _notify(self, recipe_ids: Optional[List]):
+        self.changes_seen += len(recipe_ids) if recipe_ids else 1
+        for callback in list(self._callbacks):
+            try:
+                callback(recipe_ids)
+            except Exception as e:
+                print(f"⚠️ Cache invalidation failed: {e}")
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.mode == 'poll':
+                    self._poll()
+                else:
+                    self._follow_stream()
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED and self.mode == 'auto':
+                    print("ℹ️ Change streams need a replica set - polling metadata.updated_at instead")
+                    self.mode = 'poll'
+                elif e.code in (CHANGE_STREAM_HISTORY_LOST, CHANGE_STREAM_FATAL):
+                    # Missed changes cannot be replayed: start fresh and drop everything
+                    print("⚠️ Change stream history lost - invalidating all caches")
+                    self._save_state(resume_token=None)
+                    self._notify(None)
+                else:
+                    print(f"⚠️ Change watcher error: {e}")
+                    self._stop.wait(self.poll_interval)
+            except PyMongoError as e:
+                print(f"⚠️ Change watcher error: {e}")
+                self._stop.wait(self.poll_interval)
+    
+    def _load_state(self) -> dict:
+        return self.state.find_one({"_id": self.name}) or {}
+    
+    def _save_state(self, **fields):
+        self.state.update_one({"_id": self.name}, {"$set": {**fields, "updated_at": datetime.now()}},
+                              upsert=True)
+    
+    def _follow_stream(self):
+        """🌊 Follow the change stream, persisting the resume token periodically"""
+        token = self._load_state().get('resume_token')
+        with self.collection.watch(resume_after=token, max_await_time_ms=1000) as stream:
+            self.active_mode = 'stream'
+            saved_token, last_flush = token, time.monotonic()
+            while not self._stop.is_set() and stream.alive:
+                change = stream.try_next()
+                if change is not None:
+                    operation = change['operationType']
+                    if operation in ('insert', 'update', 'replace', 'delete'):
+                        self._notify([change['documentKey']['_id']])
+                    elif operation == 'invalidate':
+                        # Collection dropped or renamed: the token cannot be resumed from
+                        self._notify(None)
+                        self._save_state(resume_token=None)
+                        return
+                    else:
+                        self._notify(None)
+                
+                token = stream.resume_token
+                if token != saved_token and time.monotonic() - last_flush >= self.token_flush_interval:
+                    self._save_state(resume_token=token)
+                    saved_token, last_flush = token, time.monotonic()
+            
+            if token != saved_token:
+                self._save_state(resume_token=token)
+    
+    def _poll(self):
+        """⏱️ Fallback: look for recently updated documents every poll_interval seconds"""
+        self.active_mode = 'poll'
+        since = self._load_state().get('polled_until') or datetime.now()
+        count = self.collection.estimated_document_count()
+        reported = {}  # _id -> updated_at already notified inside the overlap window
+        while not self._stop.wait(self.poll_interval):
+            recent = list(self.collection.find(
+                {"metadata.updated_at": {"$gt": since - POLL_OVERLAP}},
+                {"metadata.updated_at": 1}
+            ))
+            changed = [doc for doc in recent if reported.get(doc['_id']) != doc['metadata']['updated_at']]
+            reported = {doc['_id']: doc['metadata']['updated_at'] for doc in recent}
+            if changed:
+                self._notify([doc['_id'] for doc in changed])
+                since = max(since, max(doc['metadata']['updated_at'] for doc in changed))
+                self._save_state(polled_until=since)
+            
+            # Deletes leave no updated_at behind (nor do imports carrying old timestamps):
+            # a count change the recent updates do not explain means "anything may have changed"
+            current = self.collection.estimated_document_count()
+            if current < count or current > count + len(changed):
+                self._notify(None)
+            count = current
@@ -1,7 +1,9 @@
 # database.py
+import pymongo
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 import os
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,21 +13,54 @@ class DatabaseConnection:
         # 🔧 MongoDB connection string - modify as needed
         self.connection_string = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
         self.database_name = os.getenv('DB_NAME', 'recipe_management')
+        # 🏊 Connection pool tuning - shared by every request in this process
+        self.max_pool_size = int(os.getenv('MONGODB_MAX_POOL_SIZE', '50'))
+        self.min_pool_size = int(os.getenv('MONGODB_MIN_POOL_SIZE', '0'))
+        self.max_idle_time_ms = int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', '60000'))
+        self.wait_queue_timeout_ms = int(os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS', '5000'))
+        self.max_connecting = int(os.getenv('MONGODB_MAX_CONNECTING', '2'))
+        # ⏱️ How long the connection check may wait for a server (callers hold the lock meanwhile)
+        self.connect_timeout_ms = int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', '2000'))
         self.client = None
         self.db = None
+        self._lock = threading.Lock()
     
     def connect(self):
-        """🔗 Establish connection to MongoDB"""
-        try:
-            self.client = MongoClient(self.connection_string)
-            # Test the connection
-            self.client.admin.command('ping')
-            self.db = self.client[self.database_name]
-            print("✅ Successfully connected to MongoDB!")
+        """🔗 Establish connection to MongoDB (reuses the pooled client if already connected)"""
+        if self.db is not None:
             return True
-        except ConnectionFailure as e:
-            print(f"❌ Failed to connect to MongoDB: {e}")
-            return False
+        
+        with self._lock:
+            # Another thread may have connected while we waited for the lock
+            if self.db is not None:
+                return True
+            
+            client = None
+            try:
+                client = MongoClient(
+                    self.connection_string,
+                    maxPoolSize=self.max_pool_size,
+                    minPoolSize=self.min_pool_size,
+                    maxIdleTimeMS=self.max_idle_time_ms,
+                    waitQueueTimeoutMS=self.wait_queue_timeout_ms,
+                    maxConnecting=self.max_connecting
+                )
+                # Test the connection (short timeout, not the 30s server selection default)
+                with pymongo.timeout(self.connect_timeout_ms / 1000):
+                    client.admin.command('ping')
+                self.client = client
+                self.db = client[self.database_name]
+                print("✅ Successfully connected to MongoDB!")
+                return True
+            except ConnectionFailure as e:
+                print(f"❌ Failed to connect to MongoDB: {e}")
+                if client is not None:
+                    client.close()
+                return False
+    
+    def is_connected(self) -> bool:
+        """🔍 Check whether the pooled client has been created"""
+        return self.db is not None
     
     def get_collection(self, collection_name):
         """📂 Get a specific collection"""
@@ -36,9 +71,12 @@ class DatabaseConnection:
     
     def close_connection(self):
         """🔒 Close database connection"""
-        if self.client:
-            self.client.close()
-            print("🔒 Database connection closed!")
+        with self._lock:
+            if self.client:
+                self.client.close()
+                self.client = None
+                self.db = None
+                print("🔒 Database connection closed!")
 
 # 🌟 Singleton pattern for database connection
-db_connection = DatabaseConnection()
\ No newline at end of file
+db_connection = DatabaseConnection()
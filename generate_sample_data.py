@@ -298,15 +298,11 @@ def populate_database():
     
     added_count = 0
     
-    for recipe in sample_recipes:
-        try:
-            recipe_id = manager.add_recipe(recipe)
-            added_count += 1
-            print(f"✅ Added: {recipe.name}")
-        except ValueError as e:
-            print(f"⚠️ Skipped {recipe.name}: {e}")
-        except Exception as e:
-            print(f"❌ Error adding {recipe.name}: {e}")
+    try:
+        # One insert_many for the whole set; existing names are skipped, not fatal
+        added_count = manager.add_recipes(sample_recipes)['inserted']
+    except Exception as e:
+        print(f"❌ Error adding sample recipes: {e}")
     
     print(f"\n🎉 Successfully added {added_count} recipes!")
     print("🚀 Ready to launch Flask app!")
@@ -0,0 +1,263 @@
+# migrations.py - Versioned index bootstrap and schema migrations
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from database import db_connection
+
+# 📇 Collection holding applied schema/index versions
+META_COLLECTION = 'schema_meta'
+META_DOC_ID = 'recipes'
+
+def _v1_core_indexes(db):
+    """📇 Core indexes: unique name, favorite and status filters"""
+    recipes = db['recipes']
+    recipes.create_index("name", unique=True, background=True)
+    recipes.create_index("is_favorite", background=True)
+    recipes.create_index("status", background=True)
+
+def _v2_keyset_page_indexes(db):
+    """📄 Compound indexes so filtered listings page by _id without sorting in memory"""
+    recipes = db['recipes']
+    recipes.create_index([("is_favorite", 1), ("_id", 1)], background=True)
+    recipes.create_index([("status", 1), ("_id", 1)], background=True)
+
+def _v3_materialized_stats(db):
+    """📈 Build the materialized stats document and index ingredient counters by count"""
+    from recipe_stats import StatsStore
+    stats = StatsStore(db)
+    stats.ingredients.create_index([("count", -1), ("_id", 1)], background=True)
+    stats.rebuild(db['recipes'])
+
+def _v4_search_indexes(db):
+    """🔍 Compound indexes for advanced_search, equality fields before the servings range (ESR)"""
+    recipes = db['recipes']
+    recipes.create_index([("metadata.cuisine", 1), ("metadata.difficulty", 1), ("metadata.servings", 1)],
+                         name="search_cuisine_difficulty_servings", background=True)
+    recipes.create_index([("metadata.difficulty", 1), ("metadata.servings", 1)],
+                         name="search_difficulty_servings", background=True)
+    recipes.create_index([("metadata.servings", 1)], name="search_servings", background=True)
+
+def _v5_updated_at_index(db):
+    """👀 Index metadata.updated_at so the change watcher's polling fallback stays cheap"""
+    db['recipes'].create_index([("metadata.updated_at", 1)], name="updated_at", background=True)
+
+def _backfill(db, projection: dict, derive: Callable, batch_size: int) -> int:
+    """
+    🔁 Store derived fields on every recipe whose stored values differ
+    
+    Args:
+        db: Database handle (defaults to the shared connection)
+        projection: Fields derive() reads
+        derive: doc -> {field path: value}; None values are unset
+        batch_size: Updates per bulk write
+    
+    Returns:
+        int: Number of recipes updated
+    """
+    from pymongo import UpdateOne
+    
+    db = db if db is not None else db_connection.db
+    recipes = db['recipes']
+    updated = 0
+    batch = []
+    for doc in recipes.find({}, projection):
+        update = {}
+        for path, value in derive(doc).items():
+            stored = doc
+            for part in path.split('.'):
+                stored = stored.get(part) if isinstance(stored, dict) else None
+            if stored == value:
+                continue
+            if value is None:
+                update.setdefault("$unset", {})[path] = ""
+            else:
+                update.setdefault("$set", {})[path] = value
+        if not update:
+            continue
+        batch.append(UpdateOne({"_id": doc['_id']}, update))
+        if len(batch) == batch_size:
+            updated += recipes.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += recipes.bulk_write(batch, ordered=False).modified_count
+    return updated
+
+def backfill_durations(db=None, batch_size: int = 1000) -> int:
+    """
+    ⏱️ Store prep_minutes / cook_minutes / total_minutes parsed from the free-text times
+    
+    Safe to re-run: only documents whose stored values differ are written.
+    
+    Returns:
+        int: Number of recipes updated
+    """
+    from recipe_parsing import DURATION_FIELDS, TOTAL_FIELD, duration_fields
+    
+    stored_fields = [*DURATION_FIELDS, *DURATION_FIELDS.values(), TOTAL_FIELD]
+    derive = lambda doc: {f"metadata.{field}": value
+                          for field, value in duration_fields(doc.get('metadata') or {}).items()}
+    updated = _backfill(db, {f"metadata.{field}": 1 for field in stored_fields}, derive, batch_size)
+    print(f"⏱️ Parsed cooking times for {updated} recipes")
+    return updated
+
+def backfill_ingredient_keys(db=None, batch_size: int = 1000) -> int:
+    """
+    🥕 Store the canonical ingredient_names and ingredient_keys parsed from each recipe's ingredient lines
+    
+    Safe to re-run: only documents whose stored values differ are written.
+    
+    Returns:
+        int: Number of recipes updated
+    """
+    from recipe_parsing import INGREDIENT_KEYS_FIELD, INGREDIENT_NAMES_FIELD, ingredient_keys, ingredient_names
+    
+    def derive(doc):
+        names = ingredient_names(doc.get('ingredients'))
+        return {INGREDIENT_NAMES_FIELD: names, INGREDIENT_KEYS_FIELD: ingredient_keys(names)}
+    
+    projection = {"ingredients": 1, INGREDIENT_NAMES_FIELD: 1, INGREDIENT_KEYS_FIELD: 1}
+    updated = _backfill(db, projection, derive, batch_size)
+    print(f"🥕 Parsed ingredients for {updated} recipes")
+    return updated
+
+def _v6_duration_minutes(db):
+    """⏱️ Backfill numeric cooking times and index them for range filters and sorting"""
+    recipes = db['recipes']
+    backfill_durations(db)
+    recipes.create_index([("metadata.total_minutes", 1)], name="search_total_minutes", background=True)
+    recipes.create_index([("metadata.cuisine", 1), ("metadata.total_minutes", 1)],
+                         name="search_cuisine_total_minutes", background=True)
+
+def _v7_ingredient_keys(db):
+    """🥕 Backfill canonical ingredient keys and index them (multikey) for exact ingredient lookups"""
+    backfill_ingredient_keys(db)
+    db['recipes'].create_index([("ingredient_keys", 1)], name="ingredient_keys", background=True)
+
+def _v8_ingredient_names(db):
+    """🥫 Backfill the canonical ingredient_names the pantry index is built from"""
+    backfill_ingredient_keys(db)
+
+def _v9_time_sort_indexes(db):
+    """⏱️ Add the _id tiebreak to the cooking time indexes, so sort_by_time never sorts in memory"""
+    recipes = db['recipes']
+    recipes.create_index([("metadata.total_minutes", 1), ("_id", 1)],
+                         name="search_total_minutes_id", background=True)
+    recipes.create_index([("metadata.cuisine", 1), ("metadata.total_minutes", 1), ("_id", 1)],
+                         name="search_cuisine_total_minutes_id", background=True)
+    # Prefixes of the new indexes, so they are no longer needed
+    existing = recipes.index_information()
+    for name in ("search_total_minutes", "search_cuisine_total_minutes"):
+        if name in existing:
+            recipes.drop_index(name)
+
+def _v10_ingredient_name_fixes(db):
+    """🍃 Re-parse ingredient names after the "bay leaf", "ground beef" and "juice of" fixes"""
+    backfill_ingredient_keys(db)
+
+# 🗂️ Ordered list of (version, description, apply function)
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "Core indexes on name, is_favorite and status", _v1_core_indexes),
+    (2, "Keyset pagination indexes on (is_favorite, _id) and (status, _id)", _v2_keyset_page_indexes),
+    (3, "Materialized stats document and ingredient counters", _v3_materialized_stats),
+    (4, "Compound advanced_search indexes on cuisine, difficulty and servings", _v4_search_indexes),
+    (5, "Index on metadata.updated_at for change polling", _v5_updated_at_index),
+    (6, "Numeric prep/cook/total minutes, indexed for filtering and sorting", _v6_duration_minutes),
+    (7, "Parsed ingredient_keys array with a multikey index", _v7_ingredient_keys),
+    (8, "Canonical ingredient_names for pantry matching", _v8_ingredient_names),
+    (9, "Cooking time indexes with an _id tiebreak for sort_by_time", _v9_time_sort_indexes),
+    (10, "Re-parse ingredient names (bay leaf, ground meat, juice/zest of)", _v10_ingredient_name_fixes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# ⚡ Version seen by this process - checked once, not on every manager init
+_cached_version: Optional[int] = None
+
+def get_schema_version(db=None) -> int:
+    """
+    🔍 Read the applied schema version from the metadata collection
+    
+    Args:
+        db: Database handle (defaults to the shared connection)
+    
+    Returns:
+        int: Applied version, 0 if nothing has been applied yet
+    """
+    db = db if db is not None else db_connection.db
+    meta = db[META_COLLECTION].find_one({"_id": META_DOC_ID}, {"schema_version": 1})
+    return meta.get('schema_version', 0) if meta else 0
+
+def check_schema_version(db=None) -> bool:
+    """
+    ✅ Check (once per process) that the database schema is up to date
+    
+    Args:
+        db: Database handle (defaults to the shared connection)
+    
+    Returns:
+        bool: True if all migrations have been applied
+    """
+    global _cached_version
+    if _cached_version is None:
+        try:
+            _cached_version = get_schema_version(db)
+        except Exception as e:
+            print(f"⚠️ Could not read schema version: {e}")
+            return False
+        
+        if _cached_version < LATEST_VERSION:
+            print(f"⚠️ Schema version {_cached_version} is behind {LATEST_VERSION}. "
+                  f"Run: python start.py migrate")
+    
+    return _cached_version >= LATEST_VERSION
+
+def run_migrations(db=None) -> int:
+    """
+    🚀 Apply all pending migrations in order and record them
+    
+    Args:
+        db: Database handle (defaults to the shared connection)
+    
+    Returns:
+        int: Number of migrations applied
+    """
+    global _cached_version
+    if db is None:
+        if not db_connection.connect():
+            raise RuntimeError("❌ Database not connected!")
+        db = db_connection.db
+    
+    current = get_schema_version(db)
+    applied = 0
+    
+    for version, description, apply in MIGRATIONS:
+        if version <= current:
+            continue
+        
+        print(f"🔧 Applying migration {version}: {description}")
+        apply(db)
+        db[META_COLLECTION].update_one(
+            {"_id": META_DOC_ID},
+            {
+                "$set": {"schema_version": version},
+                "$push": {"applied": {
+                    "version": version,
+                    "description": description,
+                    "applied_at": datetime.now()
+                }}
+            },
+            upsert=True
+        )
+        current = version
+        applied += 1
+    
+    _cached_version = current
+    
+    if applied:
+        print(f"✅ Applied {applied} migration(s), schema now at version {current}")
+    else:
+        print(f"✅ Schema already up to date (version {current})")
+    return applied
+
+if __name__ == "__main__":
+    run_migrations()
@@ -1,7 +1,22 @@
 # models.py
 from datetime import datetime
-from typing import List, Dict, Optional
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional
+import bson
 from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from recipe_parsing import (INGREDIENT_KEYS_FIELD, INGREDIENT_NAMES_FIELD, TOTAL_FIELD, duration_fields,
+                            ingredient_keys, ingredient_names)
+
+def document_id(doc: Mapping):
+    """🔑 _id of a recipe document, read straight from the bytes of a RawBSONDocument"""
+    if isinstance(doc, RawBSONDocument):
+        raw = doc.raw
+        # The server always stores _id first: type 0x07 (ObjectId), "_id\0", then 12 bytes
+        if raw[4:9] == b'\x07_id\x00':
+            return ObjectId(raw[9:21])
+    return doc.get('_id')
 
 class Recipe:
     def __init__(self, name: str, ingredients: List[str], instructions: List[str], 
@@ -28,25 +43,34 @@ class Recipe:
         self.status = status  # "want_to_try", "tried", "made_before"
         
         # 📅 Auto-add timestamps if not in metadata
-        if 'created_at' not in self.metadata:
-            self.metadata['created_at'] = datetime.now()
-        if 'updated_at' not in self.metadata:
-            self.metadata['updated_at'] = datetime.now()
+        if 'created_at' not in self.metadata or 'updated_at' not in self.metadata:
+            now = datetime.now()
+            self.metadata.setdefault('created_at', now)
+            self.metadata.setdefault('updated_at', now)
     
     def to_dict(self) -> Dict:
         """🔄 Convert recipe to dictionary for MongoDB storage"""
+        # ⏱️ Parse prep/cook times once, so they can be filtered and sorted on
+        durations = duration_fields(self.metadata)
+        metadata = {key: value for key, value in self.metadata.items() if key not in durations}
+        metadata.update({field: minutes for field, minutes in durations.items() if minutes is not None})
+        names = ingredient_names(self.ingredients)
+        
         recipe_dict = {
             'name': self.name,
             'ingredients': self.ingredients,
             'instructions': self.instructions,
-            'metadata': self.metadata,
+            'metadata': metadata,
             'is_favorite': self.is_favorite,
-            'status': self.status
+            'status': self.status,
+            # 🥕 Canonical ingredient names (pantry matching) and their indexed lookup keys
+            INGREDIENT_NAMES_FIELD: names,
+            INGREDIENT_KEYS_FIELD: ingredient_keys(names)
         }
         
         if self._id:
             recipe_dict['_id'] = self._id
-            
+        
         return recipe_dict
     
     @classmethod
@@ -102,6 +126,16 @@ class Recipe:
             return True
         return False
     
+    @property
+    def ingredients_count(self) -> int:
+        """🥘 Number of ingredients"""
+        return len(self.ingredients)
+    
+    @property
+    def instructions_count(self) -> int:
+        """📋 Number of instruction steps"""
+        return len(self.instructions)
+    
     def get_display_info(self) -> Dict:
         """📊 Get formatted display information"""
         return {
@@ -126,49 +160,27 @@ class Recipe:
             bool(self.instructions)
         )
     
+    def get_total_minutes(self) -> Optional[int]:
+        """⏱️ Prep plus cook time in minutes (stored at write time), or None if unknown"""
+        if TOTAL_FIELD in self.metadata:
+            return self.metadata[TOTAL_FIELD]
+        return duration_fields(self.metadata)[TOTAL_FIELD]
+    
     def get_total_time(self) -> str:
-        """⏱️ Calculate total time if prep and cook times are available"""
-        prep = self.metadata.get('prep_time', '')
-        cook = self.metadata.get('cook_time', '')
-        
-        if not prep or not cook:
+        """⏱️ Format the total time - the known part if only prep or cook time is given"""
+        total_mins = self.get_total_minutes()
+        if total_mins is None:
             return 'N/A'
         
-        try:
-            # Simple parsing for times like "20 minutes", "1 hour 30 minutes"
-            def parse_time(time_str):
-                time_str = time_str.lower()
-                minutes = 0
-                
-                if 'hour' in time_str:
-                    hours = int(''.join(filter(str.isdigit, time_str.split('hour')[0])))
-                    minutes += hours * 60
-                    remaining = time_str.split('hour')[1] if 'hour' in time_str else time_str
-                else:
-                    remaining = time_str
-                
-                if 'minute' in remaining:
-                    mins = int(''.join(filter(str.isdigit, remaining.split('minute')[0])))
-                    minutes += mins
-                
-                return minutes
-            
-            prep_mins = parse_time(prep)
-            cook_mins = parse_time(cook)
-            total_mins = prep_mins + cook_mins
-            
-            if total_mins >= 60:
-                hours = total_mins // 60
-                mins = total_mins % 60
-                if mins > 0:
-                    return f"{hours}h {mins}m"
-                else:
-                    return f"{hours}h"
+        if total_mins >= 60:
+            hours = total_mins // 60
+            mins = total_mins % 60
+            if mins > 0:
+                return f"{hours}h {mins}m"
             else:
-                return f"{total_mins}m"
-                
-        except:
-            return 'N/A'
+                return f"{hours}h"
+        else:
+            return f"{total_mins}m"
     
     def get_difficulty_level(self) -> int:
         """📊 Get numeric difficulty level (1-3)"""
@@ -205,4 +217,196 @@ class Recipe:
         return f"{favorite_emoji} {self.name} {status_emoji} ({len(self.ingredients)} ingredients, {len(self.instructions)} steps)"
     
     def __repr__(self) -> str:
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
+
+class RecipeView:
+    """
+    👁️ Compact, read-only recipe backed by the stored document
+    
+    Loading a view costs one small slotted object: nothing is copied and no
+    timestamps are filled in. ingredients, instructions and metadata are
+    decoded on first access (as a tuple, tuple and read-only mapping) and then
+    kept. Use to_recipe() for a mutable Recipe.
+    
+    A RawBSONDocument stays encoded until a field is first read, so documents
+    a caller never looks at are never decoded. The first read decodes the whole
+    document in one pass of the C decoder: reading fields one at a time out of
+    the bytes in Python measured slower than that, even for a list card.
+    """
+    
+    __slots__ = ('_doc', '_ingredients', '_instructions', '_metadata')
+    
+    def __init__(self, doc: Mapping):
+        """
+        Args:
+            doc: Recipe document as returned by MongoDB (dict or RawBSONDocument)
+        """
+        object.__setattr__(self, '_doc', doc)
+        object.__setattr__(self, '_ingredients', None)
+        object.__setattr__(self, '_instructions', None)
+        object.__setattr__(self, '_metadata', None)
+    
+    @classmethod
+    def from_dict(cls, data: Mapping) -> 'RecipeView':
+        """🏗️ Wrap a recipe document (no copy)"""
+        return cls(data)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"RecipeView is read-only (use to_recipe() to edit '{name}')")
+    
+    def __delattr__(self, name):
+        raise AttributeError("RecipeView is read-only")
+    
+    def _field(self, name: str, default=None):
+        doc = self._doc
+        if isinstance(doc, RawBSONDocument):
+            # One pass of the C decoder is cheaper than RawBSONDocument's per-document inflation
+            doc = bson.decode(doc.raw)
+            object.__setattr__(self, '_doc', doc)
+        return doc.get(name, default)
+    
+    @property
+    def _id(self) -> Optional[ObjectId]:
+        return document_id(self._doc)
+    
+    @property
+    def name(self) -> str:
+        return self._field('name')
+    
+    @property
+    def is_favorite(self) -> bool:
+        return self._field('is_favorite', False)
+    
+    @property
+    def status(self) -> str:
+        return self._field('status', 'want_to_try')
+    
+    @property
+    def ingredients(self) -> tuple:
+        if self._ingredients is None:
+            object.__setattr__(self, '_ingredients', tuple(self._field('ingredients') or ()))
+        return self._ingredients
+    
+    @property
+    def instructions(self) -> tuple:
+        if self._instructions is None:
+            object.__setattr__(self, '_instructions', tuple(self._field('instructions') or ()))
+        return self._instructions
+    
+    @property
+    def metadata(self) -> Mapping:
+        if self._metadata is None:
+            object.__setattr__(self, '_metadata', MappingProxyType(self._field('metadata') or {}))
+        return self._metadata
+    
+    def to_dict(self) -> Dict:
+        """🔄 Mutable copy of the recipe fields"""
+        recipe_dict = {
+            'name': self.name,
+            'ingredients': list(self.ingredients),
+            'instructions': list(self.instructions),
+            'metadata': dict(self.metadata),
+            'is_favorite': self.is_favorite,
+            'status': self.status
+        }
+        if self._id:
+            recipe_dict['_id'] = self._id
+        return recipe_dict
+    
+    def to_recipe(self) -> Recipe:
+        """✏️ Editable Recipe with the same contents"""
+        return Recipe.from_dict(self.to_dict())
+    
+    # 🎯 Same read helpers as the full Recipe
+    get_status_emoji = Recipe.get_status_emoji
+    get_status_text = Recipe.get_status_text
+    get_favorite_emoji = Recipe.get_favorite_emoji
+    get_display_info = Recipe.get_display_info
+    get_total_minutes = Recipe.get_total_minutes
+    get_total_time = Recipe.get_total_time
+    get_difficulty_level = Recipe.get_difficulty_level
+    get_tags = Recipe.get_tags
+    is_complete_recipe = Recipe.is_complete_recipe
+    ingredients_count = Recipe.ingredients_count
+    instructions_count = Recipe.instructions_count
+    __str__ = Recipe.__str__
+    __repr__ = Recipe.__repr__
+
+class RecipeSummary:
+    def __init__(self, name: str, ingredients_count: int = 0, instructions_count: int = 0,
+                 metadata: Optional[Dict] = None, _id: Optional[ObjectId] = None,
+                 is_favorite: bool = False, status: str = "want_to_try"):
+        """
+        🃏 Lightweight recipe card - counts instead of full ingredient/instruction lists
+        
+        Args:
+            name: Recipe name
+            ingredients_count: Number of ingredients
+            instructions_count: Number of instruction steps
+            metadata: Card metadata (cuisine, difficulty, servings)
+            _id: MongoDB ObjectId
+            is_favorite: Whether recipe is marked as favorite
+            status: Recipe status - "want_to_try", "tried", "made_before"
+        """
+        self._id = _id
+        self.name = name
+        self.ingredients_count = ingredients_count
+        self.instructions_count = instructions_count
+        self.metadata = metadata or {}
+        self.is_favorite = is_favorite
+        self.status = status
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RecipeSummary':
+        """🏗️ Create RecipeSummary from a projected summary document"""
+        if isinstance(data, RawBSONDocument):
+            # A card reads every field it has, so decode it in one pass
+            data = bson.decode(data.raw)
+        return cls(
+            name=data['name'],
+            ingredients_count=data.get('ingredients_count', 0),
+            instructions_count=data.get('instructions_count', 0),
+            metadata=data.get('metadata', {}),
+            _id=data.get('_id'),
+            is_favorite=data.get('is_favorite', False),
+            status=data.get('status', 'want_to_try')
+        )
+    
+    # 🎯 Same display helpers as the full Recipe
+    get_status_emoji = Recipe.get_status_emoji
+    get_status_text = Recipe.get_status_text
+    get_favorite_emoji = Recipe.get_favorite_emoji
+    get_difficulty_level = Recipe.get_difficulty_level
+    
+    def __str__(self) -> str:
+        """📝 String representation of recipe card"""
+        return f"{self.get_favorite_emoji()} {self.name} {self.get_status_emoji()} ({self.ingredients_count} ingredients, {self.instructions_count} steps)"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class RecipePage:
+    def __init__(self, items: List, next_cursor: Optional[str] = None,
+                 prev_cursor: Optional[str] = None, page_size: int = 20):
+        """
+        📄 One page of a keyset-paginated recipe listing
+        
+        Args:
+            items: Recipe objects (or RecipeSummary cards) on this page
+            next_cursor: Opaque cursor for the following page (None on the last page)
+            prev_cursor: Opaque cursor for the preceding page (None on the first page)
+            page_size: Requested page size
+        """
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.page_size = page_size
+    
+    def __iter__(self):
+        return iter(self.items)
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def __bool__(self) -> bool:
+        return bool(self.items)
@@ -0,0 +1,164 @@
+# pantry_index.py - Posting-list index ranking recipes by how much of them a pantry covers
+from array import array
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+
+from recipe_parsing import INGREDIENT_NAMES_FIELD, STAPLES, ingredient_names, parse_ingredient
+from recipe_snapshot import IncrementalSnapshot
+
+PANTRY_PROJECTION = {"ingredients": 1, INGREDIENT_NAMES_FIELD: 1}
+
+class PantryIndex(IncrementalSnapshot):
+    """
+    🥫 Canonical ingredient -> recipe rows posting lists for "what can I cook"
+    
+    A query concatenates the posting lists of the pantry's ingredients and
+    bincounts them into per-recipe matches, so the work is proportional to
+    those lists rather than the catalog, and only recipes sharing at least one
+    listed ingredient are scored. Staples are counted per recipe up front, so
+    their (catalog-sized) lists are never read. Rows are append-only: a recipe
+    whose ingredients changed gets a new row and the old one is marked dead
+    until the next rebuild compacts them.
+    """
+    
+    projection = PANTRY_PROJECTION
+    
+    def _clear(self):
+        self.names: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self._by_head: Dict[str, List[int]] = {}
+        self._staple_codes: Set[int] = set()
+        self._postings: Dict[int, array] = {}
+        self.ids: List = []
+        self._rows: Dict = {}
+        self._members = array('i')
+        self._offsets = array('q', [0])
+        self.totals = np.zeros(16, dtype=np.int32)
+        self.staples = np.zeros(16, dtype=np.int32)
+        self.alive = np.zeros(16, dtype=bool)
+        self._dead = 0
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def _code(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+            head = name.rsplit(' ', 1)[-1]
+            if head != name:
+                self._by_head.setdefault(head, []).append(code)
+            if name in STAPLES:
+                self._staple_codes.add(code)
+        return code
+    
+    def _upsert(self, doc: Dict):
+        names = doc.get(INGREDIENT_NAMES_FIELD)
+        if names is None:
+            # Not backfilled yet (start.py backfill-ingredients)
+            names = ingredient_names(doc.get('ingredients'))
+        codes = [self._code(name) for name in dict.fromkeys(names)]
+        row = self._rows.get(doc['_id'])
+        if row is not None:
+            if self._members[self._offsets[row]:self._offsets[row + 1]].tolist() == codes:
+                return
+            self._drop(doc['_id'])
+        
+        row = len(self.ids)
+        if row == len(self.alive):
+            self.totals, self.staples, self.alive = (
+                np.concatenate([column, np.zeros_like(column)]) for column in (self.totals, self.staples, self.alive))
+        for code in codes:
+            postings = self._postings.get(code)
+            if postings is None:
+                postings = self._postings[code] = array('i')
+            postings.append(row)
+        self._members.extend(codes)
+        self._offsets.append(len(self._members))
+        self.totals[row] = len(codes)
+        self.staples[row] = sum(code in self._staple_codes for code in codes)
+        self.alive[row] = True
+        self._rows[doc['_id']] = row
+        self.ids.append(doc['_id'])
+    
+    def _drop(self, recipe_id):
+        row = self._rows.pop(recipe_id, None)
+        if row is not None:
+            self.alive[row] = False
+            self._dead += 1
+            # Mostly dead rows: compact on the next refresh
+            if self._dead > max(1000, len(self._rows)):
+                self._stale = True
+    
+    def covered(self, pantry: Iterable[str]) -> Set[int]:
+        """
+        🧺 Codes of the recipe ingredients a pantry covers
+        
+        Pantry items are parsed like ingredient lines ("2 eggs" -> egg), and an
+        item covers more specific names ending in it ("tomato" -> "cherry tomato").
+        """
+        codes = set()
+        for item in pantry:
+            for name in parse_ingredient(item)['names']:
+                if name in self.codes:
+                    codes.add(self.codes[name])
+                codes.update(self._by_head.get(name, ()))
+        return codes
+    
+    def match(self, pantry: Iterable[str], k: int = 20, min_coverage: float = 0.0,
+              assume_staples: bool = True) -> List[Dict]:
+        """
+        🏆 Recipes ranked by the fraction of their ingredients the pantry covers
+        
+        Args:
+            pantry: Available ingredients (free text, e.g. ["eggs", "flour"])
+            k: Number of recipes to return
+            min_coverage: Skip recipes covered less than this (0-1)
+            assume_staples: Count salt, pepper and water as available
+        
+        Returns:
+            List of {'recipe_id', 'coverage', 'matched', 'total', 'missing'}, best
+            coverage first, then fewest missing ingredients
+        """
+        with self._lock:
+            size = len(self.ids)
+            have = self.covered(pantry)
+            listed = have - self._staple_codes if assume_staples else have
+            if assume_staples:
+                have |= self._staple_codes
+            postings = [self._postings[code] for code in listed if code in self._postings]
+            if not postings:
+                return []
+            
+            rows = np.concatenate([np.frombuffer(posting, dtype=np.int32) for posting in postings])
+            matched = np.bincount(rows, minlength=size)
+            candidates = np.flatnonzero((matched > 0) & self.alive[:size])
+            matched = matched[candidates]
+            if assume_staples:
+                matched = matched + self.staples[candidates]
+            totals = self.totals[candidates]
+            coverage = matched / totals
+            
+            keep = coverage >= min_coverage if min_coverage else None
+            if len(candidates) > k:
+                # Everything tied with the k-th best survives; ties are broken below
+                cutoff = np.partition(coverage, len(coverage) - k)[len(coverage) - k]
+                keep = coverage >= cutoff if keep is None else keep & (coverage >= cutoff)
+            if keep is not None:
+                candidates, matched, totals, coverage = (
+                    values[keep] for values in (candidates, matched, totals, coverage))
+            
+            results = []
+            for i in np.lexsort((candidates, totals - matched, -coverage))[:k]:
+                row = candidates[i]
+                members = self._members[self._offsets[row]:self._offsets[row + 1]]
+                results.append({
+                    'recipe_id': self.ids[row],
+                    'coverage': round(float(coverage[i]), 3),
+                    'matched': int(matched[i]),
+                    'total': int(totals[i]),
+                    'missing': [self.names[code] for code in members if code not in have]
+                })
+            return results
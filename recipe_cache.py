@@ -0,0 +1,208 @@
+# recipe_cache.py - Bounded in-process cache for single-recipe lookups
+import copy
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+from bson import ObjectId
+from cachetools import TTLCache
+
+class _CountingTTLCache(TTLCache):
+    """TTLCache that counts entries dropped for size or age"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize, ttl)
+        self.evictions = 0
+    
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+    
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.evictions += len(expired)
+        return expired
+
+def _cache_key(recipe_id) -> str:
+    # One key per recipe however its hex id is cased (or passed as an ObjectId)
+    text = str(recipe_id)
+    return str(ObjectId(text)) if ObjectId.is_valid(text) else text
+
+class RecipeCache:
+    """
+    🧠 Read-through LRU + TTL cache of recipe documents
+    
+    Documents are cached by _id, and names map to ids, so invalidating an id
+    covers both lookups. Callers get a deep copy, so mutating a returned
+    Recipe never changes the cached document. A fill that raced with an
+    invalidation is dropped rather than caching a stale document.
+    """
+    
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        maxsize = int(os.getenv('RECIPE_CACHE_SIZE', '1024')) if maxsize is None else maxsize
+        ttl = float(os.getenv('RECIPE_CACHE_TTL', '300')) if ttl is None else ttl
+        self.enabled = maxsize > 0 and ttl > 0
+        self._docs = _CountingTTLCache(max(maxsize, 1), max(ttl, 0.001))
+        self._names = _CountingTTLCache(max(maxsize, 1), max(ttl, 0.001))
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get_by_id(self, recipe_id: str, load: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """
+        🔍 Cached document for an id, loading it on a miss
+        
+        Args:
+            recipe_id: Recipe id as a string
+            load: Fetches the document from the database
+        
+        Returns:
+            A private copy of the document, or None if it does not exist
+        """
+        if not self.enabled:
+            return load()
+        with self._lock:
+            doc = self._docs.get(_cache_key(recipe_id))
+            if doc is not None:
+                self.hits += 1
+                return copy.deepcopy(doc)
+            self.misses += 1
+            generation = self._generation
+        return self._fill(load(), generation)
+    
+    def get_by_name(self, name: str, load: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """🔍 Cached document for a recipe name, loading it on a miss"""
+        if not self.enabled:
+            return load()
+        with self._lock:
+            recipe_id = self._names.get(name)
+            doc = self._docs.get(recipe_id) if recipe_id else None
+            # A renamed recipe leaves a stale name entry - treat it as a miss
+            if doc is not None and doc.get('name') == name:
+                self.hits += 1
+                return copy.deepcopy(doc)
+            self.misses += 1
+            generation = self._generation
+        return self._fill(load(), generation)
+    
+    def _fill(self, doc: Optional[Dict], generation: int) -> Optional[Dict]:
+        if doc is None:
+            return None
+        with self._lock:
+            if generation == self._generation:
+                recipe_id = str(doc['_id'])
+                self._docs[recipe_id] = copy.deepcopy(doc)
+                self._names[doc['name']] = recipe_id
+        return doc
+    
+    def invalidate(self, recipe_ids: Iterable) -> None:
+        """🧹 Drop cached documents for these ids"""
+        with self._lock:
+            self._generation += 1
+            for recipe_id in recipe_ids:
+                self._docs.pop(_cache_key(recipe_id), None)
+    
+    def clear(self) -> None:
+        """🧹 Drop everything"""
+        with self._lock:
+            self._generation += 1
+            self._docs.clear()
+            self._names.clear()
+    
+    def stats(self) -> Dict:
+        """📈 Hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._docs),
+                'maxsize': self._docs.maxsize,
+                'ttl': self._docs.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self._docs.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+def canonical_filter(query) -> str:
+    """
+    🧾 Stable string form of a MongoDB filter
+    
+    Key order and the order of $and/$or/$nor clauses do not matter, so
+    equivalent filters built from differently ordered parameters share a key.
+    """
+    def canonical(value):
+        if isinstance(value, dict):
+            return {key: sorted((canonical(item) for item in clause), key=_dump)
+                    if key in ('$and', '$or', '$nor') else canonical(clause)
+                    for key, clause in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [canonical(item) for item in value]
+        return value
+    
+    return _dump(canonical(query))
+
+def _dump(value) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+class QueryCache:
+    """
+    🗂️ LRU + TTL cache of query results, tagged with a write generation
+    
+    Entries hold id lists (or small card summaries), never full documents.
+    Every write bumps the generation, which makes all older entries misses
+    at once; they then age out of the LRU.
+    """
+    
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        maxsize = int(os.getenv('QUERY_CACHE_SIZE', '256')) if maxsize is None else maxsize
+        ttl = float(os.getenv('QUERY_CACHE_TTL', '60')) if ttl is None else ttl
+        self.enabled = maxsize > 0 and ttl > 0
+        self._entries = _CountingTTLCache(max(maxsize, 1), max(ttl, 0.001))
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str):
+        """🔍 Cached value for a key, or None if missing or written since"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == self.generation:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+    
+    def put(self, key: str, value, generation: int) -> None:
+        """💾 Store a value computed while `generation` was current"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = (generation, value)
+    
+    def bump(self) -> None:
+        """⏫ Invalidate every cached result (called on each write)"""
+        with self._lock:
+            self.generation += 1
+    
+    def stats(self) -> Dict:
+        """📈 Hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'generation': self.generation,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self._entries.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
@@ -0,0 +1,90 @@
+# recipe_export.py - Incremental NDJSON / JSON serialization for exports
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, Iterator
+
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+# 📤 Supported export formats -> (content type, file extension)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'json': ('application/json', 'json'),
+}
+
+# Serialized bytes buffered before a chunk is handed to the caller
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+def json_default(value):
+    """🔄 Encode the BSON types recipes contain (ObjectId, datetime, RawBSONDocument)"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, RawBSONDocument):
+        return bson.decode(value.raw)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def json_ready(doc: Dict) -> Dict:
+    """
+    🧾 Copy of a recipe document with ObjectIds and dates as strings
+    
+    The document itself is left untouched.
+    """
+    return json.loads(json.dumps(doc, default=json_default))
+
+def serialize(docs: Iterable[Dict], format_type: str = 'ndjson', compress: bool = False,
+              chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    ✍️ Serialize documents incrementally into byte chunks
+    
+    Args:
+        docs: Recipe documents (consumed lazily)
+        format_type: 'ndjson' (one object per line) or 'json' (a single array)
+        compress: Gzip the output on the fly
+        chunk_size: Approximate size of each yielded chunk
+    
+    Yields:
+        bytes: The next piece of output
+    """
+    # Validate eagerly so callers can reject a request before streaming starts
+    if format_type not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {format_type!r}. Must be one of: {list(EXPORT_FORMATS)}")
+    return _serialize(docs, format_type, compress, chunk_size)
+
+def _serialize(docs: Iterable[Dict], format_type: str, compress: bool, chunk_size: int) -> Iterator[bytes]:
+    encoder = json.JSONEncoder(default=json_default, ensure_ascii=False)
+    gzip = zlib.compressobj(wbits=31) if compress else None  # wbits=31 -> gzip container
+    buffer = []
+    size = 0
+    
+    def pieces():
+        if format_type == 'ndjson':
+            for doc in docs:
+                yield encoder.encode(doc) + '\n'
+        else:
+            separator = '[\n'
+            for doc in docs:
+                yield separator + encoder.encode(doc)
+                separator = ',\n'
+            yield '[]\n' if separator == '[\n' else '\n]\n'
+    
+    for piece in pieces():
+        data = piece.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            chunk = b''.join(buffer)
+            buffer, size = [], 0
+            if gzip:
+                chunk = gzip.compress(chunk)
+            if chunk:
+                yield chunk
+    
+    chunk = b''.join(buffer)
+    if gzip:
+        chunk = gzip.compress(chunk) + gzip.flush()
+    if chunk:
+        yield chunk
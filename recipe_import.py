@@ -0,0 +1,269 @@
+# recipe_import.py - Streaming bulk import from NDJSON / CSV feeds
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models import Recipe
+
+# 📥 Import tuning
+IMPORT_BATCH_SIZE = 1000
+CHECKPOINT_COLLECTION = 'import_checkpoints'
+MAX_REPORTED = 100  # duplicate names / invalid rows listed in the report
+
+# CSV cells holding lists use this separator, e.g. "2 eggs|1 cup flour"
+LIST_SEPARATOR = '|'
+METADATA_FIELDS = ('cuisine', 'difficulty', 'servings', 'prep_time', 'cook_time', 'tags')
+VALID_STATUSES = ('want_to_try', 'tried', 'made_before')
+
+def detect_format(path: str) -> str:
+    """🔍 'ndjson' or 'csv' from the file extension (.gz allowed)"""
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl', '.json')):
+        return 'ndjson'
+    raise ValueError(f"Cannot tell the format of {path!r} - use .ndjson, .jsonl or .csv")
+
+def read_records(path: str, format_type: Optional[str] = None) -> Iterator:
+    """
+    📖 Stream raw records from a feed without loading it into memory
+    
+    Yields:
+        NDJSON: each non-blank line (parsed later, in the worker pool)
+        CSV: each row as a dict keyed by the header
+    """
+    format_type = format_type or detect_format(path)
+    raw = gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+    with io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as source:
+        if format_type == 'csv':
+            yield from csv.DictReader(source)
+        else:
+            for line in source:
+                if line.strip():
+                    yield line
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(LIST_SEPARATOR) if LIST_SEPARATOR in value else value.splitlines()
+    if not isinstance(value, list):
+        raise ValueError(f"Expected a list, got {type(value).__name__}")
+    return [str(item).strip() for item in value if str(item).strip()]
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in ('1', 'true', 'yes', 'y')
+
+def normalize_record(raw) -> Dict:
+    """
+    🧽 Validate and normalize one raw record into a recipe document
+    
+    Args:
+        raw: NDJSON line or CSV row dict
+    
+    Returns:
+        Dict ready for insert_many
+    
+    Raises:
+        ValueError: If the record is not a valid recipe
+    """
+    record = json.loads(raw) if isinstance(raw, str) else raw
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+    
+    name = str(record.get('name') or '').strip()
+    if not name:
+        raise ValueError("Missing name")
+    ingredients = _as_list(record.get('ingredients'))
+    instructions = _as_list(record.get('instructions'))
+    if not ingredients or not instructions:
+        raise ValueError(f"Recipe '{name}' needs ingredients and instructions")
+    
+    metadata = dict(record.get('metadata') or {})
+    for field in METADATA_FIELDS:
+        if record.get(field) not in (None, ''):
+            metadata[field] = record[field]
+    if 'tags' in metadata:
+        metadata['tags'] = _as_list(metadata['tags'])
+    if metadata.get('servings') not in (None, ''):
+        try:
+            metadata['servings'] = int(metadata['servings'])
+        except (TypeError, ValueError):
+            raise ValueError(f"Recipe '{name}' has invalid servings: {metadata['servings']!r}")
+    for field in ('created_at', 'updated_at'):
+        if isinstance(metadata.get(field), str):
+            metadata[field] = datetime.fromisoformat(metadata[field])
+    
+    status = str(record.get('status') or 'want_to_try').strip()
+    if status not in VALID_STATUSES:
+        raise ValueError(f"Recipe '{name}' has invalid status: {status!r}")
+    
+    recipe = Recipe(name, ingredients, instructions, metadata,
+                    is_favorite=_as_bool(record.get('is_favorite')), status=status)
+    return recipe.to_dict()
+
+def _normalize_batch(batch: List[Tuple[int, object]]) -> List[Tuple[int, Optional[Dict], Optional[str]]]:
+    """⚙️ Worker entry point: normalize a batch, keeping errors per record"""
+    results = []
+    for position, raw in batch:
+        try:
+            results.append((position, normalize_record(raw), None))
+        except Exception as e:
+            results.append((position, None, str(e)))
+    return results
+
+class ImportCheckpoint:
+    """
+    📍 Progress of one feed import, stored in MongoDB
+    
+    Records up to `position` have been written. The feed's size and mtime are
+    kept so a changed file starts over instead of resuming at a wrong offset.
+    """
+    
+    def __init__(self, db, path: str):
+        self.collection = db[CHECKPOINT_COLLECTION]
+        self.key = os.path.abspath(path)
+        stat = os.stat(path)
+        self.fingerprint = {"size": stat.st_size, "mtime": stat.st_mtime}
+    
+    def load(self) -> Dict:
+        """📖 Saved progress for this feed, or empty if there is nothing to resume"""
+        saved = self.collection.find_one({"_id": self.key})
+        if not saved or saved.get('completed'):
+            return {}
+        if saved.get('fingerprint') != self.fingerprint:
+            print("⚠️ Feed changed since the last run - starting from the beginning")
+            return {}
+        return saved
+    
+    def save(self, position: int, counts: Dict, completed: bool = False):
+        """💾 Record progress after a batch has been written"""
+        self.collection.replace_one(
+            {"_id": self.key},
+            {"fingerprint": self.fingerprint, "position": position, "counts": counts,
+             "completed": completed, "updated_at": datetime.now()},
+            upsert=True
+        )
+
+def import_recipes(path: str, manager=None, format_type: Optional[str] = None,
+                   batch_size: int = IMPORT_BATCH_SIZE, workers: Optional[int] = None,
+                   resume: bool = True) -> Dict:
+    """
+    🚚 Bulk import a NDJSON or CSV feed
+    
+    Records are parsed and validated in a process pool, then written with
+    unordered insert_many in batches. Duplicate names and invalid rows are
+    reported without stopping the import. Progress is checkpointed after every
+    batch, so re-running an interrupted import picks up where it stopped (a
+    batch that was in flight is retried; its already-written rows come back
+    as duplicates).
+    
+    Args:
+        path: Feed file (.ndjson/.jsonl/.csv, optionally .gz)
+        manager: RecipeManager to write through (defaults to the shared one)
+        format_type: 'ndjson' or 'csv' (detected from the extension by default)
+        batch_size: Records per insert_many
+        workers: Validation processes (default: CPU count, 1 = no pool)
+        resume: Continue from the last checkpoint for this feed
+    
+    Returns:
+        Dict report with counts, duplicate names and invalid rows
+    """
+    if manager is None:
+        from recipe_manager import get_recipe_manager
+        manager = get_recipe_manager()
+    if manager.collection is None:
+        raise RuntimeError("❌ Database not connected!")
+    
+    checkpoint = ImportCheckpoint(manager.collection.database, path)
+    saved = checkpoint.load() if resume else {}
+    skip = saved.get('position', 0)
+    counts = dict({"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0}, **saved.get('counts', {}))
+    report = {"duplicate_names": [], "invalid_rows": [], "resumed_from": skip, "interrupted": False}
+    if skip:
+        print(f"⏩ Resuming {path} after record {skip}")
+    
+    def batches():
+        batch = []
+        for position, raw in enumerate(read_records(path, format_type), start=1):
+            if position <= skip:
+                continue
+            batch.append((position, raw))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending = deque()
+    progress = {"position": skip, "read": 0}
+    start = time.perf_counter()
+    
+    def write(results):
+        docs = [doc for _, doc, _ in results if doc is not None]
+        for position, _, error in results:
+            if error is not None and len(report['invalid_rows']) < MAX_REPORTED:
+                report['invalid_rows'].append((position, error))
+        outcome = manager.insert_documents(docs)
+        
+        counts['read'] += len(results)
+        counts['invalid'] += len(results) - len(docs) + len(outcome['errors'])
+        counts['inserted'] += outcome['inserted']
+        counts['duplicates'] += len(outcome['duplicates'])
+        room = MAX_REPORTED - len(report['duplicate_names'])
+        report['duplicate_names'].extend(outcome['duplicates'][:max(room, 0)])
+        
+        progress['position'] = results[-1][0]
+        progress['read'] += len(results)
+        checkpoint.save(progress['position'], counts)
+        rate = progress['read'] / max(time.perf_counter() - start, 1e-9)
+        print(f"📥 {counts['read']} read, {counts['inserted']} inserted, {counts['duplicates']} duplicates, "
+              f"{counts['invalid']} invalid ({rate:.0f} records/s)")
+    
+    try:
+        for batch in batches():
+            if pool is None:
+                write(_normalize_batch(batch))
+                continue
+            # Keep a bounded window of batches in flight, written in feed order
+            pending.append(pool.submit(_normalize_batch, batch))
+            if len(pending) >= workers * 2:
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+        checkpoint.save(progress['position'], counts, completed=True)
+    except KeyboardInterrupt:
+        report['interrupted'] = True
+        print("\n⏸️ Import interrupted - run it again to resume")
+    finally:
+        if pool is not None:
+            # Drop batches not started yet (shutdown's cancel_futures needs Python 3.9)
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+    
+    report.update(counts)
+    if not report['interrupted']:
+        print(f"🎉 Imported {counts['inserted']} recipes from {path} "
+              f"({counts['duplicates']} duplicates, {counts['invalid']} invalid)")
+    return report
+
+if __name__ == "__main__":
+    # Usage: python recipe_import.py <feed.ndjson|feed.csv> [batch_size] [workers]
+    if len(sys.argv) < 2:
+        print("❌ Usage: python recipe_import.py <feed.ndjson|feed.csv> [batch_size] [workers]")
+        sys.exit(1)
+    import_recipes(sys.argv[1], batch_size=int(sys.argv[2]) if len(sys.argv) > 2 else IMPORT_BATCH_SIZE,
+                   workers=int(sys.argv[3]) if len(sys.argv) > 3 else None)
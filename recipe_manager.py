@@ -1,28 +1,153 @@
 # recipe_manager.py
-from typing import List, Optional, Dict
+import asyncio
+import base64
+import copy
+import functools
+import importlib
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Dict
 from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
 from pymongo.collection import Collection
-from pymongo.errors import DuplicateKeyError, PyMongoError
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 
+from change_watcher import ChangeWatcher
 from database import db_connection
-from models import Recipe
+from migrations import check_schema_version
+from models import Recipe, RecipePage, RecipeSummary, RecipeView, document_id
+from recipe_cache import QueryCache, RecipeCache, canonical_filter
+from recipe_export import json_ready, serialize
+from recipe_parsing import INGREDIENT_KEYS_FIELD, parse_ingredient
+from recipe_stats import (STATS_PROJECTION, STATUSES, StatsStore, build_stats, by_count_then_name,
+                          decode_key, tally)
+from search_index import SearchIndex, tokenize
+
+# 📄 Keyset pagination defaults
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# 🩺 Filter shapes advanced_search serves most; each must be answered from an index
+COMMON_SEARCHES = [
+    {'cuisine': 'Italian'},
+    {'cuisine': 'Italian', 'difficulty': 'easy'},
+    {'cuisine': 'Italian', 'difficulty': 'easy', 'min_servings': 2, 'max_servings': 6},
+    {'cuisine': 'Italian', 'min_servings': 4},
+    {'difficulty': 'easy'},
+    {'difficulty': 'easy', 'max_servings': 4},
+    {'min_servings': 2, 'max_servings': 4},
+    {'status': 'tried'},
+    {'is_favorite': True},
+    {'is_favorite': True, 'cuisine': 'Italian'},
+    {'status': 'want_to_try', 'difficulty': 'easy'},
+    {'ingredient_query': 'garlic'},
+    {'ingredient_query': 'olive oil', 'cuisine': 'Italian'},
+    {'max_total_minutes': 30},
+    {'cuisine': 'Italian', 'max_total_minutes': 30},
+    {'cuisine': 'Italian', 'sort_by_time': True},
+]
+
+# ⏱️ Numeric total cooking time, stored at write time (see recipe_parsing)
+TIME_FIELD = "metadata.total_minutes"
+# Quickest first, _id breaks ties - matches the (.., total_minutes, _id) indexes
+TIME_SORT = [(TIME_FIELD, 1), ("_id", 1)]
+
+# 📦 Mutations accepted by apply_batch
+BATCH_OPERATIONS = ('toggle_favorite', 'set_favorite', 'update_status', 'add_tags', 'remove_tags', 'delete')
+MAX_BATCH_SIZE = 500
+# Read + bulk_write rounds before an operation that keeps losing races is reported
+BATCH_ATTEMPTS = 3
+# Fields apply_batch reads, reports from and requires unchanged when it writes
+BATCH_PROJECTION = {**STATS_PROJECTION, "name": 1, "metadata.tags": 1}
+
+# 🔎 Fields the full-text index reads
+SEARCH_PROJECTION = {"name": 1, "ingredients": 1, "instructions": 1, "metadata.tags": 1}
+
+# 🃏 Server-side projection for recipe cards: counts instead of full arrays
+SUMMARY_PROJECTION = {
+    "name": 1,
+    "is_favorite": 1,
+    "status": 1,
+    "metadata.cuisine": 1,
+    "metadata.difficulty": 1,
+    "metadata.servings": 1,
+    "ingredients_count": {"$size": {"$ifNull": ["$ingredients", []]}},
+    "instructions_count": {"$size": {"$ifNull": ["$instructions", []]}}
+}
+
+def _encode_cursor(direction: str, recipe_id) -> str:
+    """🔐 Build an opaque page cursor ('n' = after, 'p' = before the given _id)"""
+    return base64.urlsafe_b64encode(f"{direction}:{recipe_id}".encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor: str):
+    """🔓 Decode a page cursor into (direction, ObjectId)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, recipe_id = base64.urlsafe_b64decode(padded).decode().split(':', 1)
+        if direction not in ('n', 'p'):
+            raise ValueError(direction)
+        return direction, ObjectId(recipe_id)
+    except Exception:
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
 
 class RecipeManager:
     def __init__(self):
         """🎯 Initialize Recipe Manager with MongoDB connection"""
         self.collection_name = 'recipes'
         self.collection: Optional[Collection] = None
+        # 🔎 Full-text index, built in the background (searches use regex until it is ready)
+        self.search_index = SearchIndex()
+        self._search_index_ready = False
+        self._search_index_lock = threading.Lock()
+        self._search_index_thread: Optional[threading.Thread] = None
+        # Bumped by every reset, so a build that started before it runs again
+        self._search_index_generation = 0
+        # Recipes written while a build runs, re-read once it finishes
+        self._search_index_pending = set()
+        self.stats_store: Optional[StatsStore] = None
+        # 🧠 Hot single-recipe lookups are served from memory; writes invalidate them
+        self.cache = RecipeCache()
+        # 🗂️ Repeated searches reuse their id lists until the next write
+        self.query_cache = QueryCache()
+        # 👀 Follows writes made by other processes (see watch_changes)
+        self.change_watcher: Optional[ChangeWatcher] = None
+        # 🧾 Opt-in: list, search and export cursors return RawBSONDocument (decoded on first read)
+        self.raw_reads = os.getenv('RAW_BSON_READS', '0') == '1'
+        # 🧮 Opt-in: answer structured advanced_search filters from a columnar snapshot (needs NumPy)
+        self.use_snapshot = os.getenv('CATALOG_SNAPSHOT', '0') == '1'
+        self.snapshot = None
+        self._snapshot_lock = threading.Lock()
+        # 🥫 Posting-list index for find_by_pantry, built on first use (needs NumPy)
+        self.pantry_index = None
+        # 🧲 MinHash/LSH index for similar_recipes, built on first use (needs NumPy)
+        self.similarity_index = None
+        # In-memory indexes whose module failed to import - not retried on every request
+        self._unavailable_indexes = set()
         self._connect_to_db()
     
     def _connect_to_db(self):
         """🔌 Establish database connection"""
         if db_connection.connect():
             self.collection = db_connection.get_collection(self.collection_name)
-            # 📇 Create index on recipe name for faster searches
-            self.collection.create_index("name", unique=True)
-            # 📇 Create indexes for favorite and status filtering
-            self.collection.create_index("is_favorite")
-            self.collection.create_index("status")
+            self.stats_store = StatsStore(db_connection.db)
+            # 📇 Indexes are built by `python start.py migrate`; only check the version here
+            check_schema_version(db_connection.db)
+    
+    def ensure_connected(self) -> bool:
+        """
+        🔌 Retry the database connection if it failed earlier (e.g. MongoDB was down at startup)
+        
+        Returns:
+            bool: True if the manager has a collection to work with
+        """
+        if self.collection is None:
+            self._connect_to_db()
+        return self.collection is not None
     
     def add_recipe(self, recipe: Recipe) -> str:
         """
@@ -30,13 +155,16 @@ class RecipeManager:
         
         Args:
             recipe: Recipe object to add
-            
+        
         Returns:
             str: ID of the inserted recipe
         """
         try:
             recipe_dict = recipe.to_dict()
             result = self.collection.insert_one(recipe_dict)
+            self._index_document(result.inserted_id, recipe_dict)
+            self._invalidate([result.inserted_id])
+            self.stats_store.record(after=recipe_dict)
             print(f"✅ Recipe '{recipe.name}' added successfully!")
             return str(result.inserted_id)
         
@@ -48,56 +176,110 @@ class RecipeManager:
             print(f"❌ Database error: {e}")
             raise
     
-    def get_recipe_by_id(self, recipe_id: str) -> Optional[Recipe]:
+    def insert_documents(self, docs: List[Dict]) -> Dict:
+        """
+        📥 Insert many recipe documents with one unordered insert_many
+        
+        Unique-name collisions are reported instead of aborting the batch.
+        
+        Args:
+            docs: Recipe documents (an _id is assigned to each in place)
+        
+        Returns:
+            Dict with "inserted" (count), "duplicates" (names) and
+            "errors" (list of (position, message) for other failures)
+        """
+        outcome = {"inserted": 0, "duplicates": [], "errors": []}
+        if not docs:
+            return outcome
+        
+        failed = {}
+        try:
+            self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            failed = {err['index']: err for err in e.details.get('writeErrors', [])}
+        
+        for position, err in sorted(failed.items()):
+            if err.get('code') == 11000:
+                outcome["duplicates"].append(docs[position].get('name'))
+            else:
+                outcome["errors"].append((position, err.get('errmsg', 'Write failed')))
+        
+        inserted = [doc for position, doc in enumerate(docs) if position not in failed]
+        self._invalidate(doc['_id'] for doc in inserted)
+        for doc in inserted:
+            self._index_document(doc['_id'], doc)
+        self.stats_store.record_many((None, doc) for doc in inserted)
+        outcome["inserted"] = len(inserted)
+        return outcome
+    
+    def add_recipes(self, recipes: List[Recipe]) -> Dict:
+        """
+        ➕ Add many recipes in one round trip
+        
+        Args:
+            recipes: Recipe objects to add
+        
+        Returns:
+            Dict as returned by insert_documents
+        """
+        outcome = self.insert_documents([recipe.to_dict() for recipe in recipes])
+        print(f"✅ Added {outcome['inserted']} recipes")
+        for name in outcome["duplicates"]:
+            print(f"⚠️ Skipped {name}: Recipe '{name}' already exists!")
+        return outcome
+    
+    def get_recipe_by_id(self, recipe_id: str) -> Optional[RecipeView]:
         """
         🔍 Get recipe by MongoDB ObjectId
         
         Args:
             recipe_id: String representation of ObjectId
-            
+        
         Returns:
-            Recipe object or None if not found
+            RecipeView or None if not found
         """
         try:
-            result = self.collection.find_one({"_id": ObjectId(recipe_id)})
+            object_id = ObjectId(recipe_id)
+            result = self.cache.get_by_id(str(object_id), lambda: self.collection.find_one({"_id": object_id}))
             if result:
-                return Recipe.from_dict(result)
+                return RecipeView.from_dict(result)
             return None
         
         except Exception as e:
             print(f"❌ Error fetching recipe: {e}")
             return None
     
-    def get_recipe_by_name(self, name: str) -> Optional[Recipe]:
+    def get_recipe_by_name(self, name: str) -> Optional[RecipeView]:
         """
         🔍 Get recipe by name
         
         Args:
             name: Recipe name
-            
+        
         Returns:
-            Recipe object or None if not found
+            RecipeView or None if not found
         """
         try:
-            result = self.collection.find_one({"name": name})
+            result = self.cache.get_by_name(name, lambda: self.collection.find_one({"name": name}))
             if result:
-                return Recipe.from_dict(result)
+                return RecipeView.from_dict(result)
             return None
         
         except Exception as e:
             print(f"❌ Error fetching recipe: {e}")
             return None
     
-    def get_all_recipes(self) -> List[Recipe]:
+    def get_all_recipes(self) -> List[RecipeView]:
         """
         📋 Get all recipes from database
         
         Returns:
-            List of Recipe objects
+            List of RecipeView objects
         """
         try:
-            results = self.collection.find()
-            return [Recipe.from_dict(doc) for doc in results]
+            results = self._reader().find()
+            return [RecipeView.from_dict(doc) for doc in results]
         
         except Exception as e:
             print(f"❌ Error fetching recipes: {e}")
@@ -109,12 +291,14 @@ class RecipeManager:
         
         Args:
             recipe_id: ID of recipe to update
-            updated_recipe: Updated Recipe object
-            
+            updated_recipe: Updated Recipe object (a RecipeView is saved as-is)
+        
         Returns:
             bool: True if successful, False otherwise
         """
         try:
+            if isinstance(updated_recipe, RecipeView):
+                updated_recipe = updated_recipe.to_recipe()
             updated_recipe.update_timestamp()
             update_dict = updated_recipe.to_dict()
             
@@ -122,12 +306,17 @@ class RecipeManager:
             if '_id' in update_dict:
                 del update_dict['_id']
             
-            result = self.collection.update_one(
+            # Fetch the previous stats fields in the same round trip
+            before = self.collection.find_one_and_update(
                 {"_id": ObjectId(recipe_id)},
-                {"$set": update_dict}
+                {"$set": update_dict},
+                projection=STATS_PROJECTION
             )
+            self._invalidate([recipe_id])
             
-            if result.modified_count > 0:
+            if before is not None:
+                self._index_document(recipe_id, update_dict)
+                self.stats_store.record(before, update_dict)
                 print(f"✅ Recipe updated successfully!")
                 return True
             else:
@@ -144,14 +333,20 @@ class RecipeManager:
         
         Args:
             recipe_id: ID of recipe to delete
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            result = self.collection.delete_one({"_id": ObjectId(recipe_id)})
+            deleted = self.collection.find_one_and_delete(
+                {"_id": ObjectId(recipe_id)},
+                projection=STATS_PROJECTION
+            )
+            self._invalidate([recipe_id])
             
-            if result.deleted_count > 0:
+            if deleted is not None:
+                self._unindex_document(recipe_id)
+                self.stats_store.record(before=deleted)
                 print(f"✅ Recipe deleted successfully!")
                 return True
             else:
@@ -162,253 +357,897 @@ class RecipeManager:
             print(f"❌ Error deleting recipe: {e}")
             return False
     
-    def search_recipes(self, query: str) -> List[Recipe]:
+    def _invalidate(self, recipe_ids: Iterable = ()):
+        """🧹 After a write: drop cached copies of these recipes and expire cached query results"""
+        recipe_ids = list(recipe_ids)
+        self.cache.invalidate(recipe_ids)
+        self.query_cache.bump()
+        for index in (self.snapshot, self.pantry_index, self.similarity_index):
+            if index is not None:
+                index.touch(ObjectId(str(recipe_id)) for recipe_id in recipe_ids)
+    
+    def apply_external_changes(self, recipe_ids: Optional[List] = None):
         """
-        🔎 Search recipes by name or ingredients
+        🔄 Bring in-process caches up to date with writes seen by the change watcher
         
         Args:
-            query: Search term
-            
+            recipe_ids: Changed recipe ids, or None if anything may have changed
+        """
+        if recipe_ids is None:
+            self.cache.clear()
+            self.query_cache.bump()
+            self.reset_search_index()
+            for index in (self.snapshot, self.pantry_index, self.similarity_index):
+                if index is not None:
+                    index.reset()
+            return
+        
+        self._invalidate(recipe_ids)
+        if self._search_index_writable(recipe_ids):
+            self._reindex(self.search_index, recipe_ids)
+    
+    def watch_changes(self, mode: Optional[str] = None) -> Optional[ChangeWatcher]:
+        """
+        👀 Start invalidating caches on writes from any process (idempotent)
+        
+        Args:
+            mode: 'auto', 'stream', 'poll' or 'off' (default: CHANGE_WATCHER env var)
+        
+        Returns:
+            The running ChangeWatcher, or None if not connected
+        """
+        if self.collection is None:
+            return None
+        if self.change_watcher is None:
+            self.change_watcher = ChangeWatcher(self.collection, self.collection_name, mode=mode)
+            self.change_watcher.register(self.apply_external_changes)
+            self.change_watcher.start()
+        return self.change_watcher
+    
+    def _reader(self, raw: Optional[bool] = None) -> Collection:
+        """
+        📖 Collection to run list queries on
+        
+        With raw reads, documents come back as RawBSONDocument: the cursor keeps
+        the BSON bytes and a document is decoded only once something reads it.
+        That saves the decode for documents that are fetched but never read;
+        a document that is read costs the same as without raw reads.
+        
+        Args:
+            raw: Override the manager's raw_reads setting
+        """
+        if not (self.raw_reads if raw is None else raw):
+            return self.collection
+        codec_options = self.collection.codec_options.with_options(document_class=RawBSONDocument)
+        return self.collection.with_options(codec_options=codec_options)
+    
+    def _fetch_by_ids(self, ids: List[ObjectId], summary: bool = False) -> List[Dict]:
+        """📥 Fetch documents (or summary cards) for ids with one $in query, keeping the id order"""
+        if not ids:
+            return []
+        id_filter = {"_id": {"$in": list(ids)}}
+        found = self._find_summaries(id_filter) if summary else self._reader().find(id_filter)
+        docs = {document_id(doc): doc for doc in found}
+        return [docs[recipe_id] for recipe_id in ids if recipe_id in docs]
+    
+    def _cached_docs(self, key: str, load: Callable[[], List[Dict]], summary: bool = False) -> List[Dict]:
+        """
+        🗂️ Run a query through the result cache
+        
+        A cached id list costs one $in fetch; cached summary cards cost nothing.
+        
+        Args:
+            key: Canonical cache key for the query
+            load: Runs the query on a miss
+            summary: Documents are summary cards
+        
+        Returns:
+            Matching documents in result order
+        """
+        generation = self.query_cache.generation
+        if summary:
+            cards = self.query_cache.get(f"{key}|cards")
+            if cards is not None:
+                return copy.deepcopy(cards)
+        
+        ids = self.query_cache.get(key)
+        if ids is not None:
+            docs = self._fetch_by_ids(ids, summary)
+        else:
+            docs = load()
+            self.query_cache.put(key, [document_id(doc) for doc in docs], generation)
+        
+        if summary:
+            self.query_cache.put(f"{key}|cards", copy.deepcopy(docs), generation)
+        return docs
+    
+    def start_search_index_build(self) -> bool:
+        """
+        🏗️ Build the full-text index on a background thread (idempotent)
+        
+        Servers call this at startup; until the build finishes searches fall back
+        to a regex query, and recipes written meanwhile are re-read at the end.
+        
+        Returns:
+            bool: True if the index is ready now
+        """
+        with self._search_index_lock:
+            if self._search_index_ready or self.collection is None:
+                return self._search_index_ready
+            if self._search_index_thread is None:
+                self._search_index_thread = threading.Thread(target=self._build_search_index,
+                                                             name='search-index', daemon=True)
+                self._search_index_thread.start()
+            return False
+    
+    def reset_search_index(self):
+        """🧹 Rebuild the full-text index in the background (e.g. after unknown external writes)"""
+        with self._search_index_lock:
+            self._search_index_ready = False
+            self._search_index_generation += 1
+            self._search_index_pending.clear()
+        self.start_search_index_build()
+    
+    def _build_search_index(self):
+        try:
+            while True:
+                with self._search_index_lock:
+                    generation = self._search_index_generation
+                count = self.search_index.build(self.collection.find({}, SEARCH_PROJECTION))
+                # Replay writes made during the build until none are left
+                while True:
+                    with self._search_index_lock:
+                        if generation != self._search_index_generation:
+                            break
+                        pending, self._search_index_pending = list(self._search_index_pending), set()
+                        if not pending:
+                            self._search_index_ready = True
+                            self._search_index_thread = None
+                            print(f"🔎 Search index built over {count} recipes")
+                            return
+                    self._reindex(self.search_index, pending)
+        except Exception as e:
+            print(f"❌ Error building search index: {e}")
+            with self._search_index_lock:
+                # The next search tries again
+                self._search_index_thread = None
+    
+    def _reindex(self, index: SearchIndex, recipe_ids: Iterable):
+        """🔁 Re-read recipes into the full-text index, dropping the ones that no longer exist"""
+        recipe_ids = [ObjectId(str(recipe_id)) for recipe_id in recipe_ids]
+        found = {doc['_id']: doc for doc in self.collection.find({"_id": {"$in": recipe_ids}}, SEARCH_PROJECTION)}
+        for recipe_id in recipe_ids:
+            if recipe_id in found:
+                index.add_document(recipe_id, found[recipe_id])
+            else:
+                index.remove_document(recipe_id)
+    
+    def _search_index_writable(self, recipe_ids: Iterable) -> bool:
+        """True if the index is built; otherwise remembers the ids for a build in progress"""
+        with self._search_index_lock:
+            if not self._search_index_ready and self._search_index_thread is not None:
+                self._search_index_pending.update(recipe_ids)
+            return self._search_index_ready
+    
+    def _index_document(self, recipe_id, recipe_dict: Dict):
+        """🔎 Keep the full-text index in step with a write"""
+        if self._search_index_writable([recipe_id]):
+            self.search_index.add_document(recipe_id, recipe_dict)
+    
+    def _unindex_document(self, recipe_id):
+        """🔎 Drop a deleted recipe from the full-text index"""
+        if self._search_index_writable([recipe_id]):
+            self.search_index.remove_document(recipe_id)
+    
+    def _regex_search(self, query: str, limit: int, summary: bool) -> List[Dict]:
+        """🐢 Name / ingredient regex search, used while the full-text index is being built"""
+        pattern = {"$regex": re.escape(query.strip()), "$options": "i"}
+        search_filter = {"$or": [{"name": pattern}, {"ingredients": pattern}]}
+        if summary:
+            return self._find_summaries(search_filter, limit=limit)
+        return list(self._reader().find(search_filter).limit(limit))
+    
+    def search_recipes(self, query: str, limit: int = 50, summary: bool = False) -> List[RecipeView]:
+        """
+        🔎 Search recipes by name, ingredients, tags or instructions
+        
+        Args:
+            query: Search term(s)
+            limit: Maximum number of results
+            summary: Return RecipeSummary cards instead of full recipes
+        
         Returns:
-            List of matching Recipe objects
+            List of matching RecipeView objects, best match first
         """
         try:
-            # Search in name and ingredients using regex
-            search_filter = {
-                "$or": [
-                    {"name": {"$regex": query, "$options": "i"}},
-                    {"ingredients": {"$regex": query, "$options": "i"}}
-                ]
-            }
+            terms = sorted(set(tokenize(query)))
+            if not terms:
+                return []
+            
+            def load():
+                ranked = self.search_index.search(query, k=limit)
+                return self._fetch_by_ids([ObjectId(doc_id) for doc_id, _ in ranked], summary)
             
-            results = self.collection.find(search_filter)
-            return [Recipe.from_dict(doc) for doc in results]
+            if self.start_search_index_build():
+                # Queries that tokenize the same ("Tomatoes, basil" / "basil tomato") share an entry
+                docs = self._cached_docs(f"search:{limit}:{' '.join(terms)}", load, summary)
+            else:
+                # Not cached: the ranked results replace these once the index is ready
+                docs = self._regex_search(query, limit, summary)
+            model = RecipeSummary if summary else RecipeView
+            return [model.from_dict(doc) for doc in docs]
         
         except Exception as e:
             print(f"❌ Error searching recipes: {e}")
             return []
     
-    def toggle_favorite(self, recipe_id: str) -> bool:
+    def toggle_favorite(self, recipe_id: str) -> Optional[Dict]:
         """
-        ❤️ Toggle favorite status of a recipe
+        ❤️ Toggle favorite status of a recipe in one atomic round trip
         
         Args:
             recipe_id: ID of recipe to toggle
-            
+        
         Returns:
-            bool: True if successful, False otherwise
+            Dict with the updated fields (recipe_id, is_favorite, updated_at),
+            None if the recipe was not found
         """
         try:
-            recipe = self.get_recipe_by_id(recipe_id)
-            if not recipe:
-                return False
-            
-            # Toggle favorite status
-            recipe.is_favorite = not recipe.is_favorite
-            recipe.update_timestamp()
-            
-            # Update in database
-            result = self.collection.update_one(
-                {"_id": ObjectId(recipe_id)}, 
-                {"$set": {
-                    "is_favorite": recipe.is_favorite, 
-                    "metadata.updated_at": recipe.metadata['updated_at']
-                }}
+            updated_at = datetime.now()
+            # Flip the flag server-side, so concurrent toggles never read a stale value
+            doc = self.collection.find_one_and_update(
+                {"_id": ObjectId(recipe_id)},
+                [{"$set": {
+                    "is_favorite": {"$not": [{"$eq": ["$is_favorite", True]}]},
+                    "metadata.updated_at": updated_at
+                }}],
+                projection={"is_favorite": 1},
+                return_document=ReturnDocument.AFTER
             )
+            self._invalidate([recipe_id])
             
-            if result.modified_count > 0:
-                status = "added to" if recipe.is_favorite else "removed from"
-                print(f"✅ Recipe {status} favorites!")
-                return True
-            return False
+            if doc is None:
+                return None
             
+            is_favorite = doc['is_favorite']
+            self.stats_store.record_favorite(not is_favorite, is_favorite)
+            status = "added to" if is_favorite else "removed from"
+            print(f"✅ Recipe {status} favorites!")
+            return {"recipe_id": recipe_id, "is_favorite": is_favorite, "updated_at": updated_at}
+        
         except Exception as e:
             print(f"❌ Error toggling favorite: {e}")
-            return False
+            return None
     
-    def update_recipe_status(self, recipe_id: str, new_status: str) -> bool:
+    def update_recipe_status(self, recipe_id: str, new_status: str) -> Optional[Dict]:
         """
-        📝 Update recipe status (want_to_try, tried, made_before)
+        📝 Update recipe status (want_to_try, tried, made_before) in one atomic round trip
         
         Args:
             recipe_id: ID of recipe to update
             new_status: New status value
-            
+        
         Returns:
-            bool: True if successful, False otherwise
+            Dict with the updated fields (recipe_id, status, updated_at),
+            None if the status is invalid or the recipe was not found
         """
         try:
             valid_statuses = ['want_to_try', 'tried', 'made_before']
             if new_status not in valid_statuses:
                 print(f"❌ Invalid status. Must be one of: {valid_statuses}")
-                return False
-            
-            recipe = self.get_recipe_by_id(recipe_id)
-            if not recipe:
-                return False
-            
-            recipe.status = new_status
-            recipe.update_timestamp()
+                return None
             
-            # Update in database
-            result = self.collection.update_one(
-                {"_id": ObjectId(recipe_id)}, 
+            updated_at = datetime.now()
+            # Return the previous status so the stats move by exactly this change
+            before = self.collection.find_one_and_update(
+                {"_id": ObjectId(recipe_id)},
                 {"$set": {
-                    "status": new_status, 
-                    "metadata.updated_at": recipe.metadata['updated_at']
-                }}
+                    "status": new_status,
+                    "metadata.updated_at": updated_at
+                }},
+                projection={"status": 1},
+                return_document=ReturnDocument.BEFORE
             )
+            self._invalidate([recipe_id])
             
-            if result.modified_count > 0:
-                print(f"✅ Recipe status updated to: {recipe.get_status_text()}")
-                return True
-            return False
+            if before is None:
+                return None
             
+            self.stats_store.record_status(before.get('status'), new_status)
+            print(f"✅ Recipe status updated to: {new_status}")
+            return {"recipe_id": recipe_id, "status": new_status, "updated_at": updated_at}
+        
         except Exception as e:
             print(f"❌ Error updating status: {e}")
-            return False
+            return None
     
-    def get_favorite_recipes(self) -> List[Recipe]:
+    def get_favorite_recipes(self) -> List[RecipeView]:
         """
         ❤️ Get all favorite recipes
         
         Returns:
-            List of favorite Recipe objects
+            List of favorite RecipeView objects
         """
         try:
-            results = self.collection.find({"is_favorite": True})
-            return [Recipe.from_dict(doc) for doc in results]
+            results = self._reader().find({"is_favorite": True})
+            return [RecipeView.from_dict(doc) for doc in results]
         except Exception as e:
             print(f"❌ Error fetching favorites: {e}")
             return []
     
-    def get_recipes_by_status(self, status: str) -> List[Recipe]:
+    def get_recipes_by_status(self, status: str) -> List[RecipeView]:
         """
         📊 Get recipes filtered by status
         
         Args:
             status: Status to filter by ('want_to_try', 'tried', 'made_before')
-            
+        
         Returns:
-            List of matching Recipe objects
+            List of matching RecipeView objects
         """
         try:
-            results = self.collection.find({"status": status})
-            return [Recipe.from_dict(doc) for doc in results]
+            results = self._reader().find({"status": status})
+            return [RecipeView.from_dict(doc) for doc in results]
         except Exception as e:
             print(f"❌ Error fetching recipes by status: {e}")
             return []
     
-    def get_recipes_by_metadata(self, metadata_key: str, metadata_value) -> List[Recipe]:
+    def get_recipes_by_metadata(self, metadata_key: str, metadata_value) -> List[RecipeView]:
         """
         🏷️ Get recipes filtered by metadata
         
         Args:
             metadata_key: Key in metadata dict
             metadata_value: Value to match
-            
+        
         Returns:
-            List of matching Recipe objects
+            List of matching RecipeView objects
         """
         try:
             filter_dict = {f"metadata.{metadata_key}": metadata_value}
-            results = self.collection.find(filter_dict)
-            return [Recipe.from_dict(doc) for doc in results]
+            results = self._reader().find(filter_dict)
+            return [RecipeView.from_dict(doc) for doc in results]
         
         except Exception as e:
             print(f"❌ Error filtering recipes: {e}")
             return []
     
-    def get_recipes_by_cuisine(self, cuisine: str) -> List[Recipe]:
+    def get_recipes_by_cuisine(self, cuisine: str) -> List[RecipeView]:
         """
         🌍 Get recipes by cuisine type
         
         Args:
             cuisine: Cuisine to filter by
-            
+        
         Returns:
-            List of matching Recipe objects
+            List of matching RecipeView objects
         """
         return self.get_recipes_by_metadata("cuisine", cuisine)
     
-    def get_recipes_by_difficulty(self, difficulty: str) -> List[Recipe]:
+    def get_recipes_by_difficulty(self, difficulty: str) -> List[RecipeView]:
         """
         ⭐ Get recipes by difficulty level
         
         Args:
             difficulty: Difficulty level ('easy', 'medium', 'hard')
-            
+        
         Returns:
-            List of matching Recipe objects
+            List of matching RecipeView objects
         """
         return self.get_recipes_by_metadata("difficulty", difficulty)
     
-    def get_recipe_stats(self) -> Dict:
+    def _find_summaries(self, query: Dict, sort: Optional[List] = None, limit: int = 0) -> List[Dict]:
+        """🃏 Run a query returning projected card documents instead of full recipes"""
+        pipeline = [{"$match": query}]
+        if sort:
+            pipeline.append({"$sort": dict(sort)})
+        if limit:
+            pipeline.append({"$limit": limit})
+        pipeline.append({"$project": SUMMARY_PROJECTION})
+        return list(self._reader().aggregate(pipeline))
+    
+    def get_recipe_summaries(self, query: Optional[Dict] = None) -> List[RecipeSummary]:
+        """
+        🃏 Get lightweight recipe cards matching a filter
+        
+        Args:
+            query: Optional MongoDB filter
+        
+        Returns:
+            List of RecipeSummary objects
+        """
+        try:
+            return [RecipeSummary.from_dict(doc) for doc in self._find_summaries(query or {})]
+        except Exception as e:
+            print(f"❌ Error fetching recipe summaries: {e}")
+            return []
+    
+    def get_recipes_page(self, query: Optional[Dict] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                         cursor: Optional[str] = None, summary: bool = False) -> RecipePage:
+        """
+        📄 Get one page of recipes using keyset pagination on _id
+        
+        Args:
+            query: Optional MongoDB filter
+            page_size: Number of recipes per page (capped at MAX_PAGE_SIZE)
+            cursor: Opaque cursor from a previous page, None for the first page
+            summary: Return RecipeSummary cards (projected server-side) instead of full recipes
+        
+        Returns:
+            RecipePage with the recipes and next/prev cursors
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        direction, boundary = _decode_cursor(cursor) if cursor else ('n', None)
+        
+        page_filter = dict(query or {})
+        if boundary is not None:
+            page_filter["_id"] = {"$gt" if direction == 'n' else "$lt": boundary}
+        
+        try:
+            # Fetch one extra document to learn whether another page exists
+            sort = [("_id", 1 if direction == 'n' else -1)]
+            if summary:
+                docs = self._find_summaries(page_filter, sort, page_size + 1)
+            else:
+                docs = list(self._reader().find(page_filter).sort(sort).limit(page_size + 1))
+        except Exception as e:
+            print(f"❌ Error fetching recipe page: {e}")
+            return RecipePage([], page_size=page_size)
+        
+        has_more = len(docs) > page_size
+        docs = docs[:page_size]
+        if direction == 'p':
+            docs.reverse()
+        
+        model = RecipeSummary if summary else RecipeView
+        items = [model.from_dict(doc) for doc in docs]
+        if not items:
+            return RecipePage([], page_size=page_size)
+        
+        if direction == 'n':
+            next_cursor = _encode_cursor('n', document_id(docs[-1])) if has_more else None
+            prev_cursor = _encode_cursor('p', document_id(docs[0])) if boundary is not None else None
+        else:
+            next_cursor = _encode_cursor('n', document_id(docs[-1]))
+            prev_cursor = _encode_cursor('p', document_id(docs[0])) if has_more else None
+        
+        return RecipePage(items, next_cursor, prev_cursor, page_size)
+    
+    def get_all_recipes_page(self, page_size: int = DEFAULT_PAGE_SIZE,
+                             cursor: Optional[str] = None, summary: bool = False) -> RecipePage:
+        """📋 Get one page of all recipes"""
+        return self.get_recipes_page({}, page_size, cursor, summary)
+    
+    def get_favorite_recipes_page(self, page_size: int = DEFAULT_PAGE_SIZE,
+                                  cursor: Optional[str] = None, summary: bool = False) -> RecipePage:
+        """❤️ Get one page of favorite recipes"""
+        return self.get_recipes_page({"is_favorite": True}, page_size, cursor, summary)
+    
+    def get_recipes_by_status_page(self, status: str, page_size: int = DEFAULT_PAGE_SIZE,
+                                   cursor: Optional[str] = None, summary: bool = False) -> RecipePage:
+        """📊 Get one page of recipes with the given status"""
+        return self.get_recipes_page({"status": status}, page_size, cursor, summary)
+    
+    def get_recipes_by_metadata_page(self, metadata_key: str, metadata_value,
+                                     page_size: int = DEFAULT_PAGE_SIZE,
+                                     cursor: Optional[str] = None, summary: bool = False) -> RecipePage:
+        """🏷️ Get one page of recipes filtered by a metadata field"""
+        return self.get_recipes_page({f"metadata.{metadata_key}": metadata_value}, page_size, cursor, summary)
+    
+    def get_recipe_stats(self, use_materialized: bool = True, use_aggregation: bool = True) -> Dict:
         """
         📊 Get comprehensive recipe statistics
         
+        Args:
+            use_materialized: Read the incrementally maintained stats document
+                (recomputed below if it has not been built yet)
+            use_aggregation: Compute server-side with one $facet pipeline; falls back
+                to a single streaming pass in Python if the server cannot run it
+        
         Returns:
             Dictionary with various statistics
         """
         try:
-            all_recipes = self.get_all_recipes()
-            
-            if not all_recipes:
-                return {}
-            
-            # Basic counts
-            total_recipes = len(all_recipes)
-            favorites_count = len([r for r in all_recipes if r.is_favorite])
-            
-            # Status counts
-            status_counts = {
-                'want_to_try': len([r for r in all_recipes if r.status == 'want_to_try']),
-                'tried': len([r for r in all_recipes if r.status == 'tried']),
-                'made_before': len([r for r in all_recipes if r.status == 'made_before'])
-            }
-            
-            # Cuisine distribution
-            cuisines = {}
-            for recipe in all_recipes:
-                cuisine = recipe.metadata.get('cuisine', 'Unknown')
-                cuisines[cuisine] = cuisines.get(cuisine, 0) + 1
-            
-            # Difficulty distribution
-            difficulties = {}
-            for recipe in all_recipes:
-                difficulty = recipe.metadata.get('difficulty', 'Unknown')
-                difficulties[difficulty] = difficulties.get(difficulty, 0) + 1
-            
-            # Average ingredients and instructions
-            avg_ingredients = sum(len(r.ingredients) for r in all_recipes) / total_recipes
-            avg_instructions = sum(len(r.instructions) for r in all_recipes) / total_recipes
-            
-            # Most common ingredients (simplified)
-            all_ingredients = []
-            for recipe in all_recipes:
-                all_ingredients.extend([ing.lower().strip() for ing in recipe.ingredients])
-            
-            from collections import Counter
-            common_ingredients = Counter(all_ingredients).most_common(5)
-            
-            return {
-                'total_recipes': total_recipes,
-                'favorites_count': favorites_count,
-                'favorites_percentage': round((favorites_count / total_recipes) * 100, 1),
-                'status_counts': status_counts,
-                'cuisines': cuisines,
-                'difficulties': difficulties,
-                'avg_ingredients': round(avg_ingredients, 1),
-                'avg_instructions': round(avg_instructions, 1),
-                'common_ingredients': dict(common_ingredients),
-                'most_popular_cuisine': max(cuisines.items(), key=lambda x: x[1])[0] if cuisines else 'N/A',
-                'most_common_difficulty': max(difficulties.items(), key=lambda x: x[1])[0] if difficulties else 'N/A'
-            }
+            if use_materialized:
+                stats = self.stats_store.read()
+                if stats is not None:
+                    return stats
+                print("⚠️ Stats document not built yet. Run: python start.py stats-rebuild")
             
+            if use_aggregation:
+                try:
+                    return self._stats_from_aggregation()
+                except Exception as e:
+                    print(f"⚠️ Stats aggregation unavailable, using fallback: {e}")
+            return self._stats_from_scan()
+        
         except Exception as e:
             print(f"❌ Error generating stats: {e}")
             return {}
     
+    def _stats_from_aggregation(self) -> Dict:
+        """📊 Compute all stats counters in a single $facet aggregation"""
+        def size_of(field):
+            return {"$size": {"$ifNull": [f"${field}", []]}}
+        
+        def count_by(expression):
+            return [{"$group": {"_id": expression, "count": {"$sum": 1}}}]
+        
+        pipeline = [{"$facet": {
+            "totals": [{"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "favorites": {"$sum": {"$cond": [{"$eq": ["$is_favorite", True]}, 1, 0]}},
+                "ingredients": {"$sum": size_of("ingredients")},
+                "instructions": {"$sum": size_of("instructions")}
+            }}],
+            "statuses": count_by("$status"),
+            "cuisines": count_by({"$ifNull": ["$metadata.cuisine", "Unknown"]}),
+            "difficulties": count_by({"$ifNull": ["$metadata.difficulty", "Unknown"]}),
+            "ingredients": [
+                {"$unwind": "$ingredients"},
+                *count_by({"$trim": {"input": {"$toLower": "$ingredients"}}}),
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": 5}
+            ]
+        }}]
+        
+        result = next(self.collection.aggregate(pipeline), None)
+        if not result or not result['totals']:
+            return {}
+        
+        totals = result['totals'][0]
+        
+        def as_dict(rows):
+            return {row['_id']: row['count'] for row in rows}
+        
+        return build_stats(
+            total_recipes=totals['total'],
+            favorites_count=totals['favorites'],
+            status_counts=as_dict(result['statuses']),
+            cuisines=as_dict(result['cuisines']),
+            difficulties=as_dict(result['difficulties']),
+            ingredients_sum=totals['ingredients'],
+            instructions_sum=totals['instructions'],
+            common_ingredients=[(row['_id'], row['count']) for row in result['ingredients']]
+        )
+    
+    def _stats_from_scan(self) -> Dict:
+        """📊 Fallback: compute the same stats in one streaming pass over projected documents"""
+        fields, ingredient_counts = tally(self.collection.find({}, STATS_PROJECTION))
+        if not fields['total']:
+            return {}
+        
+        def counts(field):
+            prefix = f"{field}."
+            return {decode_key(path[len(prefix):]): count for path, count in fields.items() if path.startswith(prefix)}
+        
+        return build_stats(
+            total_recipes=fields['total'],
+            favorites_count=fields['favorites'],
+            status_counts=counts('status'),
+            cuisines=counts('cuisine'),
+            difficulties=counts('difficulty'),
+            ingredients_sum=fields['ingredients_sum'],
+            instructions_sum=fields['instructions_sum'],
+            common_ingredients=sorted(ingredient_counts.items(), key=by_count_then_name)[:5]
+        )
+    
+    def get_catalog_snapshot(self):
+        """
+        🧮 The columnar catalog snapshot, refreshed incrementally
+        
+        Returns:
+            CatalogSnapshot, or None if NumPy is not installed or the database is down
+        """
+        if self.collection is None:
+            return None
+        if self.snapshot is None:
+            with self._snapshot_lock:
+                if self.snapshot is None:
+                    try:
+                        from recipe_snapshot import CatalogSnapshot
+                    except ImportError:
+                        print("⚠️ Catalog snapshot needs NumPy (pip install numpy) - using MongoDB queries")
+                        self.use_snapshot = False
+                        return None
+                    self.snapshot = CatalogSnapshot()
+        return self.snapshot.refresh(self.collection)
+    
+    def _memory_index(self, attribute: str, module: str, class_name: str, feature: str):
+        """🧰 Create an in-memory recipe index on first use, then refresh it incrementally"""
+        if self.collection is None or attribute in self._unavailable_indexes:
+            return None
+        if getattr(self, attribute) is None:
+            with self._snapshot_lock:
+                if attribute in self._unavailable_indexes:
+                    return None
+                if getattr(self, attribute) is None:
+                    try:
+                        index_class = getattr(importlib.import_module(module), class_name)
+                    except ImportError:
+                        print(f"⚠️ {feature} needs NumPy (pip install numpy) - disabled")
+                        self._unavailable_indexes.add(attribute)
+                        return None
+                    setattr(self, attribute, index_class())
+        return getattr(self, attribute).refresh(self.collection)
+    
+    def _with_recipes(self, matches: List[Dict], summary: bool) -> List[Dict]:
+        """📥 Replace each match's recipe_id with the recipe, fetched with one $in query"""
+        docs = {document_id(doc): doc for doc in self._fetch_by_ids([m['recipe_id'] for m in matches], summary)}
+        model = RecipeSummary if summary else RecipeView
+        results = []
+        for match in matches:
+            doc = docs.get(match.pop('recipe_id'))
+            if doc is not None:
+                results.append({'recipe': model.from_dict(doc), **match})
+        return results
+    
+    def get_pantry_index(self):
+        """
+        🥫 The pantry posting-list index, refreshed incrementally
+        
+        Returns:
+            PantryIndex, or None if NumPy is not installed or the database is down
+        """
+        return self._memory_index('pantry_index', 'pantry_index', 'PantryIndex', "Pantry matching")
+    
+    def find_by_pantry(self, pantry, k: int = 20, min_coverage: float = 0.0,
+                       assume_staples: bool = True, summary: bool = True) -> Optional[List[Dict]]:
+        """
+        🥫 What can I cook: recipes ranked by how much of them the pantry covers
+        
+        Args:
+            pantry: Available ingredients - a list, or one comma/newline separated string
+            k: Number of recipes to return
+            min_coverage: Skip recipes covered less than this (0-1)
+            assume_staples: Count salt, pepper and water as available
+            summary: Return RecipeSummary cards instead of full recipes
+        
+        Returns:
+            List of {'recipe', 'coverage', 'matched', 'total', 'missing'}, best first;
+            missing lists the canonical names of the ingredients still needed.
+            None if pantry matching is unavailable (NumPy missing or database down)
+        """
+        try:
+            if isinstance(pantry, str):
+                pantry = pantry.replace('\n', ',').split(',')
+            pantry = [item.strip() for item in pantry if item and item.strip()]
+            if not pantry:
+                return []
+            index = self.get_pantry_index()
+            if index is None:
+                return None
+            
+            return self._with_recipes(index.match(pantry, k, min_coverage, assume_staples), summary)
+        
+        except Exception as e:
+            print(f"❌ Error matching pantry: {e}")
+            return []
+    
+    def get_similarity_index(self):
+        """
+        🧲 The MinHash/LSH similarity index, refreshed incrementally
+        
+        Returns:
+            SimilarityIndex, or None if NumPy is not installed or the database is down
+        """
+        return self._memory_index('similarity_index', 'similarity_index', 'SimilarityIndex',
+                                  "Similar recipes")
+    
+    def similar_recipes(self, recipe_id: str, k: int = 5, summary: bool = True) -> Optional[List[Dict]]:
+        """
+        🧲 You might also like: recipes sharing the most ingredients and tags
+        
+        Args:
+            recipe_id: ID of the recipe to find neighbours for
+            k: Number of recipes to return
+            summary: Return RecipeSummary cards instead of full recipes
+        
+        Returns:
+            List of {'recipe', 'similarity'} (estimated Jaccard, 0-1), most similar first;
+            None if recommendations are unavailable (NumPy missing or database down)
+        """
+        try:
+            index = self.get_similarity_index()
+            if index is None:
+                return None
+            return self._with_recipes(index.similar(ObjectId(str(recipe_id)), k), summary)
+        
+        except Exception as e:
+            print(f"❌ Error finding similar recipes: {e}")
+            return []
+    
+    def get_recipe_distribution(self, column: str, **filters) -> Dict:
+        """
+        📊 Count recipes per value of a field, optionally within a filter
+        
+        e.g. ``get_recipe_distribution('cuisine', difficulty='easy', max_total_minutes=30)``
+        
+        Args:
+            column: 'cuisine', 'difficulty', 'status', 'is_favorite', 'servings',
+                    'total_minutes' or 'difficulty_level'
+            **filters: cuisine, difficulty, is_favorite, status, min_servings,
+                       max_servings, max_total_minutes, max_difficulty_level
+        
+        Returns:
+            Dict of value -> count, most common first
+        """
+        try:
+            snapshot = self.get_catalog_snapshot()
+            return snapshot.group_by(column, **filters) if snapshot is not None else {}
+        except Exception as e:
+            print(f"❌ Error computing distribution: {e}")
+            return {}
+    
+    def get_cache_stats(self) -> Dict:
+        """
+        📈 Cache counters
+        
+        Returns:
+            Dict with 'recipes' (lookup cache) and 'queries' (result cache) counters:
+            size, hits, misses, evictions and hit_rate, plus the change watcher state
+        """
+        watcher = self.change_watcher
+        return {
+            'recipes': self.cache.stats(),
+            'queries': self.query_cache.stats(),
+            'watcher': {'mode': watcher.active_mode, 'changes_seen': watcher.changes_seen} if watcher else None
+        }
+    
+    @staticmethod
+    def build_search_filter(name_query: str = "", ingredient_query: str = "", cuisine: str = "",
+                            difficulty: str = "", is_favorite: Optional[bool] = None, status: str = "",
+                            min_servings: Optional[int] = None, max_servings: Optional[int] = None,
+                            max_total_minutes: Optional[int] = None) -> Dict:
+        """🧱 Build the MongoDB filter for advanced_search / explain_search"""
+        filters = []
+        
+        # Name search
+        if name_query:
+            filters.append({"name": {"$regex": name_query, "$options": "i"}})
+        
+        # Ingredient search: canonical names are multikey index lookups
+        if ingredient_query:
+            keys = sorted({name for part in ingredient_query.split(',')
+                           for name in parse_ingredient(part)['names']})
+            if len(keys) == 1:
+                filters.append({INGREDIENT_KEYS_FIELD: keys[0]})
+            elif keys:
+                filters.append({INGREDIENT_KEYS_FIELD: {"$all": keys}})
+            else:
+                filters.append({"ingredients": {"$regex": ingredient_query, "$options": "i"}})
+        
+        # Cuisine filter
+        if cuisine:
+            filters.append({"metadata.cuisine": cuisine})
+        
+        # Difficulty filter
+        if difficulty:
+            filters.append({"metadata.difficulty": difficulty})
+        
+        # Favorite filter
+        if is_favorite is not None:
+            filters.append({"is_favorite": is_favorite})
+        
+        # Status filter
+        if status:
+            filters.append({"status": status})
+        
+        # Servings filters
+        if min_servings is not None:
+            filters.append({"metadata.servings": {"$gte": min_servings}})
+        
+        if max_servings is not None:
+            filters.append({"metadata.servings": {"$lte": max_servings}})
+        
+        # Cooking time filter
+        if max_total_minutes is not None:
+            filters.append({TIME_FIELD: {"$lte": max_total_minutes}})
+        
+        # Combine filters
+        if not filters:
+            return {}
+        return filters[0] if len(filters) == 1 else {"$and": filters}
+    
+    def explain_search(self, **search_args) -> Dict:
+        """
+        🩺 Show how MongoDB executes an advanced_search
+        
+        Args:
+            **search_args: Same keyword arguments as advanced_search
+        
+        Returns:
+            Dict with the filter, winning plan stages, indexes used, whether it
+            fell back to a COLLSCAN, and keys/docs examined vs returned
+        """
+        search_args.pop('summary', None)
+        sort_by_time = search_args.pop('sort_by_time', False)
+        query = self.build_search_filter(**search_args)
+        # Explain exactly the queries advanced_search runs (two when sorting by time)
+        reports = [self._explain(part, sort)
+                   for part, sort in self._search_parts(query, sort_by_time, search_args.get('max_total_minutes'))]
+        
+        def total(field):
+            values = [report[field] for report in reports if report[field] is not None]
+            return sum(values) if values else None
+        
+        return {
+            'filter': query,
+            'stages': [stage for report in reports for stage in report['stages']],
+            'indexes': [index for report in reports for index in report['indexes']],
+            'collscan': any(report['collscan'] for report in reports),
+            'in_memory_sort': any(report['in_memory_sort'] for report in reports),
+            'keys_examined': total('keys_examined'),
+            'docs_examined': total('docs_examined'),
+            'returned': total('returned'),
+            'time_ms': total('time_ms')
+        }
+    
+    @staticmethod
+    def _search_parts(query: Dict, sort_by_time: bool, max_total_minutes: Optional[int]) -> List:
+        """
+        ⏱️ The (filter, sort) queries an advanced_search runs, results concatenated in order
+        
+        Sorted by time on the (.., total_minutes, _id) indexes; MongoDB puts missing
+        values first, so recipes without a known time are fetched separately and go last.
+        """
+        if not sort_by_time:
+            return [(query, None)]
+        
+        def combine(extra: Dict) -> Dict:
+            return {"$and": [query, extra]} if query else extra
+        
+        parts = [(combine({TIME_FIELD: {"$ne": None}}), TIME_SORT)]
+        if max_total_minutes is None:
+            parts.append((combine({TIME_FIELD: None}), None))
+        return parts
+    
+    def _explain(self, query: Dict, sort: Optional[List]) -> Dict:
+        """🩺 Plan summary for one find(query, sort)"""
+        explained = self.collection.find(query, sort=sort).explain()
+        
+        winning = explained.get('queryPlanner', {}).get('winningPlan', {})
+        winning = winning.get('queryPlan', winning)  # SBE engine nests the classic plan
+        stages, indexes = [], []
+        pending = [winning]
+        while pending:
+            stage = pending.pop()
+            if not stage:
+                continue
+            stages.append(stage.get('stage'))
+            if stage.get('indexName'):
+                indexes.append(stage['indexName'])
+            pending.extend(stage.get('inputStages', []))
+            pending.append(stage.get('inputStage'))
+        
+        execution = explained.get('executionStats', {})
+        return {
+            'stages': list(reversed(stages)),
+            'indexes': indexes,
+            'collscan': 'COLLSCAN' in stages,
+            'in_memory_sort': 'SORT' in stages,
+            'keys_examined': execution.get('totalKeysExamined'),
+            'docs_examined': execution.get('totalDocsExamined'),
+            'returned': execution.get('nReturned'),
+            'time_ms': execution.get('executionTimeMillis')
+        }
+    
+    def audit_search_plans(self, searches: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        🩺 Explain the common advanced_search shapes and flag COLLSCANs
+        
+        Args:
+            searches: advanced_search keyword sets (defaults to COMMON_SEARCHES)
+        
+        Returns:
+            One explain_search report per search
+        """
+        return [self.explain_search(**search) for search in (searches or COMMON_SEARCHES)]
+    
     def advanced_search(self, 
                        name_query: str = "", 
                        ingredient_query: str = "",
@@ -417,68 +1256,59 @@ class RecipeManager:
                        is_favorite: Optional[bool] = None,
                        status: str = "",
                        min_servings: Optional[int] = None,
-                       max_servings: Optional[int] = None) -> List[Recipe]:
+                       max_servings: Optional[int] = None,
+                       max_total_minutes: Optional[int] = None,
+                       sort_by_time: bool = False,
+                       summary: bool = False) -> List[RecipeView]:
         """
         🔍 Advanced search with multiple filters
         
         Args:
             name_query: Search in recipe names
-            ingredient_query: Search in ingredients
+            ingredient_query: Ingredient(s) every recipe must contain, comma-separated
+                              ("tomatoes, olive oil"); matched on canonical names
             cuisine: Filter by cuisine
             difficulty: Filter by difficulty
             is_favorite: Filter by favorite status
             status: Filter by recipe status
             min_servings: Minimum servings
             max_servings: Maximum servings
-            
+            max_total_minutes: Maximum prep + cook time in minutes
+            sort_by_time: Quickest recipes first (those without a known time last)
+            summary: Return RecipeSummary cards instead of full recipes
+        
         Returns:
-            List of matching Recipe objects
+            List of matching RecipeView objects
         """
         try:
-            filters = []
-            
-            # Name search
-            if name_query:
-                filters.append({"name": {"$regex": name_query, "$options": "i"}})
-            
-            # Ingredient search
-            if ingredient_query:
-                filters.append({"ingredients": {"$regex": ingredient_query, "$options": "i"}})
-            
-            # Cuisine filter
-            if cuisine:
-                filters.append({"metadata.cuisine": cuisine})
+            query = self.build_search_filter(name_query, ingredient_query, cuisine, difficulty,
+                                             is_favorite, status, min_servings, max_servings,
+                                             max_total_minutes)
             
-            # Difficulty filter
-            if difficulty:
-                filters.append({"metadata.difficulty": difficulty})
+            def find(part: Dict, sort: Optional[List]) -> List[Dict]:
+                if summary:
+                    return self._find_summaries(part, sort)
+                return list(self._reader().find(part, sort=sort))
             
-            # Favorite filter
-            if is_favorite is not None:
-                filters.append({"is_favorite": is_favorite})
-            
-            # Status filter
-            if status:
-                filters.append({"status": status})
-            
-            # Servings filters
-            if min_servings is not None:
-                filters.append({"metadata.servings": {"$gte": min_servings}})
-            
-            if max_servings is not None:
-                filters.append({"metadata.servings": {"$lte": max_servings}})
-            
-            # Combine filters
-            if filters:
-                if len(filters) == 1:
-                    query = filters[0]
-                else:
-                    query = {"$and": filters}
-            else:
-                query = {}
+            # 🗂️ Equivalent filters share one cached id list
+            def load():
+                snapshot = self.get_catalog_snapshot() if self.use_snapshot and not (name_query or ingredient_query) else None
+                if snapshot is not None:
+                    # 🧮 Structured filters only: vectorized match on the snapshot, then one $in fetch
+                    ids = snapshot.select(cuisine=cuisine, difficulty=difficulty, is_favorite=is_favorite,
+                                          status=status, min_servings=min_servings, max_servings=max_servings,
+                                          max_total_minutes=max_total_minutes,
+                                          order_by='total_minutes' if sort_by_time else None)
+                    return self._fetch_by_ids(ids, summary)
+                docs = []
+                for part, sort in self._search_parts(query, sort_by_time, max_total_minutes):
+                    docs += find(part, sort)
+                return docs
             
-            results = self.collection.find(query)
-            return [Recipe.from_dict(doc) for doc in results]
+            key = f"advanced:{'by_time:' if sort_by_time else ''}{canonical_filter(query)}"
+            docs = self._cached_docs(key, load, summary)
+            model = RecipeSummary if summary else RecipeView
+            return [model.from_dict(doc) for doc in docs]
         
         except Exception as e:
             print(f"❌ Error in advanced search: {e}")
@@ -491,7 +1321,7 @@ class RecipeManager:
         Args:
             recipe_ids: List of recipe IDs to update
             new_status: New status for all recipes
-            
+        
         Returns:
             int: Number of recipes updated
         """
@@ -503,6 +1333,12 @@ class RecipeManager:
             
             object_ids = [ObjectId(rid) for rid in recipe_ids]
             
+            # Only recipes whose status actually changes move the stats counters
+            changing = list(self.collection.find(
+                {"_id": {"$in": object_ids}, "status": {"$ne": new_status}},
+                {"status": 1}
+            ))
+            
             result = self.collection.update_many(
                 {"_id": {"$in": object_ids}},
                 {"$set": {
@@ -510,59 +1346,296 @@ class RecipeManager:
                     "metadata.updated_at": datetime.now()
                 }}
             )
+            self._invalidate(object_ids)
+            
+            for old_status, count in Counter(doc.get('status') for doc in changing).items():
+                self.stats_store.record_status(old_status, new_status, count)
             
             print(f"✅ Updated {result.modified_count} recipes to status: {new_status}")
             return result.modified_count
-            
+        
         except Exception as e:
             print(f"❌ Error in bulk update: {e}")
             return 0
     
+    def apply_batch(self, operations: List[Dict]) -> List[Dict]:
+        """
+        📦 Apply many recipe mutations as one unordered bulk_write
+        
+        The recipes are read once and every write only applies if they are still
+        as read; operations that lost a race with another writer are re-read and
+        retried (BATCH_ATTEMPTS rounds in all).
+        
+        Each operation is a dict with an "op" and a "recipe_id":
+            {"op": "toggle_favorite", "recipe_id": ...}
+            {"op": "set_favorite", "recipe_id": ..., "value": true}
+            {"op": "update_status", "recipe_id": ..., "status": "tried"}
+            {"op": "add_tags", "recipe_id": ..., "tags": ["quick"]}
+            {"op": "remove_tags", "recipe_id": ..., "tags": ["quick"]}
+            {"op": "delete", "recipe_id": ...}
+        
+        Args:
+            operations: Operations to apply (at most MAX_BATCH_SIZE, one per recipe)
+        
+        Returns:
+            One result per operation, in order: {"index", "op", "recipe_id", "ok"} plus
+            the updated fields, or an "error" message if it was not applied
+        """
+        if len(operations) > MAX_BATCH_SIZE:
+            raise ValueError(f"Batch too large: {len(operations)} operations (max {MAX_BATCH_SIZE})")
+        
+        results = []
+        pending = {}  # result index -> validated operation
+        for index, item in enumerate(operations):
+            result = {"index": index, "op": None, "recipe_id": None, "ok": False}
+            results.append(result)
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("Operation must be an object")
+                result["op"], result["recipe_id"] = item.get('op'), item.get('recipe_id')
+                self._validate_batch_operation(item)
+                # Same recipe however its hex id is cased
+                object_id = ObjectId(item['recipe_id'])
+                if any(other == object_id for _, other in pending.values()):
+                    raise ValueError("Recipe already has an operation in this batch")
+                pending[index] = (item, object_id)
+            except ValueError as e:
+                result["error"] = str(e)
+        
+        if not pending:
+            return results
+        
+        changes, written = [], []
+        try:
+            retry = dict(pending)
+            for _ in range(BATCH_ATTEMPTS):
+                retry = self._run_batch_round(retry, results, changes, written)
+                if not retry:
+                    break
+            for index in retry:
+                results[index]["error"] = "Recipe changed concurrently - not applied"
+            print(f"✅ Batch applied: {len(changes)} of {len(operations)} operations")
+        
+        except Exception as e:
+            print(f"❌ Error applying batch: {e}")
+            for index in pending:
+                if not results[index]["ok"]:
+                    results[index].setdefault("error", str(e))
+        finally:
+            if written:
+                self._invalidate(written)
+                self.stats_store.record_many(changes)
+        
+        return results
+    
+    def _run_batch_round(self, pending: Dict, results: List[Dict], changes: List, written: List) -> Dict:
+        """
+        🔁 One read and one unordered bulk_write for the pending batch operations
+        
+        Every write is filtered on the values just read (optimistic concurrency), so
+        the reported fields and stats deltas are exact. A filter that misses means
+        another writer got there first.
+        
+        Returns:
+            The operations whose filter missed, to run again on a fresh read
+        """
+        object_ids = [object_id for _, object_id in pending.values()]
+        docs = {doc['_id']: doc for doc in self.collection.find({"_id": {"$in": object_ids}}, BATCH_PROJECTION)}
+        # BSON dates keep milliseconds; the stamp also tells which updates applied
+        now = datetime.now()
+        updated_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        requests, planned = [], []
+        for index, (item, object_id) in pending.items():
+            before = docs.get(object_id)
+            if before is None:
+                results[index]["error"] = "Recipe not found"
+                continue
+            request, after, fields = self._plan_batch_operation(item, before, updated_at)
+            requests.append(request)
+            planned.append((index, before, after, fields))
+        if not requests:
+            return {}
+        
+        write_errors = {}
+        try:
+            counts = self.collection.bulk_write(requests, ordered=False).bulk_api_result
+        except BulkWriteError as e:
+            counts = e.details
+            write_errors = {err['index']: err.get('errmsg', 'Write failed') for err in e.details.get('writeErrors', [])}
+        missed = self._missed_batch_writes(planned, counts, updated_at)
+        
+        retry = {}
+        for position, (index, before, after, fields) in enumerate(planned):
+            if position in write_errors:
+                results[index]["error"] = write_errors[position]
+                continue
+            if position in missed:
+                retry[index] = pending[index]
+                continue
+            results[index].update(ok=True, **fields)
+            changes.append((before, after))
+            written.append(before['_id'])
+            if after is None:
+                self._unindex_document(before['_id'])
+            elif 'tags' in fields:
+                self._index_document(before['_id'], after)
+        return retry
+    
+    def _missed_batch_writes(self, planned: List, counts: Dict, updated_at: datetime) -> set:
+        """🔍 Positions of planned writes whose filter matched nothing"""
+        updates = sum(after is not None for _, _, after, _ in planned)
+        if counts.get('nMatched', 0) == updates and counts.get('nRemoved', 0) == len(planned) - updates:
+            return set()
+        
+        # Read back the stamp: an update applied iff it is there, a delete iff the recipe is gone
+        object_ids = [before['_id'] for _, before, _, _ in planned]
+        stamps = {doc['_id']: (doc.get('metadata') or {}).get('updated_at')
+                  for doc in self.collection.find({"_id": {"$in": object_ids}}, {"metadata.updated_at": 1})}
+        missed = set()
+        for position, (_, before, after, _) in enumerate(planned):
+            if after is None:
+                # Deleted concurrently by someone else is indistinguishable from our delete;
+                # start.py stats-verify repairs the double-counted delta in that rare case
+                if before['_id'] in stamps:
+                    missed.add(position)
+            elif stamps.get(before['_id']) != updated_at:
+                missed.add(position)
+        return missed
+    
+    @staticmethod
+    def _validate_batch_operation(item: Dict):
+        """✅ Check one batch operation's shape (raises ValueError)"""
+        op = item.get('op')
+        if op not in BATCH_OPERATIONS:
+            raise ValueError(f"Unknown op {op!r}. Must be one of: {list(BATCH_OPERATIONS)}")
+        if not isinstance(item.get('recipe_id'), str) or not ObjectId.is_valid(item['recipe_id']):
+            raise ValueError("recipe_id must be a valid recipe ID")
+        if op == 'set_favorite' and not isinstance(item.get('value'), bool):
+            raise ValueError("set_favorite needs a boolean 'value'")
+        if op == 'update_status' and item.get('status') not in STATUSES:
+            raise ValueError(f"Invalid status. Must be one of: {list(STATUSES)}")
+        if op in ('add_tags', 'remove_tags'):
+            tags = item.get('tags')
+            if not isinstance(tags, list) or not tags or not all(isinstance(tag, str) for tag in tags):
+                raise ValueError(f"{op} needs a non-empty list of 'tags'")
+    
+    @staticmethod
+    def _plan_batch_operation(item: Dict, before: Dict, updated_at: datetime):
+        """
+        🗺️ Turn a validated batch operation into a bulk_write request
+        
+        The filter also matches every field read into `before`, so the write only
+        applies if nobody changed the recipe since; the update then sets values
+        computed from `before` instead of relying on server-side expressions.
+        
+        Returns:
+            (request, document after the write or None if deleted, fields to report)
+        """
+        op = item['op']
+        unchanged = {"_id": before['_id']}
+        for path in BATCH_PROJECTION:
+            value = before
+            for key in path.split('.'):
+                value = value.get(key) if isinstance(value, dict) else None
+            # None also matches a missing field
+            unchanged[path] = value
+        if op == 'delete':
+            return DeleteOne(unchanged), None, {"deleted": True}
+        
+        after = {**before, "metadata": dict(before.get('metadata') or {})}
+        after['metadata']['updated_at'] = updated_at
+        if op == 'toggle_favorite':
+            after['is_favorite'] = before.get('is_favorite') is not True
+            fields = {"is_favorite": after['is_favorite']}
+        elif op == 'set_favorite':
+            after['is_favorite'] = item['value']
+            fields = {"is_favorite": item['value']}
+        elif op == 'update_status':
+            after['status'] = item['status']
+            fields = {"status": item['status']}
+        else:
+            tags = list(after['metadata'].get('tags') or [])
+            if op == 'add_tags':
+                tags += [tag for tag in dict.fromkeys(item['tags']) if tag not in tags]
+            else:
+                tags = [tag for tag in tags if tag not in item['tags']]
+            after['metadata']['tags'] = tags
+            fields = {"tags": tags}
+        
+        update = {f"metadata.{name}" if name in ('tags', 'updated_at') else name: value
+                  for name, value in fields.items()}
+        update["metadata.updated_at"] = updated_at
+        fields["updated_at"] = updated_at
+        return UpdateOne(unchanged, {"$set": update}), after, fields
+    
+    def iter_export(self, query: Optional[Dict] = None, batch_size: int = 500,
+                    json_safe: bool = False, raw: Optional[bool] = None) -> Iterator[Dict]:
+        """
+        📤 Stream recipe documents straight from the cursor
+        
+        Args:
+            query: Optional MongoDB filter
+            batch_size: Documents fetched per round trip (bounds memory)
+            json_safe: Yield copies with ObjectIds and dates as strings
+            raw: Yield RawBSONDocument (default: the manager's raw_reads setting)
+        
+        Yields:
+            Recipe documents in _id order
+        """
+        cursor = self._reader(raw).find(query or {}).sort("_id", 1).batch_size(batch_size)
+        try:
+            for doc in cursor:
+                yield json_ready(doc) if json_safe else doc
+        finally:
+            cursor.close()
+    
+    def stream_export(self, format_type: str = "ndjson", batch_size: int = 500,
+                      compress: bool = False, query: Optional[Dict] = None) -> Iterator[bytes]:
+        """
+        📦 Serialize the catalog incrementally with bounded memory
+        
+        Args:
+            format_type: 'ndjson' or 'json'
+            batch_size: Documents fetched per round trip
+            compress: Gzip the output on the fly
+            query: Optional MongoDB filter
+        
+        Returns:
+            Iterator of byte chunks (raises ValueError for an unknown format)
+        """
+        if not 1 <= batch_size <= 10000:
+            raise ValueError("batch_size must be between 1 and 10000")
+        return serialize(self.iter_export(query, batch_size), format_type, compress)
+    
     def export_recipes(self, format_type: str = "dict") -> List:
         """
         📤 Export all recipes in specified format
         
         Args:
             format_type: Export format ('dict', 'json_ready')
-            
+        
         Returns:
-            List of recipes in specified format
+            List of recipes in specified format (use iter_export/stream_export
+            for large catalogs)
         """
         try:
-            recipes = self.get_all_recipes()
-            
-            if format_type == "dict":
-                return [recipe.to_dict() for recipe in recipes]
-            elif format_type == "json_ready":
-                # Convert ObjectId to string for JSON serialization
-                exported = []
-                for recipe in recipes:
-                    recipe_dict = recipe.to_dict()
-                    if '_id' in recipe_dict:
-                        recipe_dict['_id'] = str(recipe_dict['_id'])
-                    # Convert datetime objects to strings
-                    if 'metadata' in recipe_dict:
-                        for key, value in recipe_dict['metadata'].items():
-                            if hasattr(value, 'isoformat'):
-                                recipe_dict['metadata'][key] = value.isoformat()
-                    exported.append(recipe_dict)
-                return exported
-            else:
+            if format_type not in ("dict", "json_ready"):
                 return []
-                
+            return list(self.iter_export(json_safe=format_type == "json_ready", raw=False))
+        
         except Exception as e:
             print(f"❌ Error exporting recipes: {e}")
             return []
     
-    def get_random_recipe(self, filters: Optional[Dict] = None) -> Optional[Recipe]:
+    def get_random_recipe(self, filters: Optional[Dict] = None) -> Optional[RecipeView]:
         """
         🎲 Get a random recipe, optionally with filters
         
         Args:
             filters: Optional MongoDB filter dict
-            
+        
         Returns:
-            Random Recipe object or None
+            Random RecipeView or None
         """
         try:
             pipeline = []
@@ -575,9 +1648,99 @@ class RecipeManager:
             results = list(self.collection.aggregate(pipeline))
             
             if results:
-                return Recipe.from_dict(results[0])
+                return RecipeView.from_dict(results[0])
             return None
-            
+        
         except Exception as e:
             print(f"❌ Error getting random recipe: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+# 🌟 Process-wide shared manager, built lazily on first use
+_shared_manager: Optional[RecipeManager] = None
+_shared_manager_lock = threading.Lock()
+
+def get_recipe_manager() -> RecipeManager:
+    """
+    🤝 Get the process-wide RecipeManager backed by the pooled MongoClient
+    
+    Returns:
+        Shared RecipeManager instance (created on first call, reconnected
+        on later calls if MongoDB was unreachable)
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        with _shared_manager_lock:
+            if _shared_manager is None:
+                _shared_manager = RecipeManager()
+                return _shared_manager
+    _shared_manager.ensure_connected()
+    return _shared_manager
+
+def release_shared_connection():
+    """
+    🍴 Drop the process-wide RecipeManager and close the pooled MongoClient
+    
+    PyMongo clients are not fork-safe, so call this before os.fork(); each
+    process then connects on its own first get_recipe_manager() call.
+    """
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is not None and _shared_manager.change_watcher is not None:
+            _shared_manager.change_watcher.stop()
+        _shared_manager = None
+    db_connection.close_connection()
+
+class AsyncRecipeManager:
+    """
+    ⚡ Awaitable mirror of RecipeManager
+    
+    Every public RecipeManager method is available as a coroutine with the same
+    signature, e.g. ``await manager.search_recipes("pasta")``. PyMongo has no native
+    asyncio driver at the pinned version, so calls run on a dedicated thread pool
+    sized to the MongoDB connection pool and the event loop never blocks on I/O.
+    """
+    
+    def __init__(self, manager: Optional[RecipeManager] = None, max_workers: Optional[int] = None):
+        self.manager = manager or get_recipe_manager()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or db_connection.max_pool_size,
+            thread_name_prefix='recipe-db'
+        )
+    
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'manager':
+            raise AttributeError(name)
+        
+        target = getattr(self.manager, name)
+        if not callable(target):
+            return target
+        
+        def connected_call(*args, **kwargs):
+            # Reconnect off the event loop if MongoDB was down when the manager was created
+            self.manager.ensure_connected()
+            return target(*args, **kwargs)
+        
+        @functools.wraps(target)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(connected_call, *args, **kwargs))
+        
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
+    
+    async def iterate(self, iterator):
+        """🔁 Consume a blocking iterator (e.g. stream_export) on the worker threads"""
+        loop = asyncio.get_running_loop()
+        iterator = iter(iterator)
+        done = object()
+        while True:
+            item = await loop.run_in_executor(self._executor, next, iterator, done)
+            if item is done:
+                return
+            yield item
+    
+    def close(self):
+        """🔒 Wait for in-flight database calls and release the worker threads"""
+        self._executor.shutdown(wait=True)
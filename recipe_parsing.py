@@ -0,0 +1,233 @@
+# recipe_parsing.py - Parse free-text recipe fields into queryable values at write time
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+from search_index import normalize_term
+
+# ⏱️ Minutes per duration unit
+_UNIT_MINUTES = {
+    'd': 1440, 'day': 1440, 'days': 1440,
+    'h': 60, 'hr': 60, 'hrs': 60, 'hour': 60, 'hours': 60,
+    'm': 1, 'min': 1, 'mins': 1, 'minute': 1, 'minutes': 1,
+    's': 1 / 60, 'sec': 1 / 60, 'secs': 1 / 60, 'second': 1 / 60, 'seconds': 1 / 60,
+}
+
+_NUMBER = r"\d+\s+\d+/\d+|\d+/\d+|\d+(?:[.,]\d+)?"
+_PART_RE = re.compile(rf"({_NUMBER})\s*(days?|d|hours?|hrs?|h|minutes?|mins?|m|seconds?|secs?|s)?(?![a-z])")
+# "20-25 minutes", "2 to 3 hours": keep the upper bound so "under N minutes" never undercounts
+_RANGE_RE = re.compile(rf"(?:{_NUMBER})\s*(?:-|–|—|to)\s*(?=\d)")
+_CLOCK_RE = re.compile(r"^(\d+):([0-5]\d)$")
+_PHRASES = (
+    (re.compile(r"\ban?\s+hour\s+and\s+a\s+half\b"), "90 min"),
+    (re.compile(r"\bhalf\s+an?\s+hour\b"), "30 min"),
+    (re.compile(r"\ban?\s+(?=(?:day|hour|hr|minute|min)s?\b)"), "1 "),
+)
+
+# Duration fields stored in metadata next to the free-text originals
+DURATION_FIELDS = {'prep_time': 'prep_minutes', 'cook_time': 'cook_minutes'}
+TOTAL_FIELD = 'total_minutes'
+
+def _number(text: str) -> float:
+    parts = text.replace(',', '.').split()
+    whole = float(parts[0]) if len(parts) == 2 else 0.0
+    fraction = parts[-1]
+    if '/' in fraction:
+        numerator, denominator = fraction.split('/')
+        return whole + int(numerator) / int(denominator) if int(denominator) else whole
+    return whole + float(fraction)
+
+def parse_duration(text) -> Optional[int]:
+    """
+    ⏱️ Minutes in a free-text duration
+    
+    Understands "1 hour 30 minutes", "1h30", "90 min", "1.5 hours",
+    "1 1/2 hrs", "1:30", "half an hour" and ranges like "20-25 minutes"
+    (the upper bound is used). A bare number counts as minutes.
+    
+    Args:
+        text: Duration text (numbers are taken as minutes)
+    
+    Returns:
+        Whole minutes, or None if the text holds no duration
+    """
+    if isinstance(text, bool) or text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return round(text) if text >= 0 else None
+    
+    text = str(text).strip().lower()
+    clock = _CLOCK_RE.match(text)
+    if clock:
+        return int(clock.group(1)) * 60 + int(clock.group(2))
+    for pattern, replacement in _PHRASES:
+        text = pattern.sub(replacement, text)
+    text = _RANGE_RE.sub('', text)
+    
+    minutes = 0.0
+    found = False
+    previous_unit = None
+    for number, unit in _PART_RE.findall(text):
+        if unit:
+            scale = _UNIT_MINUTES[unit]
+        else:
+            # "1h30": a bare number after hours is minutes; after days, hours
+            scale = 60 if previous_unit == 1440 else 1
+        minutes += _number(number) * scale
+        previous_unit = scale
+        found = True
+    return round(minutes) if found else None
+
+def duration_fields(metadata: Dict) -> Dict[str, Optional[int]]:
+    """
+    🧮 Numeric duration fields for a recipe's metadata
+    
+    Returns:
+        {'prep_minutes', 'cook_minutes', 'total_minutes'} - None where unknown;
+        the total is the sum of the known parts
+    """
+    fields = {minutes_field: parse_duration(metadata.get(text_field))
+              for text_field, minutes_field in DURATION_FIELDS.items()}
+    known = [value for value in fields.values() if value is not None]
+    fields[TOTAL_FIELD] = sum(known) if known else None
+    return fields
+
+# 🥄 Measuring units -> canonical abbreviation
+_UNITS = {
+    'g': 'g', 'gram': 'g', 'grams': 'g', 'gr': 'g', 'kg': 'kg', 'kilo': 'kg', 'kilos': 'kg',
+    'kilogram': 'kg', 'kilograms': 'kg', 'mg': 'mg',
+    'oz': 'oz', 'ounce': 'oz', 'ounces': 'oz', 'lb': 'lb', 'lbs': 'lb', 'pound': 'lb', 'pounds': 'lb',
+    'ml': 'ml', 'milliliter': 'ml', 'milliliters': 'ml', 'millilitre': 'ml', 'millilitres': 'ml',
+    'cl': 'cl', 'dl': 'dl', 'l': 'l', 'liter': 'l', 'liters': 'l', 'litre': 'l', 'litres': 'l',
+    'tsp': 'tsp', 'tsps': 'tsp', 'teaspoon': 'tsp', 'teaspoons': 'tsp',
+    'tbsp': 'tbsp', 'tbsps': 'tbsp', 'tbs': 'tbsp', 'tablespoon': 'tbsp', 'tablespoons': 'tbsp',
+    'cup': 'cup', 'cups': 'cup', 'pint': 'pint', 'pints': 'pint', 'quart': 'quart', 'quarts': 'quart',
+    'gallon': 'gallon', 'gallons': 'gallon',
+    'pinch': 'pinch', 'pinches': 'pinch', 'dash': 'dash', 'dashes': 'dash', 'handful': 'handful',
+    'handfuls': 'handful', 'clove': 'clove', 'cloves': 'clove', 'slice': 'slice', 'slices': 'slice',
+    'piece': 'piece', 'pieces': 'piece', 'can': 'can', 'cans': 'can', 'tin': 'can', 'tins': 'can',
+    'jar': 'jar', 'jars': 'jar', 'package': 'package', 'packages': 'package', 'pkg': 'package',
+    'packet': 'package', 'packets': 'package', 'bunch': 'bunch', 'bunches': 'bunch',
+    'sprig': 'sprig', 'sprigs': 'sprig', 'stick': 'stick', 'sticks': 'stick',
+    'head': 'head', 'heads': 'head', 'stalk': 'stalk', 'stalks': 'stalk',
+    'sheet': 'sheet', 'sheets': 'sheet',
+}
+
+# Preparation and size words that do not change what the ingredient is
+_DESCRIPTORS = {
+    'a', 'an', 'the', 'of', 'some', 'about', 'approximately', 'few',
+    'fresh', 'freshly', 'large', 'small', 'medium', 'big', 'whole', 'ripe',
+    'chopped', 'diced', 'minced', 'sliced', 'grated', 'shredded', 'crushed', 'ground', 'cubed',
+    'halved', 'quartered', 'peeled', 'seeded', 'pitted', 'trimmed', 'beaten', 'melted',
+    'softened', 'cooked', 'uncooked', 'dried', 'frozen', 'canned', 'toasted', 'torn',
+    'finely', 'roughly', 'coarsely', 'thinly', 'thickly', 'lightly',
+    'extra', 'virgin', 'boneless', 'skinless', 'optional', 'leaf', 'leaves',
+}
+
+_FRACTIONS = {'½': ' 1/2', '⅓': ' 1/3', '⅔': ' 2/3', '¼': ' 1/4', '¾': ' 3/4', '⅛': ' 1/8'}
+_QUANTITY_RE = re.compile(rf"^\s*((?:{_NUMBER})(?:\s*(?:-|–|—|to)\s*(?:{_NUMBER}))?)\s*")
+_UNIT_RE = re.compile(r"^(fl\.?\s*oz|[a-z]+)\.?(?![a-z])\s*")
+# Notes after a comma, in brackets or after "for" ("2 onions, finely chopped", "1 (14 oz) can")
+_NOTE_RE = re.compile(r"\([^)]*\)|\[[^\]]*\]|,.*$|\bto taste\b|\bas needed\b|\bfor\b.*$")
+_ALTERNATIVE_RE = re.compile(r"\s+or\s+.*$")
+_COMBINED_RE = re.compile(r"\s+(?:and|&)\s+|\s*\+\s*")
+_WORD_RE = re.compile(r"[a-z]+")
+# "juice of 1 lemon" -> "1 lemon juice", so the fruit's quantity and the part's name line up
+_PART_OF_RE = re.compile(r"^((?:[a-z]+\s+)*?)(juice|zest|rind|peel)\s+of\s+(?:an?\s+|the\s+)?([^,(\[]+)")
+# Plurals the search stemmer does not cover
+_IRREGULAR = {'loaves': 'loaf', 'halves': 'half', 'leaves': 'leaf'}
+# Descriptor words that are part of the name next to these words ("bay leaf", "ground beef")
+_NAME_PAIRS = {
+    ('bay', 'leaf'), ('bay', 'leaves'), ('curry', 'leaf'), ('curry', 'leaves'),
+    ('lime', 'leaf'), ('lime', 'leaves'),
+    ('ground', 'beef'), ('ground', 'pork'), ('ground', 'lamb'), ('ground', 'veal'),
+    ('ground', 'turkey'), ('ground', 'chicken'), ('ground', 'meat'),
+}
+
+# 🧂 Canonical names found in nearly every kitchen (and recipe)
+STAPLES = ('salt', 'sea salt', 'kosher salt', 'pepper', 'black pepper', 'water')
+
+# Recipe fields holding the canonical ingredient names and their indexed lookup keys
+INGREDIENT_NAMES_FIELD = 'ingredient_names'
+INGREDIENT_KEYS_FIELD = 'ingredient_keys'
+
+def canonical_ingredient(text: str) -> str:
+    """
+    🔤 Canonical name of an ingredient ("Fresh Basil Leaves" -> "basil")
+    
+    Lowercased, accents stripped, preparation and size words dropped
+    (unless part of the name, as in "bay leaf" or "ground beef"), plurals
+    stemmed like search terms. Empty if nothing is left.
+    """
+    text = str(text or '').lower()
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    words = _WORD_RE.findall(text)
+    words = [word for i, word in enumerate(words)
+             if word not in _DESCRIPTORS
+             or (i and (words[i - 1], word) in _NAME_PAIRS)
+             or (i + 1 < len(words) and (word, words[i + 1]) in _NAME_PAIRS)]
+    return ' '.join(_IRREGULAR.get(word) or normalize_term(word) for word in words if len(word) > 1)
+
+def parse_ingredient(text: str) -> Dict:
+    """
+    🥕 Split an ingredient line into quantity, unit and canonical name(s)
+    
+    "500g pizza dough" -> 500.0, 'g', ['pizza dough'];
+    "Salt and pepper to taste" -> None, None, ['salt', 'pepper'];
+    "juice of 1 lemon" -> 1.0, None, ['lemon juice'].
+    Alternatives keep the first choice ("butter or margarine" -> butter).
+    
+    Args:
+        text: Free-text ingredient line
+    
+    Returns:
+        {'quantity': float or None, 'unit': str or None, 'names': [str, ...]}
+    """
+    text = str(text or '').strip().lower()
+    for fraction, replacement in _FRACTIONS.items():
+        text = text.replace(fraction, replacement)
+    text = _PART_OF_RE.sub(lambda m: f"{m.group(3).strip()} {m.group(1)}{m.group(2)}", text, count=1)
+    
+    quantity = unit = None
+    match = _QUANTITY_RE.match(text)
+    if match:
+        # "2-3 cloves": like cooking times, a range counts at its upper bound
+        quantity = _number(_RANGE_RE.sub('', match.group(1)).strip())
+        text = text[match.end():]
+    text = _NOTE_RE.sub(' ', text).strip()
+    match = _UNIT_RE.match(text)
+    if match:
+        word = re.sub(r"[\s.]", '', match.group(1))
+        unit = 'fl oz' if word == 'floz' else _UNITS.get(word)
+        if unit:
+            text = text[match.end():]
+    
+    text = _ALTERNATIVE_RE.sub('', text)
+    names = [canonical_ingredient(part) for part in _COMBINED_RE.split(text)]
+    return {'quantity': quantity, 'unit': unit, 'names': [name for name in names if name]}
+
+def ingredient_names(ingredients: Iterable[str]) -> List[str]:
+    """🥕 Distinct canonical ingredient names of a recipe, in recipe order"""
+    names = {}
+    for line in ingredients or []:
+        for name in parse_ingredient(line)['names']:
+            names.setdefault(name)
+    return list(names)
+
+def ingredient_keys(names: Iterable[str]) -> List[str]:
+    """
+    🔑 Indexed lookup keys for a recipe's canonical ingredient names
+    
+    Every name plus each word of multi-word names, so a lookup for
+    "tomato" also finds "cherry tomato" and "tomato sauce".
+    
+    Returns:
+        Sorted, de-duplicated keys
+    """
+    keys = set()
+    for name in names:
+        keys.add(name)
+        keys.update(name.split(' '))
+    return sorted(keys)
@@ -0,0 +1,316 @@
+# recipe_snapshot.py - Columnar in-memory catalog snapshot for vectorized filters
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from change_watcher import POLL_OVERLAP
+from models import RecipeView
+
+# 🧮 Fields the snapshot reads from each recipe
+SNAPSHOT_PROJECTION = {"is_favorite": 1, "status": 1, "metadata.cuisine": 1, "metadata.difficulty": 1,
+                       "metadata.servings": 1, "metadata.prep_time": 1, "metadata.cook_time": 1,
+                       "metadata.total_minutes": 1}
+
+# Dictionary-encoded columns (exact values, matched like MongoDB equality)
+ENCODED_COLUMNS = ('cuisine', 'difficulty', 'status')
+# Numeric columns; NaN means missing or not a number
+NUMERIC_COLUMNS = ('servings', 'total_minutes', 'difficulty_level')
+# Favorite flag: 1 = True, 0 = False, -1 = missing / not a bool
+FLAG_COLUMN = 'is_favorite'
+
+class _Dictionary:
+    """🔤 Value <-> small integer code (-1 = missing)"""
+    
+    def __init__(self):
+        self.values: List = []
+        self.codes: Dict = {}
+    
+    def encode(self, value) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+    
+    def lookup(self, value) -> int:
+        """Code of an existing value, or -2 (matches nothing) if it was never seen"""
+        return self.codes.get(value, -2) if value is not None else -1
+
+def _number(value) -> float:
+    # MongoDB range filters only match numbers, so anything else is NaN
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+class IncrementalSnapshot:
+    """
+    🔄 In-memory per-recipe structure kept in step with MongoDB
+    
+    Refreshed incrementally: recipes this process wrote (touch) and recipes
+    whose metadata.updated_at moved are re-read; deleted recipes are dropped.
+    A recipe count that no longer adds up (e.g. deletes by a process without
+    a change watcher) triggers a full rebuild. Subclasses hold the data and
+    implement _clear, _upsert, _drop and __len__.
+    """
+    
+    # Fields each recipe is read with
+    projection: Dict = {}
+    
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = float(os.getenv('SNAPSHOT_MAX_AGE', '2')) if max_age is None else max_age
+        self._lock = threading.RLock()
+        self._pending = set()
+        self._stale = True
+        self._checked_at = 0.0
+        self.as_of: Optional[datetime] = None
+        self._clear()
+    
+    def __len__(self) -> int:
+        raise NotImplementedError
+    
+    def _clear(self):
+        raise NotImplementedError
+    
+    def _load(self, docs: Iterable[Dict]):
+        """Fill freshly cleared structures from every recipe (in _id order)"""
+        for doc in docs:
+            self._upsert(doc)
+    
+    def _upsert(self, doc: Dict):
+        raise NotImplementedError
+    
+    def _drop(self, recipe_id):
+        raise NotImplementedError
+    
+    def touch(self, recipe_ids: Iterable):
+        """✏️ Re-read these recipes on the next refresh (called after writes)"""
+        with self._lock:
+            self._pending.update(recipe_ids)
+    
+    def reset(self):
+        """🧹 Rebuild from scratch on the next refresh"""
+        with self._lock:
+            self._stale = True
+    
+    def refresh(self, collection, force: bool = False) -> 'IncrementalSnapshot':
+        """
+        🔄 Bring the snapshot up to date
+        
+        Args:
+            collection: The recipes collection
+            force: Check for changes even if the last check is recent
+        
+        Returns:
+            self
+        """
+        with self._lock:
+            if self._stale:
+                return self.build(collection)
+            if not (force or self._pending or time.monotonic() - self._checked_at >= self.max_age):
+                return self
+            
+            started = datetime.now()
+            pending, self._pending = list(self._pending), set()
+            changed = {"metadata.updated_at": {"$gt": self.as_of - POLL_OVERLAP}}
+            query = {"$or": [changed, {"_id": {"$in": pending}}]} if pending else changed
+            seen = set()
+            for doc in collection.find(query, self.projection):
+                seen.add(doc['_id'])
+                self._upsert(doc)
+            for recipe_id in pending:
+                if recipe_id not in seen:
+                    self._drop(recipe_id)
+            
+            self.as_of = started
+            self._checked_at = time.monotonic()
+            if self._stale or len(self) != collection.estimated_document_count():
+                return self.build(collection)
+            return self
+    
+    def build(self, collection) -> 'IncrementalSnapshot':
+        """🏗️ Load every recipe into fresh structures"""
+        started = datetime.now()
+        return self.load(collection.find({}, self.projection).sort("_id", 1), started)
+    
+    def load(self, docs: Iterable[Dict], as_of: Optional[datetime] = None) -> 'IncrementalSnapshot':
+        """
+        📥 Replace the contents with these recipe documents
+        
+        Args:
+            docs: Every recipe, in _id order
+            as_of: When the documents were read (default: now)
+        
+        Returns:
+            self
+        """
+        with self._lock:
+            self._clear()
+            self._load(docs)
+            self._pending.clear()
+            self._stale = False
+            self.as_of = as_of or datetime.now()
+            self._checked_at = time.monotonic()
+            return self
+
+class CatalogSnapshot(IncrementalSnapshot):
+    """
+    🧮 One NumPy column per filterable recipe field, one row per recipe
+    
+    Filters and group-bys run as vectorized boolean masks instead of a database
+    query each; deleted recipes are dropped from the mask.
+    """
+    
+    projection = SNAPSHOT_PROJECTION
+    
+    def _clear(self):
+        self.ids: List = []
+        self._rows: Dict = {}
+        self.dictionaries = {name: _Dictionary() for name in ENCODED_COLUMNS}
+        self.columns = self._allocate(0)
+    
+    @staticmethod
+    def _allocate(capacity: int) -> Dict[str, np.ndarray]:
+        columns = {name: np.full(capacity, -1, dtype=np.int32) for name in ENCODED_COLUMNS}
+        columns.update({name: np.full(capacity, np.nan) for name in NUMERIC_COLUMNS})
+        columns[FLAG_COLUMN] = np.full(capacity, -1, dtype=np.int8)
+        columns['alive'] = np.zeros(capacity, dtype=bool)
+        return columns
+    
+    def __len__(self) -> int:
+        return int(self.columns['alive'][:len(self.ids)].sum())
+    
+    def _row_values(self, doc: Dict) -> Dict:
+        view = RecipeView(doc)
+        metadata = view.metadata
+        favorite = doc.get('is_favorite')
+        total_minutes = view.get_total_minutes()
+        return {
+            'cuisine': self.dictionaries['cuisine'].encode(metadata.get('cuisine')),
+            'difficulty': self.dictionaries['difficulty'].encode(metadata.get('difficulty')),
+            'status': self.dictionaries['status'].encode(doc.get('status')),
+            'servings': _number(metadata.get('servings')),
+            'total_minutes': np.nan if total_minutes is None else total_minutes,
+            'difficulty_level': view.get_difficulty_level(),
+            FLAG_COLUMN: int(favorite) if isinstance(favorite, bool) else -1,
+            'alive': True
+        }
+    
+    def _load(self, docs: Iterable[Dict]):
+        # One allocation for the whole catalog instead of growing row by row
+        rows = []
+        for doc in docs:
+            self._rows[doc['_id']] = len(self.ids)
+            self.ids.append(doc['_id'])
+            rows.append(self._row_values(doc))
+        
+        self.columns = self._allocate(max(len(rows), 16))
+        for name, column in self.columns.items():
+            column[:len(rows)] = [row[name] for row in rows]
+    
+    def _drop(self, recipe_id):
+        row = self._rows.get(recipe_id)
+        if row is not None:
+            self.columns['alive'][row] = False
+    
+    def _upsert(self, doc: Dict):
+        row = self._rows.get(doc['_id'])
+        if row is None:
+            row = len(self.ids)
+            if row == len(self.columns['alive']):
+                grown = self._allocate(row * 2)
+                for name, column in self.columns.items():
+                    grown[name][:row] = column
+                self.columns = grown
+            self._rows[doc['_id']] = row
+            self.ids.append(doc['_id'])
+        for name, value in self._row_values(doc).items():
+            self.columns[name][row] = value
+    
+    def mask(self, cuisine: str = "", difficulty: str = "", is_favorite: Optional[bool] = None,
+             status: str = "", min_servings: Optional[float] = None, max_servings: Optional[float] = None,
+             max_total_minutes: Optional[float] = None, max_difficulty_level: Optional[int] = None) -> np.ndarray:
+        """
+        🎭 Boolean row mask for the filters (same semantics as advanced_search)
+        
+        Returns:
+            Array with one bool per row; deleted rows are always False
+        """
+        with self._lock:
+            size = len(self.ids)
+            columns = {name: column[:size] for name, column in self.columns.items()}
+            selected = columns['alive'].copy()
+            for name, value in (('cuisine', cuisine), ('difficulty', difficulty), ('status', status)):
+                if value:
+                    selected &= columns[name] == self.dictionaries[name].lookup(value)
+            if is_favorite is not None:
+                selected &= columns[FLAG_COLUMN] == int(bool(is_favorite))
+            if min_servings is not None:
+                selected &= columns['servings'] >= min_servings
+            if max_servings is not None:
+                selected &= columns['servings'] <= max_servings
+            if max_total_minutes is not None:
+                selected &= columns['total_minutes'] <= max_total_minutes
+            if max_difficulty_level is not None:
+                selected &= columns['difficulty_level'] <= max_difficulty_level
+            return selected
+    
+    def select(self, order_by: Optional[str] = None, **filters) -> List:
+        """
+        🔍 Ids of the matching recipes
+        
+        Args:
+            order_by: Numeric column to sort ascending by (missing values last);
+                      catalog order by default
+            **filters: Same filters as mask()
+        """
+        with self._lock:
+            rows = np.flatnonzero(self.mask(**filters))
+            if order_by:
+                if order_by not in NUMERIC_COLUMNS:
+                    raise ValueError(f"Cannot order by {order_by!r}")
+                rows = rows[np.argsort(self.columns[order_by][rows], kind='stable')]
+            return [self.ids[row] for row in rows]
+    
+    def count(self, **filters) -> int:
+        """🔢 Number of matching recipes"""
+        return int(self.mask(**filters).sum())
+    
+    def group_by(self, column: str, **filters) -> Dict:
+        """
+        📊 Count matching recipes per value of a column
+        
+        Args:
+            column: 'cuisine', 'difficulty', 'status', 'is_favorite', 'servings',
+                    'total_minutes' or 'difficulty_level'
+            **filters: Same filters as mask()
+        
+        Returns:
+            Dict of value -> count, most common first (missing values under None)
+        """
+        if column not in self.columns or column == 'alive':
+            raise ValueError(f"Unknown snapshot column: {column!r}")
+        with self._lock:
+            values = self.columns[column][:len(self.ids)][self.mask(**filters)]
+            if column in NUMERIC_COLUMNS:
+                missing = int(np.isnan(values).sum())
+                keys, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+                labels = [int(key) if float(key).is_integer() else float(key) for key in keys]
+            else:
+                keys, counts = np.unique(values, return_counts=True)
+                missing = int(counts[keys == -1].sum())
+                keys, counts = keys[keys != -1], counts[keys != -1]
+                if column == FLAG_COLUMN:
+                    labels = [bool(key) for key in keys]
+                else:
+                    labels = [self.dictionaries[column].values[key] for key in keys]
+            
+            groups = dict(zip(labels, counts.tolist()))
+            if missing:
+                groups[None] = missing
+            return dict(sorted(groups.items(), key=lambda item: (-item[1], str(item[0]))))
@@ -0,0 +1,266 @@
+# recipe_stats.py - Stats counters and the materialized stats document
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+# 📊 Materialized stats: one summary document plus one counter document per ingredient
+# (ingredient frequencies live in their own collection to stay clear of the 16MB document limit)
+STATS_COLLECTION = 'recipe_stats'
+STATS_DOC_ID = 'global'
+
+# Fields a recipe contributes to the stats
+STATS_PROJECTION = {"is_favorite": 1, "status": 1, "ingredients": 1, "instructions": 1,
+                    "metadata.cuisine": 1, "metadata.difficulty": 1}
+
+STATUSES = ('want_to_try', 'tried', 'made_before')
+
+# 🔡 $toLower only folds ASCII, so Python-side counting does the same
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+def or_unknown(value):
+    """Mirror $ifNull: missing or null values count as 'Unknown'"""
+    return 'Unknown' if value is None else value
+
+def normalize_ingredient(ingredient: str) -> str:
+    """🥄 Key used for ingredient frequency (matches $trim + $toLower)"""
+    return ingredient.translate(_ASCII_LOWER).strip()
+
+def by_count_then_name(item):
+    """Sort key for (name, count): highest count first, ties alphabetical"""
+    return (-item[1], str(item[0]))
+
+def encode_key(value) -> str:
+    """🔐 Make a value safe to use as a field name ('.' and leading '$' are reserved)"""
+    key = str(value).replace('.', '．')
+    return '＄' + key[1:] if key.startswith('$') else key
+
+def decode_key(key: str) -> str:
+    """🔓 Reverse encode_key"""
+    key = key.replace('．', '.')
+    return '$' + key[1:] if key.startswith('＄') else key
+
+def build_stats(total_recipes: int, favorites_count: int, status_counts: Dict, cuisines: Dict,
+                difficulties: Dict, ingredients_sum: int, instructions_sum: int,
+                common_ingredients: List) -> Dict:
+    """📊 Assemble the stats payload from raw counters (shared by every stats source)"""
+    cuisines = dict(sorted(cuisines.items(), key=by_count_then_name))
+    difficulties = dict(sorted(difficulties.items(), key=by_count_then_name))
+    return {
+        'total_recipes': total_recipes,
+        'favorites_count': favorites_count,
+        'favorites_percentage': round((favorites_count / total_recipes) * 100, 1),
+        'status_counts': {status: status_counts.get(status, 0) for status in STATUSES},
+        'cuisines': cuisines,
+        'difficulties': difficulties,
+        'avg_ingredients': round(ingredients_sum / total_recipes, 1),
+        'avg_instructions': round(instructions_sum / total_recipes, 1),
+        'common_ingredients': dict(common_ingredients),
+        # Dicts are already sorted by count, so the first key is the most common
+        'most_popular_cuisine': next(iter(cuisines), 'N/A'),
+        'most_common_difficulty': next(iter(difficulties), 'N/A')
+    }
+
+def tally(docs: Iterable[Dict]) -> Tuple[Counter, Counter]:
+    """
+    🧮 Count what a set of recipe documents contributes to the stats
+    
+    Returns:
+        (fields, ingredients) - fields are $inc paths on the summary document
+        (e.g. 'status.tried'), ingredients map normalized ingredient to count
+    """
+    fields = Counter()
+    ingredients = Counter()
+    for doc in docs:
+        metadata = doc.get('metadata') or {}
+        doc_ingredients = doc.get('ingredients') or []
+        fields['total'] += 1
+        fields['favorites'] += doc.get('is_favorite') is True
+        fields[f"status.{encode_key(doc.get('status'))}"] += 1
+        fields[f"cuisine.{encode_key(or_unknown(metadata.get('cuisine')))}"] += 1
+        fields[f"difficulty.{encode_key(or_unknown(metadata.get('difficulty')))}"] += 1
+        fields['ingredients_sum'] += len(doc_ingredients)
+        fields['instructions_sum'] += len(doc.get('instructions') or [])
+        ingredients.update(normalize_ingredient(ing) for ing in doc_ingredients)
+    return fields, ingredients
+
+def stats_from_counters(doc: Dict, common_ingredients: List) -> Dict:
+    """📊 Build the stats payload from a (nested) counters document"""
+    total = doc.get('total', 0)
+    if total <= 0:
+        return {}
+    
+    def counts(field):
+        return {decode_key(key): count for key, count in (doc.get(field) or {}).items() if count > 0}
+    
+    return build_stats(
+        total_recipes=total,
+        favorites_count=doc.get('favorites', 0),
+        status_counts=counts('status'),
+        cuisines=counts('cuisine'),
+        difficulties=counts('difficulty'),
+        ingredients_sum=doc.get('ingredients_sum', 0),
+        instructions_sum=doc.get('instructions_sum', 0),
+        common_ingredients=common_ingredients
+    )
+
+def _nest(fields: Counter) -> Dict:
+    """🪆 Turn flat 'status.tried' paths into a nested document"""
+    nested = {}
+    for path, value in fields.items():
+        if '.' in path:
+            field, key = path.split('.', 1)
+            nested.setdefault(field, {})[key] = value
+        else:
+            nested[path] = value
+    return nested
+
+class StatsStore:
+    """
+    📈 Incrementally maintained stats document
+    
+    Every recipe write sends its delta here as a single atomic $inc. Deltas are
+    only applied once the summary document exists (see rebuild), so a partially
+    counted document is never served. Use verify/rebuild to correct drift.
+    """
+    
+    def __init__(self, db, name: str = STATS_COLLECTION):
+        self.summary = db[name]
+        self.ingredients = db[f"{name}_ingredients"]
+    
+    def increment(self, fields: Dict, ingredients: Optional[Dict] = None) -> bool:
+        """
+        ➕ Apply counter deltas atomically
+        
+        Args:
+            fields: $inc paths on the summary document
+            ingredients: Normalized ingredient -> count delta
+        
+        Returns:
+            bool: True if the stats document exists and was updated
+        """
+        inc = {path: delta for path, delta in fields.items() if delta}
+        if not inc and not ingredients:
+            return True
+        update = {"$set": {"updated_at": datetime.now()}}
+        if inc:
+            update["$inc"] = inc
+        try:
+            result = self.summary.update_one({"_id": STATS_DOC_ID}, update)
+            if not result.matched_count:
+                return False
+            
+            ops = [UpdateOne({"_id": name}, {"$inc": {"count": delta}}, upsert=True)
+                   for name, delta in (ingredients or {}).items() if delta]
+            if ops:
+                self.ingredients.bulk_write(ops, ordered=False)
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not update stats (run: python start.py stats-verify): {e}")
+            return False
+    
+    def record(self, before: Optional[Dict] = None, after: Optional[Dict] = None) -> bool:
+        """🔄 Record a recipe insert (before=None), delete (after=None) or replacement"""
+        return self.record_many([(before, after)])
+    
+    def record_many(self, changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]) -> bool:
+        """📦 Record several (before, after) changes with a single $inc"""
+        changes = list(changes)
+        fields, ingredients = tally(after for _, after in changes if after)
+        old_fields, old_ingredients = tally(before for before, _ in changes if before)
+        fields.subtract(old_fields)
+        ingredients.subtract(old_ingredients)
+        return self.increment(fields, ingredients)
+    
+    def record_favorite(self, was_favorite: bool, is_favorite: bool) -> bool:
+        """❤️ Record a favorite flag change"""
+        return self.increment({'favorites': int(bool(is_favorite)) - int(bool(was_favorite))})
+    
+    def record_status(self, old_status: str, new_status: str, count: int = 1) -> bool:
+        """📝 Record `count` recipes moving from one status to another"""
+        if old_status == new_status:
+            return True
+        return self.increment({
+            f"status.{encode_key(old_status)}": -count,
+            f"status.{encode_key(new_status)}": count
+        })
+    
+    def top_ingredients(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """🥇 Most common ingredients from the counter collection"""
+        cursor = self.ingredients.find({"count": {"$gt": 0}}).sort([("count", -1), ("_id", 1)]).limit(limit)
+        return [(doc['_id'], doc['count']) for doc in cursor]
+    
+    def read(self) -> Optional[Dict]:
+        """
+        📖 Read the materialized stats
+        
+        Returns:
+            Stats payload, {} if there are no recipes, None if it has never been built
+        """
+        doc = self.summary.find_one({"_id": STATS_DOC_ID})
+        if doc is None:
+            return None
+        if doc.get('total', 0) <= 0:
+            return {}
+        return stats_from_counters(doc, self.top_ingredients())
+    
+    def rebuild(self, collection) -> Dict:
+        """
+        🏗️ Recount everything from the recipes collection and replace the stats
+        
+        Returns:
+            The rebuilt stats payload
+        """
+        fields, ingredients = tally(collection.find({}, STATS_PROJECTION))
+        
+        self.ingredients.delete_many({})
+        batch = []
+        for name, count in ingredients.items():
+            batch.append({"_id": name, "count": count})
+            if len(batch) == 1000:
+                self.ingredients.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            self.ingredients.insert_many(batch, ordered=False)
+        
+        doc = _nest(fields)
+        doc['rebuilt_at'] = datetime.now()
+        self.summary.replace_one({"_id": STATS_DOC_ID}, doc, upsert=True)
+        print(f"✅ Stats rebuilt over {fields['total']} recipes")
+        return stats_from_counters(doc, self.top_ingredients())
+    
+    def verify(self, collection) -> List[str]:
+        """
+        🔍 Compare the materialized stats against a fresh count
+        
+        Returns:
+            List of human-readable differences (empty if in sync)
+        """
+        doc = self.summary.find_one({"_id": STATS_DOC_ID})
+        if doc is None:
+            return ["stats document has never been built"]
+        
+        fields, ingredients = tally(collection.find({}, STATS_PROJECTION))
+        expected = _nest(+fields)
+        problems = []
+        
+        for field in ('total', 'favorites', 'ingredients_sum', 'instructions_sum'):
+            if doc.get(field, 0) != expected.get(field, 0):
+                problems.append(f"{field}: stored {doc.get(field, 0)}, actual {expected.get(field, 0)}")
+        
+        for field in ('status', 'cuisine', 'difficulty'):
+            stored = {key: count for key, count in (doc.get(field) or {}).items() if count}
+            actual = expected.get(field, {})
+            for key in sorted(set(stored) | set(actual)):
+                if stored.get(key, 0) != actual.get(key, 0):
+                    problems.append(f"{field}.{decode_key(key)}: stored {stored.get(key, 0)}, "
+                                    f"actual {actual.get(key, 0)}")
+        
+        stored_ingredients = {d['_id']: d['count'] for d in self.ingredients.find({"count": {"$ne": 0}})}
+        drifted = [name for name in set(stored_ingredients) | set(ingredients)
+                   if stored_ingredients.get(name, 0) != ingredients.get(name, 0)]
+        if drifted:
+            problems.append(f"ingredient counts differ for {len(drifted)} ingredient(s)")
+        
+        return problems
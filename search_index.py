@@ -0,0 +1,251 @@
+# search_index.py - In-memory inverted index with BM25 ranking
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+# 🏷️ Field weights - a hit in the name counts more than one in the instructions
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'ingredients': 2.0,
+    'tags': 2.0,
+    'instructions': 1.0
+}
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into',
+    'is', 'it', 'of', 'on', 'or', 'the', 'then', 'to', 'until', 'with'
+}
+
+_TOKEN_RE = re.compile(r"[^\W\d_]+")
+
+def normalize_term(word: str) -> str:
+    """🔤 Light plural stemming so 'tomatoes' and 'tomato' share a term"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith(('oes', 'ches', 'shes', 'sses', 'xes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+def tokenize(text: str) -> List[str]:
+    """
+    ✂️ Split text into normalized search terms
+    
+    Lowercases, strips accents, drops digits, punctuation and stopwords.
+    """
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return [normalize_term(word) for word in _TOKEN_RE.findall(text)
+            if len(word) > 1 and word not in STOPWORDS]
+
+def document_fields(doc: Dict) -> Dict[str, Iterable[str]]:
+    """📄 Pull the searchable text fields out of a recipe document"""
+    return {
+        'name': [doc.get('name', '')],
+        'ingredients': doc.get('ingredients', []),
+        'tags': doc.get('metadata', {}).get('tags', []),
+        'instructions': doc.get('instructions', [])
+    }
+
+class _Champions:
+    """🏅 The highest-impact documents of one frequent term, kept as a min-heap of (impact, doc_id)"""
+    
+    def __init__(self, impacts: Iterable[Tuple[float, str]], size: int, avg_length: float):
+        self.heap = heapq.nlargest(size, impacts)
+        heapq.heapify(self.heap)
+        self.members = {doc_id for _, doc_id in self.heap}
+        # Impacts stay comparable only under the average length they were computed with
+        self.avg_length = avg_length
+    
+    def offer(self, impact: float, doc_id: str):
+        """➕ Take a new document in if it beats the weakest champion"""
+        if impact > self.heap[0][0]:
+            _, evicted = heapq.heapreplace(self.heap, (impact, doc_id))
+            self.members.discard(evicted)
+            self.members.add(doc_id)
+
+class SearchIndex:
+    """
+    🔎 Inverted index over recipe names, ingredients, tags and instructions
+    
+    Postings map each term to {doc_id: weighted term frequency}. Frequent terms
+    also keep a cached "champion list" of their highest-impact documents, so a
+    query only scores a bounded candidate set and latency stays flat as the
+    catalog grows. Candidates are then ranked exactly with BM25. New documents
+    join a champion list in place; it is rebuilt only after one of its
+    champions is removed.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_prefix_terms: int = 50,
+                 champion_size: int = 1000):
+        self.k1 = k1
+        self.b = b
+        self.max_prefix_terms = max_prefix_terms
+        self.champion_size = champion_size
+        self._champions: Dict[str, _Champions] = {}
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.total_length = 0.0
+        self._sorted_terms: List[str] = []
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+    
+    def __contains__(self, doc_id) -> bool:
+        return str(doc_id) in self.doc_lengths
+    
+    def add_document(self, doc_id, doc: Dict):
+        """➕ Index (or re-index) a recipe document"""
+        doc_id = str(doc_id)
+        weighted = Counter()
+        for field, values in document_fields(doc).items():
+            weight = FIELD_WEIGHTS[field]
+            for value in values:
+                for term in tokenize(value or ''):
+                    weighted[term] += weight
+        
+        with self._lock:
+            self._remove(doc_id)
+            length = sum(weighted.values())
+            for term, tf in weighted.items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = {}
+                    bisect.insort(self._sorted_terms, term)
+                postings[doc_id] = tf
+                champions = self._champions.get(term)
+                if champions is not None:
+                    champions.offer(self._impact(tf, length, champions.avg_length), doc_id)
+            self.doc_terms[doc_id] = dict(weighted)
+            self.doc_lengths[doc_id] = length
+            self.total_length += length
+    
+    def remove_document(self, doc_id):
+        """🗑️ Drop a document from the index"""
+        with self._lock:
+            self._remove(str(doc_id))
+    
+    def _remove(self, doc_id: str):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            champions = self._champions.get(term)
+            if champions is not None and doc_id in champions.members:
+                del self._champions[term]
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+                index = bisect.bisect_left(self._sorted_terms, term)
+                del self._sorted_terms[index]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+    
+    def clear(self):
+        """🧹 Empty the index"""
+        with self._lock:
+            self.postings.clear()
+            self.doc_terms.clear()
+            self.doc_lengths.clear()
+            self._champions.clear()
+            self.total_length = 0.0
+            self._sorted_terms = []
+    
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """🌱 The term itself plus indexed terms it is a prefix of (down-weighted)"""
+        expanded = [(term, 1.0)] if term in self.postings else []
+        if len(term) >= 3:
+            start = bisect.bisect_left(self._sorted_terms, term)
+            for candidate in self._sorted_terms[start:start + self.max_prefix_terms + 1]:
+                if not candidate.startswith(term):
+                    break
+                if candidate != term:
+                    expanded.append((candidate, 0.5))
+        return expanded
+    
+    def _candidates(self, term: str, avg_length: float) -> Iterable[str]:
+        """🏅 Documents worth scoring for a term - all of them, or its champion list if frequent"""
+        postings = self.postings[term]
+        if len(postings) <= self.champion_size:
+            return postings
+        
+        champions = self._champions.get(term)
+        if champions is None:
+            impacts = ((self._impact(tf, self.doc_lengths[doc_id], avg_length), doc_id)
+                       for doc_id, tf in postings.items())
+            champions = self._champions[term] = _Champions(impacts, self.champion_size, avg_length)
+        return champions.members
+    
+    def _impact(self, tf: float, length: float, avg_length: float) -> float:
+        """📈 A document's BM25 term-frequency component, without the idf"""
+        return tf / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+    
+    def search(self, query: str, k: int = 50) -> List[Tuple[str, float]]:
+        """
+        🏆 Rank documents against a free-text query
+        
+        Args:
+            query: Search text
+            k: Number of results to return
+        
+        Returns:
+            List of (doc_id, score), best first
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        
+        with self._lock:
+            total_docs = len(self.doc_lengths)
+            if not total_docs:
+                return []
+            avg_length = self.total_length / total_docs
+            
+            # Expand query terms and gather a bounded candidate set
+            weighted_terms = []
+            candidates = set()
+            for query_term in terms:
+                for term, boost in self._expand(query_term):
+                    postings = self.postings[term]
+                    df = len(postings)
+                    idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                    weighted_terms.append((postings, boost * idf))
+                    candidates.update(self._candidates(term, avg_length))
+            
+            # Exact BM25 over the candidates
+            scores = []
+            for doc_id in candidates:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                score = 0.0
+                for postings, weight in weighted_terms:
+                    tf = postings.get(doc_id)
+                    if tf:
+                        score += weight * tf * (self.k1 + 1) / (tf + norm)
+                scores.append((doc_id, score))
+        
+        return heapq.nlargest(k, scores, key=lambda item: item[1])
+    
+    def build(self, documents: Iterable[Dict]) -> int:
+        """
+        🏗️ Rebuild the index from an iterable of recipe documents
+        
+        Returns:
+            int: Number of documents indexed
+        """
+        with self._lock:
+            self.clear()
+            count = 0
+            for doc in documents:
+                self.add_document(doc['_id'], doc)
+                count += 1
+            return count
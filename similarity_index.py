@@ -0,0 +1,199 @@
+# similarity_index.py - MinHash/LSH index for "you might also like" recommendations
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+
+from recipe_parsing import INGREDIENT_NAMES_FIELD, STAPLES, ingredient_names
+from recipe_snapshot import IncrementalSnapshot
+
+# 🎲 Random hash family h(x) = (a * x + b) mod p over 31-bit feature hashes
+_PRIME = (1 << 31) - 1
+# Fixed seed: signatures are comparable across rebuilds
+_SEED = 1
+
+SIMILARITY_PROJECTION = {"ingredients": 1, INGREDIENT_NAMES_FIELD: 1, "metadata.tags": 1}
+# Recipes signed per NumPy batch on a full build
+LOAD_BATCH = 10000
+
+def _feature_hash(feature: str) -> int:
+    return zlib.crc32(feature.encode('utf-8')) & _PRIME
+
+def recipe_features(doc: Dict) -> Set[str]:
+    """
+    🧩 Set a recipe is compared on: canonical ingredients (minus staples) plus tags
+    
+    Returns:
+        Feature strings; tags are prefixed with '#'
+    """
+    names = doc.get(INGREDIENT_NAMES_FIELD)
+    if names is None:
+        # Not backfilled yet (start.py backfill-ingredients)
+        names = ingredient_names(doc.get('ingredients'))
+    features = {name for name in names if name not in STAPLES}
+    tags = (doc.get('metadata') or {}).get('tags') or []
+    features.update(f"#{str(tag).strip().lower()}" for tag in tags if str(tag).strip())
+    return features
+
+class SimilarityIndex(IncrementalSnapshot):
+    """
+    🧲 Locality-sensitive hashing over MinHash signatures of recipe features
+    
+    Each recipe gets a signature of bands * rows MinHash values; two recipes
+    agree on a value with probability equal to their Jaccard similarity.
+    Each band is hashed into a bucket, so recipes sharing any band become
+    candidates - a lookup reads a few small buckets instead of comparing
+    against the whole catalog. Candidates are ranked by the fraction of
+    signature values they share. With the default 20 bands of 3 rows, pairs
+    above ~0.37 similarity are found with high probability.
+    
+    Rows are append-only like PantryIndex: a recipe whose features changed
+    moves to a new row, the old one is dropped from its buckets. Recipes with
+    nothing to compare on get no row but are still counted, so the index size
+    matches the collection and refresh() does not keep rebuilding.
+    """
+    
+    projection = SIMILARITY_PROJECTION
+    
+    def __init__(self, bands: int = 20, rows: int = 3, max_age=None):
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.default_rng(_SEED)
+        self._a = rng.integers(1, _PRIME, size=bands * rows, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=bands * rows, dtype=np.uint64)
+        super().__init__(max_age)
+    
+    def _clear(self):
+        self.ids: List = []
+        self._rows: Dict = {}
+        # Recipes without features (no ingredients beyond staples, no tags)
+        self._featureless: Set = set()
+        self._buckets: List[Dict[bytes, array]] = [{} for _ in range(self.bands)]
+        self.signatures = np.zeros((16, self.bands * self.rows), dtype=np.uint32)
+        self._dead = 0
+    
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._featureless)
+    
+    def signature(self, features: Iterable[str]) -> np.ndarray:
+        """✍️ MinHash signature of a feature set (uint32, bands * rows values)"""
+        hashes = np.fromiter(map(_feature_hash, features), dtype=np.uint64)
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+    
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+    
+    def _reserve(self, size: int):
+        if size > len(self.signatures):
+            grown = np.zeros((max(size, 2 * len(self.signatures)), self.signatures.shape[1]), dtype=np.uint32)
+            grown[:len(self.signatures)] = self.signatures
+            self.signatures = grown
+    
+    def _load(self, docs: Iterable[Dict]):
+        # Sign the catalog in batches instead of one NumPy call per recipe
+        batch = []
+        for doc in docs:
+            batch.append(doc)
+            if len(batch) == LOAD_BATCH:
+                self._load_batch(batch)
+                batch = []
+        self._load_batch(batch)
+    
+    def _load_batch(self, docs: List[Dict]):
+        ids, hashes, starts = [], [], []
+        for doc in docs:
+            features = recipe_features(doc)
+            if not features:
+                self._featureless.add(doc['_id'])
+            else:
+                ids.append(doc['_id'])
+                starts.append(len(hashes))
+                hashes.extend(map(_feature_hash, features))
+        if not ids:
+            return
+        
+        values = (np.outer(self._a, np.array(hashes, dtype=np.uint64)) + self._b[:, None]) % _PRIME
+        signatures = np.minimum.reduceat(values, starts, axis=1).T.astype(np.uint32)
+        first = len(self.ids)
+        self._reserve(first + len(ids))
+        self.signatures[first:first + len(ids)] = signatures
+        for band, buckets in enumerate(self._buckets):
+            # One fixed-size bytes key per recipe, equal to _band_keys()
+            keys = np.ascontiguousarray(signatures[:, band * self.rows:(band + 1) * self.rows])
+            for row, key in enumerate(keys.view(f'V{keys.itemsize * self.rows}').ravel().tolist(), first):
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = array('i')
+                bucket.append(row)
+        self._rows.update(zip(ids, range(first, first + len(ids))))
+        self.ids.extend(ids)
+    
+    def _upsert(self, doc: Dict):
+        features = recipe_features(doc)
+        signature = self.signature(features) if features else None
+        row = self._rows.get(doc['_id'])
+        if row is not None:
+            if signature is not None and np.array_equal(self.signatures[row], signature):
+                return
+            self._drop(doc['_id'])
+        if signature is None:
+            # Nothing to compare on: counted, but never a candidate
+            self._featureless.add(doc['_id'])
+            return
+        
+        self._featureless.discard(doc['_id'])
+        row = len(self.ids)
+        self._reserve(row + 1)
+        self.signatures[row] = signature
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = array('i')
+            bucket.append(row)
+        self._rows[doc['_id']] = row
+        self.ids.append(doc['_id'])
+    
+    def _drop(self, recipe_id):
+        self._featureless.discard(recipe_id)
+        row = self._rows.pop(recipe_id, None)
+        if row is None:
+            return
+        for buckets, key in zip(self._buckets, self._band_keys(self.signatures[row])):
+            bucket = buckets[key]
+            bucket.remove(row)
+            if not bucket:
+                del buckets[key]
+        self._dead += 1
+        # Mostly dead rows: compact on the next refresh
+        if self._dead > max(1000, len(self._rows)):
+            self._stale = True
+    
+    def similar(self, recipe_id, k: int = 5) -> List[Dict]:
+        """
+        🧲 Recipes most similar to one already in the index
+        
+        Args:
+            recipe_id: ObjectId of the recipe
+            k: Number of neighbours to return
+        
+        Returns:
+            List of {'recipe_id', 'similarity'} (estimated Jaccard, 0-1), most similar first
+        """
+        with self._lock:
+            row = self._rows.get(recipe_id)
+            if row is None:
+                return []
+            signature = self.signatures[row]
+            candidates = set()
+            for buckets, key in zip(self._buckets, self._band_keys(signature)):
+                candidates.update(buckets[key])
+            candidates.discard(row)
+            if not candidates:
+                return []
+            
+            candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarity = (self.signatures[candidates] == signature).mean(axis=1)
+            order = np.lexsort((candidates, -similarity))[:k]
+            return [{'recipe_id': self.ids[candidates[i]], 'similarity': round(float(similarity[i]), 3)}
+                    for i in order]
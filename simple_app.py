@@ -1,37 +1,82 @@
 # simple_app.py - Complete Flask Recipe Management
 from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
 import json
+import os
+import signal
+import socket
+import threading
 import urllib.parse
-from recipe_manager import RecipeManager
+from html import escape
+from typing import Dict, List, Optional
+from recipe_manager import get_recipe_manager, release_shared_connection, DEFAULT_PAGE_SIZE
 from models import Recipe
+from recipe_export import EXPORT_FORMATS, json_default
+
+# 💡 Recommendations shown on the recipe detail page
+SIMILAR_RECIPES = 4
+# Shown when the in-memory indexes behind these features cannot be built
+PANTRY_UNAVAILABLE = "Pantry matching is unavailable on this server (it needs NumPy: pip install numpy)"
+SIMILAR_UNAVAILABLE = "Recommendations are unavailable on this server (they need NumPy: pip install numpy)"
 
 class RecipeHandler(BaseHTTPRequestHandler):
+    # 🔁 Persistent connections: every response carries an exact Content-Length
+    protocol_version = 'HTTP/1.1'
+    # ⏳ Close keep-alive connections idle for longer than this many seconds
+    # (an idle connection holds a pool thread, so keep this short)
+    timeout = float(os.getenv('SERVER_IDLE_TIMEOUT', '2'))
+    
     def __init__(self, *args, **kwargs):
-        self.manager = RecipeManager()
+        # 🤝 Borrow the shared manager instead of reconnecting per request
+        self.manager = get_recipe_manager()
         super().__init__(*args, **kwargs)
     
     def do_GET(self):
         """Handle GET requests"""
-        if self.path == '/':
-            self.serve_homepage()
-        elif self.path == '/recipes':
-            self.serve_recipes()
-        elif self.path == '/favorites':
-            self.serve_favorites()
-        elif self.path.startswith('/filter/'):
-            status = self.path.split('/')[-1]
-            self.serve_filtered_recipes(status)
-        elif self.path.startswith('/recipe/'):
-            recipe_id = self.path.split('/')[-1]
-            self.serve_recipe_detail(recipe_id)
-        elif self.path == '/stats':
-            self.serve_stats()
-
-        else:
-            self.send_error(404)
+        url = urllib.parse.urlsplit(self.path)
+        path = url.path
+        self.query_params = urllib.parse.parse_qs(url.query)
+        
+        try:
+            if path == '/':
+                self.serve_homepage()
+            elif path == '/recipes':
+                self.serve_recipes()
+            elif path == '/favorites':
+                self.serve_favorites()
+            elif path.startswith('/filter/'):
+                status = path.split('/')[-1]
+                self.serve_filtered_recipes(status)
+            elif path.startswith('/recipe/'):
+                recipe_id = path.split('/')[-1]
+                self.serve_recipe_detail(recipe_id)
+            elif path == '/stats':
+                self.serve_stats()
+            elif path == '/pantry':
+                self.serve_pantry()
+            elif path == '/api/pantry':
+                self.serve_pantry_api()
+            elif path == '/export':
+                self.serve_export()
+            elif path == '/api/cache':
+                self.send_json(self.manager.get_cache_stats())
+            
+            else:
+                self.send_error(404)
+        except ValueError as e:
+            # Bad query parameters, e.g. a malformed page cursor
+            self.send_error(400, str(e))
+    
+    # HEAD runs the GET handlers; send_body and serve_export skip the body
+    do_HEAD = do_GET
     
     def do_POST(self):
         """Handle POST requests"""
+        # Always consume the body so the next request on this connection starts cleanly
+        self.post_data = self.read_post_data()
+        if self.post_data is None:
+            return
+        
         if self.path == '/add_recipe':
             self.add_recipe()
         elif self.path.startswith('/delete/'):
@@ -44,11 +89,155 @@ class RecipeHandler(BaseHTTPRequestHandler):
             self.update_status()
         elif self.path == '/search':
             self.handle_search()
+        elif self.path == '/api/batch':
+            self.handle_batch()
         else:
             self.send_error(404)
     
+    def handle_one_request(self):
+        """🔁 Serve one request, closing the connection if the server is draining"""
+        super().handle_one_request()
+        if getattr(self.server, 'draining', False):
+            self.close_connection = True
+    
+    def read_post_data(self) -> Optional[str]:
+        """
+        📥 Read the request body (empty if there is no Content-Length)
+        
+        Returns:
+            The body, or None after sending 411/400 when its length is unknown or invalid
+        """
+        length = self.headers.get('Content-Length')
+        if length is None and self.headers.get('Transfer-Encoding'):
+            # Chunked bodies are not supported; the connection cannot be reused
+            self.close_connection = True
+            self.send_error(411, "Content-Length required")
+            return None
+        try:
+            content_length = int(length or 0)
+            if content_length < 0:
+                raise ValueError(length)
+            return self.rfile.read(content_length).decode('utf-8') if content_length else ''
+        except (ValueError, UnicodeDecodeError):
+            self.close_connection = True
+            self.send_error(400, "Invalid request body")
+            return None
+    
+    @staticmethod
+    def parse_page_params(query_params: Dict):
+        """📄 Extract (page_size, cursor) from parsed query parameters"""
+        try:
+            page_size = int(query_params.get('page_size', [DEFAULT_PAGE_SIZE])[0])
+        except ValueError:
+            raise ValueError("page_size must be a number")
+        cursor = query_params.get('cursor', [None])[0]
+        return page_size, cursor
+    
+    @staticmethod
+    def parse_export_params(query_params: Dict):
+        """📦 Extract (format_type, batch_size, compress) from parsed query parameters"""
+        format_type = query_params.get('format', ['ndjson'])[0]
+        try:
+            batch_size = int(query_params.get('batch_size', ['500'])[0])
+        except ValueError:
+            raise ValueError("batch_size must be a number")
+        compress = query_params.get('gzip', ['0'])[0].lower() in ('1', 'true', 'yes')
+        return format_type, batch_size, compress
+    
+    @staticmethod
+    def parse_pantry_params(query_params: Dict):
+        """🥫 Extract (pantry items, k, min_coverage, assume_staples) from parsed query parameters"""
+        pantry = [item.strip() for value in query_params.get('have', [])
+                  for item in value.replace('\n', ',').split(',') if item.strip()]
+        try:
+            k = int(query_params.get('k', ['20'])[0])
+            min_coverage = float(query_params.get('min_coverage', ['0'])[0])
+        except ValueError:
+            raise ValueError("k and min_coverage must be numbers")
+        if not 1 <= k <= 100:
+            raise ValueError("k must be between 1 and 100")
+        assume_staples = query_params.get('staples', ['1'])[0].lower() in ('1', 'true', 'yes')
+        return pantry, k, min_coverage, assume_staples
+    
+    @staticmethod
+    def pantry_payload(pantry: List[str], matches: Optional[List[Dict]]) -> Dict:
+        """📤 JSON body for /api/pantry (served with 503 when matches is None - matching unavailable)"""
+        if matches is None:
+            return {"pantry": pantry, "error": PANTRY_UNAVAILABLE, "results": []}
+        return {
+            "pantry": pantry,
+            "results": [{
+                "recipe_id": str(match['recipe']._id),
+                "name": match['recipe'].name,
+                "coverage": match['coverage'],
+                "matched": match['matched'],
+                "total": match['total'],
+                "missing": match['missing']
+            } for match in matches]
+        }
+    
+    @staticmethod
+    def export_headers(format_type: str, compress: bool) -> Dict[str, str]:
+        """📎 Content headers for an export download"""
+        content_type, extension = EXPORT_FORMATS[format_type]
+        filename = f"recipes.{extension}.gz" if compress else f"recipes.{extension}"
+        return {
+            'Content-Type': 'application/gzip' if compress else content_type,
+            'Content-Disposition': f'attachment; filename="{filename}"'
+        }
+    
+    @staticmethod
+    def render_pager(base_path: str, page) -> str:
+        """⬅️➡️ Render previous/next links for a paginated listing"""
+        prev_cursor = getattr(page, 'prev_cursor', None)
+        next_cursor = getattr(page, 'next_cursor', None)
+        if not prev_cursor and not next_cursor:
+            return ""
+        
+        def link(cursor):
+            params = {'cursor': cursor}
+            if page.page_size != DEFAULT_PAGE_SIZE:
+                params['page_size'] = page.page_size
+            return f"{base_path}?{urllib.parse.urlencode(params)}"
+        
+        links = []
+        if prev_cursor:
+            links.append(f'<a href="{link(prev_cursor)}">⬅️ Previous</a>')
+        if next_cursor:
+            links.append(f'<a href="{link(next_cursor)}">Next ➡️</a>')
+        return f'<div class="nav">{" ".join(links)}</div>'
+    
+    def send_body(self, body: bytes, content_type: str, status: int = 200):
+        """📤 Send a complete response with an exact Content-Length"""
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+    
+    def send_html(self, html: str, status: int = 200):
+        """📤 Send an HTML page"""
+        self.send_body(html.encode('utf-8'), 'text/html; charset=utf-8', status)
+    
+    def send_json(self, payload, status: int = 200):
+        """📤 Send a JSON response"""
+        self.send_body(json.dumps(payload, default=json_default).encode('utf-8'), 'application/json', status)
+    
+    def send_redirect(self, location: str):
+        """↪️ Send a 302 redirect with an empty body"""
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
     def serve_homepage(self):
         """🏠 Serve homepage with recipe form"""
+        self.send_html(self.render_homepage())
+    
+    @staticmethod
+    def render_homepage() -> str:
+        """🏠 Render homepage HTML with recipe form"""
         html = """
         <!DOCTYPE html>
         <html>
@@ -181,20 +370,33 @@ class RecipeHandler(BaseHTTPRequestHandler):
                     </div>
                     <button type="submit">🔍 Search</button>
                 </form>
+                
+                <hr style="margin: 40px 0;">
+                
+                <h2>🥫 What Can I Cook?</h2>
+                <form method="get" action="/pantry">
+                    <div class="form-group">
+                        <label for="have">Ingredients you have (one per line or comma-separated):</label>
+                        <textarea id="have" name="have" placeholder="eggs&#10;flour&#10;butter"></textarea>
+                    </div>
+                    <button type="submit">🥫 Find Recipes</button>
+                </form>
             </div>
         </body>
         </html>
         """
         
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        return html
     
     def serve_recipes(self):
         """📋 Serve all recipes page"""
-        recipes = self.manager.get_all_recipes()
-        
+        page_size, cursor = self.parse_page_params(self.query_params)
+        recipes = self.manager.get_all_recipes_page(page_size, cursor, summary=True)
+        self.send_html(self.render_recipes_page(recipes))
+    
+    @staticmethod
+    def render_recipes_page(recipes) -> str:
+        """📋 Render all recipes page HTML"""
         recipe_cards = ""
         for recipe in recipes:
             favorite_icon = "❤️" if recipe.is_favorite else "🤍"
@@ -205,8 +407,8 @@ class RecipeHandler(BaseHTTPRequestHandler):
             <div class="recipe-card">
                 <h3 class="recipe-title">{favorite_icon} {recipe.name} {status_emoji}</h3>
                 <div class="recipe-meta">
-                    🥘 {len(recipe.ingredients)} ingredients • 
-                    📋 {len(recipe.instructions)} steps • 
+                    🥘 {recipe.ingredients_count} ingredients • 
+                    📋 {recipe.instructions_count} steps • 
                     🌍 {recipe.metadata.get('cuisine', 'N/A')} • 
                     ⭐ {recipe.metadata.get('difficulty', 'N/A')} •
                     📝 {status_text} •
@@ -290,20 +492,24 @@ class RecipeHandler(BaseHTTPRequestHandler):
                 </div>
                 
                 {recipe_cards}
+                
+                {RecipeHandler.render_pager('/recipes', recipes)}
             </div>
         </body>
         </html>
         """
         
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        return html
     
     def serve_favorites(self):
         """❤️ Serve favorite recipes page"""
-        favorites = self.manager.get_favorite_recipes()
-        
+        page_size, cursor = self.parse_page_params(self.query_params)
+        favorites = self.manager.get_favorite_recipes_page(page_size, cursor, summary=True)
+        self.send_html(self.render_favorites_page(favorites))
+    
+    @staticmethod
+    def render_favorites_page(favorites) -> str:
+        """❤️ Render favorite recipes page HTML"""
         recipe_cards = ""
         for recipe in favorites:
             status_emoji = recipe.get_status_emoji()
@@ -313,8 +519,8 @@ class RecipeHandler(BaseHTTPRequestHandler):
             <div class="recipe-card">
                 <h3 class="recipe-title">❤️ {recipe.name} {status_emoji}</h3>
                 <div class="recipe-meta">
-                    🥘 {len(recipe.ingredients)} ingredients • 
-                    📋 {len(recipe.instructions)} steps • 
+                    🥘 {recipe.ingredients_count} ingredients • 
+                    📋 {recipe.instructions_count} steps • 
                     🌍 {recipe.metadata.get('cuisine', 'N/A')} • 
                     ⭐ {recipe.metadata.get('difficulty', 'N/A')} •
                     📝 {status_text} •
@@ -387,20 +593,24 @@ class RecipeHandler(BaseHTTPRequestHandler):
                 </div>
                 
                 {recipe_cards}
+                
+                {RecipeHandler.render_pager('/favorites', favorites)}
             </div>
         </body>
         </html>
         """
         
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        return html
     
     def serve_filtered_recipes(self, status):
         """📊 Serve recipes filtered by status"""
-        recipes = self.manager.get_recipes_by_status(status)
-        
+        page_size, cursor = self.parse_page_params(self.query_params)
+        recipes = self.manager.get_recipes_by_status_page(status, page_size, cursor, summary=True)
+        self.send_html(self.render_filtered_page(status, recipes))
+    
+    @staticmethod
+    def render_filtered_page(status, recipes) -> str:
+        """📊 Render status-filtered recipes page HTML"""
         status_info = {
             'want_to_try': ('🤔', 'Want to Try'),
             'tried': ('👍', 'Tried Once'), 
@@ -417,8 +627,8 @@ class RecipeHandler(BaseHTTPRequestHandler):
             <div class="recipe-card">
                 <h3 class="recipe-title">{favorite_icon} {recipe.name} {emoji}</h3>
                 <div class="recipe-meta">
-                    🥘 {len(recipe.ingredients)} ingredients • 
-                    📋 {len(recipe.instructions)} steps • 
+                    🥘 {recipe.ingredients_count} ingredients • 
+                    📋 {recipe.instructions_count} steps • 
                     🌍 {recipe.metadata.get('cuisine', 'N/A')} • 
                     ⭐ {recipe.metadata.get('difficulty', 'N/A')} •
                     🍽️ {recipe.metadata.get('servings', 'N/A')} servings
@@ -490,15 +700,14 @@ class RecipeHandler(BaseHTTPRequestHandler):
                 </div>
                 
                 {recipe_cards}
+                
+                {RecipeHandler.render_pager(f'/filter/{status}', recipes)}
             </div>
         </body>
         </html>
         """
         
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        return html
     
     def serve_recipe_detail(self, recipe_id):
         """👁️ Serve recipe detail page"""
@@ -508,6 +717,12 @@ class RecipeHandler(BaseHTTPRequestHandler):
             self.send_error(404, "Recipe not found")
             return
         
+        similar = self.manager.similar_recipes(recipe_id, k=SIMILAR_RECIPES)
+        self.send_html(self.render_recipe_detail(recipe, similar))
+    
+    @staticmethod
+    def render_recipe_detail(recipe, similar=()) -> str:
+        """👁️ Render recipe detail page HTML (with "you might also like" when similar recipes are given, None: unavailable)"""
         # Format ingredients
         ingredients_html = ""
         for i, ingredient in enumerate(recipe.ingredients, 1):
@@ -518,6 +733,15 @@ class RecipeHandler(BaseHTTPRequestHandler):
         for i, instruction in enumerate(recipe.instructions, 1):
             instructions_html += f"<li><strong>Step {i}:</strong> {instruction}</li>"
         
+        # Format recommendations
+        similar_html = ""
+        for match in similar or []:
+            other = match['recipe']
+            similar_html += (f'<li><a href="/recipe/{other._id}">{other.get_favorite_emoji()} {other.name}</a> '
+                             f'<span class="similarity">{match["similarity"] * 100:.0f}% alike</span></li>')
+        if similar is None:
+            similar_html = f'<li class="similarity">⚠️ {SIMILAR_UNAVAILABLE}</li>'
+        
         favorite_icon = "❤️" if recipe.is_favorite else "🤍"
         status_emoji = recipe.get_status_emoji()
         status_text = recipe.get_status_text()
@@ -545,6 +769,7 @@ class RecipeHandler(BaseHTTPRequestHandler):
                 .btn-danger:hover {{ background: #c0392b; }}
                 .action-buttons {{ text-align: center; margin: 20px 0; }}
                 .status-badge {{ background: #f39c12; color: white; padding: 5px 10px; border-radius: 15px; font-size: 12px; }}
+                .similarity {{ color: #7f8c8d; font-size: 12px; }}
             </style>
             <script>
                 function toggleFavorite() {{
@@ -584,8 +809,8 @@ class RecipeHandler(BaseHTTPRequestHandler):
                 </div>
                 
                 <div class="meta-info">
-                    <span class="meta-item">🥘 <strong>{len(recipe.ingredients)}</strong> ingredients</span>
-                    <span class="meta-item">📋 <strong>{len(recipe.instructions)}</strong> steps</span>
+                    <span class="meta-item">🥘 <strong>{recipe.ingredients_count}</strong> ingredients</span>
+                    <span class="meta-item">📋 <strong>{recipe.instructions_count}</strong> steps</span>
                     <span class="meta-item">🌍 <strong>{recipe.metadata.get('cuisine', 'N/A')}</strong></span>
                     <span class="meta-item">⭐ <strong>{recipe.metadata.get('difficulty', 'N/A')}</strong></span>
                     <span class="meta-item">🍽️ <strong>{recipe.metadata.get('servings', 'N/A')}</strong> servings</span>
@@ -616,20 +841,138 @@ class RecipeHandler(BaseHTTPRequestHandler):
                 </ol>
                 
                 {f'<h2>🏷️ Tags</h2><p>{", ".join(recipe.metadata.get("tags", []))}</p>' if recipe.metadata.get('tags') else ''}
+                
+                {f'<h2>💡 You Might Also Like</h2><ul>{similar_html}</ul>' if similar_html else ''}
             </div>
         </body>
         </html>
         """
         
+        return html
+    
+    def serve_export(self):
+        """📦 Stream the whole catalog as NDJSON or JSON with chunked transfer encoding"""
+        format_type, batch_size, compress = self.parse_export_params(self.query_params)
+        chunks = self.manager.stream_export(format_type, batch_size, compress)
+        
+        # HTTP/1.0 has no chunked encoding - the body ends when the connection closes
+        chunked = self.request_version == 'HTTP/1.1' and self.protocol_version == 'HTTP/1.1'
         self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
+        for name, value in self.export_headers(format_type, compress).items():
+            self.send_header(name, value)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = True
         self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        if self.command == 'HEAD':
+            return
+        
+        try:
+            for chunk in chunks:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk) if chunked else chunk)
+            if chunked:
+                self.wfile.write(b'0\r\n\r\n')
+        except Exception as e:
+            # Headers are gone already: drop the connection so the client sees a truncated body
+            print(f"❌ Error streaming export: {e}")
+            self.close_connection = True
+    
+    def serve_pantry(self):
+        """🥫 Serve the "what can I cook" page"""
+        pantry, k, min_coverage, assume_staples = self.parse_pantry_params(self.query_params)
+        matches = self.manager.find_by_pantry(pantry, k, min_coverage, assume_staples) if pantry else []
+        self.send_html(self.render_pantry_page(pantry, matches))
+    
+    def serve_pantry_api(self):
+        """🥫 Pantry matches as JSON"""
+        pantry, k, min_coverage, assume_staples = self.parse_pantry_params(self.query_params)
+        matches = self.manager.find_by_pantry(pantry, k, min_coverage, assume_staples) if pantry else []
+        self.send_json(self.pantry_payload(pantry, matches), 503 if matches is None else 200)
+    
+    @staticmethod
+    def render_pantry_page(pantry: List[str], matches: Optional[List[Dict]]) -> str:
+        """🥫 Render pantry matches HTML - best coverage first, with what is missing (None: unavailable)"""
+        recipe_cards = ""
+        for match in matches or []:
+            recipe = match['recipe']
+            favorite_icon = "❤️" if recipe.is_favorite else "🤍"
+            missing = ', '.join(escape(name) for name in match['missing']) or "nothing - you have it all! 🎉"
+            
+            recipe_cards += f"""
+            <div class="recipe-card">
+                <h3 class="recipe-title">{favorite_icon} {recipe.name} {recipe.get_status_emoji()}</h3>
+                <div class="coverage"><div class="coverage-bar" style="width: {match['coverage'] * 100:.0f}%"></div></div>
+                <div class="recipe-meta">
+                    ✅ {match['matched']} of {match['total']} ingredients ({match['coverage'] * 100:.0f}%) • 
+                    🌍 {recipe.metadata.get('cuisine', 'N/A')} • 
+                    ⭐ {recipe.metadata.get('difficulty', 'N/A')}
+                </div>
+                <p>🛒 Missing: {missing}</p>
+                <button onclick="window.location.href='/recipe/{recipe._id}'">👁️ View Details</button>
+            </div>
+            """
+        
+        if matches is None:
+            recipe_cards = f"<p>⚠️ {PANTRY_UNAVAILABLE}</p>"
+        elif pantry and not recipe_cards:
+            recipe_cards = "<p>😞 No recipes use those ingredients. Try adding a few more!</p>"
+        
+        html = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>🥫 What Can I Cook?</title>
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 40px; background: #f5f5f5; }}
+                .container {{ max-width: 1000px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+                h1 {{ color: #2c3e50; text-align: center; }}
+                .recipe-card {{ background: #ecf0f1; padding: 20px; margin: 15px 0; border-radius: 8px; border-left: 4px solid #27ae60; }}
+                .recipe-title {{ color: #2c3e50; margin-bottom: 10px; }}
+                .recipe-meta {{ color: #7f8c8d; font-size: 14px; margin-bottom: 10px; }}
+                .coverage {{ background: #d5dbdb; border-radius: 5px; height: 8px; margin-bottom: 10px; }}
+                .coverage-bar {{ background: #27ae60; border-radius: 5px; height: 8px; }}
+                textarea {{ width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 5px; box-sizing: border-box; min-height: 80px; }}
+                button {{ background: #3498db; color: white; padding: 8px 15px; border: none; border-radius: 5px; cursor: pointer; margin: 5px 5px 5px 0; }}
+                button:hover {{ background: #2980b9; }}
+                .nav {{ text-align: center; margin-bottom: 30px; }}
+                .nav a {{ margin: 0 10px; text-decoration: none; color: #3498db; font-weight: bold; padding: 8px 12px; border-radius: 5px; }}
+                .nav a:hover {{ background: #ecf0f1; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <h1>🥫 What Can I Cook?</h1>
+                
+                <div class="nav">
+                    <a href="/">🏠 Home</a>
+                    <a href="/recipes">📋 All Recipes</a>
+                    <a href="/favorites">❤️ Favorites</a>
+                    <a href="/stats">📊 Statistics</a>
+                </div>
+                
+                <form method="get" action="/pantry">
+                    <textarea name="have" placeholder="eggs&#10;flour&#10;butter">{escape(chr(10).join(pantry))}</textarea>
+                    <button type="submit">🥫 Find Recipes</button>
+                </form>
+                
+                {f"<p>Top {len(matches)} recipe(s) for your {len(pantry)} ingredient(s)</p>" if pantry and matches is not None else ""}
+                {recipe_cards}
+            </div>
+        </body>
+        </html>
+        """
+        
+        return html
     
     def serve_stats(self):
         """📊 Serve statistics page"""
         stats = self.manager.get_recipe_stats()
-        
+        self.send_html(self.render_stats_page(stats))
+    
+    @staticmethod
+    def render_stats_page(stats) -> str:
+        """📊 Render statistics page HTML"""
         if not stats:
             html = """
             <!DOCTYPE html>
@@ -759,64 +1102,59 @@ class RecipeHandler(BaseHTTPRequestHandler):
             </html>
             """
         
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        return html
     
     def add_recipe(self):
         """➕ Add new recipe"""
         try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length).decode('utf-8')
-            data = urllib.parse.parse_qs(post_data)
-            
-            # Extract form data
-            name = data['name'][0]
-            ingredients = [ing.strip() for ing in data['ingredients'][0].split('\n') if ing.strip()]
-            instructions = [inst.strip() for inst in data['instructions'][0].split('\n') if inst.strip()]
-            
-            # Optional metadata
-            metadata = {}
-            if 'cuisine' in data and data['cuisine'][0]:
-                metadata['cuisine'] = data['cuisine'][0]
-            if 'difficulty' in data:
-                metadata['difficulty'] = data['difficulty'][0]
-            if 'servings' in data:
-                try:
-                    metadata['servings'] = int(data['servings'][0])
-                except:
-                    pass
-            if 'prep_time' in data and data['prep_time'][0]:
-                metadata['prep_time'] = data['prep_time'][0]
-            if 'cook_time' in data and data['cook_time'][0]:
-                metadata['cook_time'] = data['cook_time'][0]
-            
-            # Extract favorite and status
-            is_favorite = 'is_favorite' in data
-            status = data.get('status', ['want_to_try'])[0]
-            
             # Create and save recipe
-            recipe = Recipe(name, ingredients, instructions, metadata, None, is_favorite, status)
+            recipe = self.parse_recipe_form(self.post_data)
             self.manager.add_recipe(recipe)
             
             # Redirect to recipes page
-            self.send_response(302)
-            self.send_header('Location', '/recipes')
-            self.end_headers()
-            
+            self.send_redirect('/recipes')
+        
         except Exception as e:
             self.send_error(500, f"Error adding recipe: {str(e)}")
     
+    @staticmethod
+    def parse_recipe_form(post_data: str) -> Recipe:
+        """📝 Build a Recipe from the urlencoded add-recipe form"""
+        data = urllib.parse.parse_qs(post_data)
+        
+        # Extract form data
+        name = data['name'][0]
+        ingredients = [ing.strip() for ing in data['ingredients'][0].split('\n') if ing.strip()]
+        instructions = [inst.strip() for inst in data['instructions'][0].split('\n') if inst.strip()]
+        
+        # Optional metadata
+        metadata = {}
+        if 'cuisine' in data and data['cuisine'][0]:
+            metadata['cuisine'] = data['cuisine'][0]
+        if 'difficulty' in data:
+            metadata['difficulty'] = data['difficulty'][0]
+        if 'servings' in data:
+            try:
+                metadata['servings'] = int(data['servings'][0])
+            except:
+                pass
+        if 'prep_time' in data and data['prep_time'][0]:
+            metadata['prep_time'] = data['prep_time'][0]
+        if 'cook_time' in data and data['cook_time'][0]:
+            metadata['cook_time'] = data['cook_time'][0]
+        
+        # Extract favorite and status
+        is_favorite = 'is_favorite' in data
+        status = data.get('status', ['want_to_try'])[0]
+        
+        return Recipe(name, ingredients, instructions, metadata, None, is_favorite, status)
+    
     def delete_recipe(self, recipe_id):
         """🗑️ Delete recipe"""
         try:
             success = self.manager.delete_recipe(recipe_id)
             if success:
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(b'{"success": true}')
+                self.send_json({"success": True})
             else:
                 self.send_error(404, "Recipe not found")
         except Exception as e:
@@ -825,12 +1163,9 @@ class RecipeHandler(BaseHTTPRequestHandler):
     def toggle_favorite(self, recipe_id):
         """❤️ Toggle favorite status"""
         try:
-            success = self.manager.toggle_favorite(recipe_id)
-            if success:
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(b'{"success": true}')
+            updated = self.manager.toggle_favorite(recipe_id)
+            if updated:
+                self.send_json({"success": True, **updated})
             else:
                 self.send_error(404, "Recipe not found")
         except Exception as e:
@@ -839,154 +1174,306 @@ class RecipeHandler(BaseHTTPRequestHandler):
     def update_status(self):
         """📝 Update recipe status"""
         try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length).decode('utf-8')
-            data = urllib.parse.parse_qs(post_data)
+            data = urllib.parse.parse_qs(self.post_data)
             
             recipe_id = data['recipe_id'][0]
             new_status = data['status'][0]
             
-            success = self.manager.update_recipe_status(recipe_id, new_status)
+            updated = self.manager.update_recipe_status(recipe_id, new_status)
             
-            if success:
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(b'{"success": true}')
+            if updated:
+                self.send_json({"success": True, **updated})
             else:
                 self.send_error(400, "Failed to update status")
-                
+        
         except Exception as e:
             self.send_error(500, f"Error updating status: {str(e)}")
     
+    @staticmethod
+    def parse_batch(post_data: str):
+        """📦 Parse a batch body: {"operations": [...]} or a bare JSON list"""
+        try:
+            payload = json.loads(post_data or 'null')
+        except ValueError:
+            raise ValueError("Batch body must be valid JSON")
+        operations = payload.get('operations') if isinstance(payload, dict) else payload
+        if not isinstance(operations, list):
+            raise ValueError("Batch body must be a list of operations")
+        return operations
+    
+    def handle_batch(self):
+        """📦 Apply a JSON batch of recipe mutations in one round trip"""
+        try:
+            results = self.manager.apply_batch(self.parse_batch(self.post_data))
+        except ValueError as e:
+            self.send_json({"success": False, "error": str(e)}, 400)
+            return
+        except Exception as e:
+            self.send_error(500, f"Error applying batch: {str(e)}")
+            return
+        self.send_json({"success": all(result['ok'] for result in results), "results": results})
+    
     def handle_search(self):
         """🔍 Handle search requests"""
         try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length).decode('utf-8')
-            data = urllib.parse.parse_qs(post_data)
+            data = urllib.parse.parse_qs(self.post_data)
             
             query = data.get('search_query', [''])[0]
             
             if query:
-                results = self.manager.search_recipes(query)
+                results = self.manager.search_recipes(query, summary=True)
                 
-                recipe_cards = ""
-                for recipe in results:
-                    favorite_icon = "❤️" if recipe.is_favorite else "🤍"
-                    status_emoji = recipe.get_status_emoji()
-                    status_text = recipe.get_status_text()
-                    
-                    recipe_cards += f"""
-                    <div class="recipe-card">
-                        <h3 class="recipe-title">{favorite_icon} {recipe.name} {status_emoji}</h3>
-                        <div class="recipe-meta">
-                            🥘 {len(recipe.ingredients)} ingredients • 
-                            📋 {len(recipe.instructions)} steps • 
-                            🌍 {recipe.metadata.get('cuisine', 'N/A')} • 
-                            ⭐ {recipe.metadata.get('difficulty', 'N/A')} •
-                            📝 {status_text}
-                        </div>
-                        <button onclick="viewRecipe('{recipe._id}')">👁️ View Details</button>
-                        <button onclick="toggleFavorite('{recipe._id}')">{favorite_icon} Favorite</button>
-                        <select onchange="updateStatus('{recipe._id}', this.value)" style="padding: 8px; margin: 5px; border-radius: 5px; border: 1px solid #ddd;">
-                            <option value="">Change Status...</option>
-                            <option value="want_to_try" {'selected' if recipe.status == 'want_to_try' else ''}>🤔 Want to Try</option>
-                            <option value="tried" {'selected' if recipe.status == 'tried' else ''}>👍 Tried Once</option>
-                            <option value="made_before" {'selected' if recipe.status == 'made_before' else ''}>⭐ Made Before</option>
-                        </select>
-                    </div>
-                    """
-                
-                if not recipe_cards:
-                    recipe_cards = f"<p>😞 No recipes found for '{query}'. Try a different search term!</p>"
-                
-                html = f"""
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <title>🔍 Search Results</title>
-                    <style>
-                        body {{ font-family: Arial, sans-serif; margin: 40px; background: #f5f5f5; }}
-                        .container {{ max-width: 1000px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                        h1 {{ color: #2c3e50; text-align: center; }}
-                        .recipe-card {{ background: #ecf0f1; padding: 20px; margin: 15px 0; border-radius: 8px; border-left: 4px solid #3498db; }}
-                        .recipe-title {{ color: #2c3e50; margin-bottom: 10px; }}
-                        .recipe-meta {{ color: #7f8c8d; font-size: 14px; margin-bottom: 15px; }}
-                        button {{ background: #3498db; color: white; padding: 8px 15px; border: none; border-radius: 5px; cursor: pointer; margin: 5px 5px 5px 0; }}
-                        button:hover {{ background: #2980b9; }}
-                        .nav {{ text-align: center; margin-bottom: 30px; }}
-                        .nav a {{ margin: 0 10px; text-decoration: none; color: #3498db; font-weight: bold; padding: 8px 12px; border-radius: 5px; }}
-                        .nav a:hover {{ background: #ecf0f1; }}
-                    </style>
-                    <script>
-                        function viewRecipe(id) {{ window.location.href = '/recipe/' + id; }}
-                        function toggleFavorite(id) {{
-                            fetch('/toggle_favorite/' + id, {{ method: 'POST' }})
-                            .then(() => location.reload());
-                        }}
-                        function updateStatus(id) {{
-                            var status = prompt("Choose new status:\\n\\n1. want_to_try (🤔 Want to Try)\\n2. tried (👍 Tried Once)\\n3. made_before (⭐ Made Before)\\n\\nEnter: want_to_try, tried, or made_before");
-                            if (status && ['want_to_try', 'tried', 'made_before'].includes(status)) {{
-                                fetch('/update_status', {{ 
-                                    method: 'POST',
-                                    headers: {{ 'Content-Type': 'application/x-www-form-urlencoded' }},
-                                    body: 'recipe_id=' + id + '&status=' + status
-                                }}).then(() => location.reload());
-                            }} else if (status) {{
-                                alert('Invalid status! Please use: want_to_try, tried, or made_before');
-                            }}
-                        }}
-                    </script>
-                </head>
-                <body>
-                    <div class="container">
-                        <h1>🔍 Search Results for "{query}"</h1>
-                        <p>Found {len(results)} recipe(s)</p>
-                        
-                        <div class="nav">
-                            <a href="/">🏠 Home</a>
-                            <a href="/recipes">📋 All Recipes</a>
-                            <a href="/favorites">❤️ Favorites</a>
-                            <a href="/filter/want_to_try">🤔 Want to Try</a>
-                            <a href="/filter/tried">👍 Tried</a>
-                            <a href="/filter/made_before">⭐ Made Before</a>
-                            <a href="/stats">📊 Statistics</a>
-                        </div>
-                        
-                        {recipe_cards}
-                    </div>
-                </body>
-                </html>
-                """
-                
-                self.send_response(200)
-                self.send_header('Content-type', 'text/html; charset=utf-8')
-                self.end_headers()
-                self.wfile.write(html.encode('utf-8'))
+                self.send_html(self.render_search_results(query, results))
             else:
                 # Redirect back to home if empty query
-                self.send_response(302)
-                self.send_header('Location', '/')
-                self.end_headers()
-                
+                self.send_redirect('/')
+        
         except Exception as e:
             self.send_error(500, f"Error searching recipes: {str(e)}")
+    
+    @staticmethod
+    def render_search_results(query, results) -> str:
+        """🔍 Render search results page HTML"""
+        recipe_cards = ""
+        for recipe in results:
+            favorite_icon = "❤️" if recipe.is_favorite else "🤍"
+            status_emoji = recipe.get_status_emoji()
+            status_text = recipe.get_status_text()
+            
+            recipe_cards += f"""
+            <div class="recipe-card">
+                <h3 class="recipe-title">{favorite_icon} {recipe.name} {status_emoji}</h3>
+                <div class="recipe-meta">
+                    🥘 {recipe.ingredients_count} ingredients • 
+                    📋 {recipe.instructions_count} steps • 
+                    🌍 {recipe.metadata.get('cuisine', 'N/A')} • 
+                    ⭐ {recipe.metadata.get('difficulty', 'N/A')} •
+                    📝 {status_text}
+                </div>
+                <button onclick="viewRecipe('{recipe._id}')">👁️ View Details</button>
+                <button onclick="toggleFavorite('{recipe._id}')">{favorite_icon} Favorite</button>
+                <select onchange="updateStatus('{recipe._id}', this.value)" style="padding: 8px; margin: 5px; border-radius: 5px; border: 1px solid #ddd;">
+                    <option value="">Change Status...</option>
+                    <option value="want_to_try" {'selected' if recipe.status == 'want_to_try' else ''}>🤔 Want to Try</option>
+                    <option value="tried" {'selected' if recipe.status == 'tried' else ''}>👍 Tried Once</option>
+                    <option value="made_before" {'selected' if recipe.status == 'made_before' else ''}>⭐ Made Before</option>
+                </select>
+            </div>
+            """
+        
+        if not recipe_cards:
+            recipe_cards = f"<p>😞 No recipes found for '{query}'. Try a different search term!</p>"
+        
+        html = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>🔍 Search Results</title>
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 40px; background: #f5f5f5; }}
+                .container {{ max-width: 1000px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+                h1 {{ color: #2c3e50; text-align: center; }}
+                .recipe-card {{ background: #ecf0f1; padding: 20px; margin: 15px 0; border-radius: 8px; border-left: 4px solid #3498db; }}
+                .recipe-title {{ color: #2c3e50; margin-bottom: 10px; }}
+                .recipe-meta {{ color: #7f8c8d; font-size: 14px; margin-bottom: 15px; }}
+                button {{ background: #3498db; color: white; padding: 8px 15px; border: none; border-radius: 5px; cursor: pointer; margin: 5px 5px 5px 0; }}
+                button:hover {{ background: #2980b9; }}
+                .nav {{ text-align: center; margin-bottom: 30px; }}
+                .nav a {{ margin: 0 10px; text-decoration: none; color: #3498db; font-weight: bold; padding: 8px 12px; border-radius: 5px; }}
+                .nav a:hover {{ background: #ecf0f1; }}
+            </style>
+            <script>
+                function viewRecipe(id) {{ window.location.href = '/recipe/' + id; }}
+                function toggleFavorite(id) {{
+                    fetch('/toggle_favorite/' + id, {{ method: 'POST' }})
+                    .then(() => location.reload());
+                }}
+                function updateStatus(id) {{
+                    var status = prompt("Choose new status:\\n\\n1. want_to_try (🤔 Want to Try)\\n2. tried (👍 Tried Once)\\n3. made_before (⭐ Made Before)\\n\\nEnter: want_to_try, tried, or made_before");
+                    if (status && ['want_to_try', 'tried', 'made_before'].includes(status)) {{
+                        fetch('/update_status', {{ 
+                            method: 'POST',
+                            headers: {{ 'Content-Type': 'application/x-www-form-urlencoded' }},
+                            body: 'recipe_id=' + id + '&status=' + status
+                        }}).then(() => location.reload());
+                    }} else if (status) {{
+                        alert('Invalid status! Please use: want_to_try, tried, or made_before');
+                    }}
+                }}
+            </script>
+        </head>
+        <body>
+            <div class="container">
+                <h1>🔍 Search Results for "{query}"</h1>
+                <p>Found {len(results)} recipe(s)</p>
+                
+                <div class="nav">
+                    <a href="/">🏠 Home</a>
+                    <a href="/recipes">📋 All Recipes</a>
+                    <a href="/favorites">❤️ Favorites</a>
+                    <a href="/filter/want_to_try">🤔 Want to Try</a>
+                    <a href="/filter/tried">👍 Tried</a>
+                    <a href="/filter/made_before">⭐ Made Before</a>
+                    <a href="/stats">📊 Statistics</a>
+                </div>
+                
+                {recipe_cards}
+            </div>
+        </body>
+        </html>
+        """
+        
+        return html
 
-def run_server():
-    """🚀 Start the web server"""
-    print("🍳 Starting Recipe Management Web Server...")
-    print("🌐 Server running at: http://localhost:8080")
-    print("⚡ Press Ctrl+C to stop the server")
+class SingleRecipeHandler(RecipeHandler):
+    """1️⃣ HTTP/1.0 handler for single-threaded mode, where one idle keep-alive socket would block everyone"""
+    protocol_version = 'HTTP/1.0'
+
+class PooledHTTPServer(HTTPServer):
+    """🧵 HTTP server that hands each connection to a bounded worker pool"""
+    allow_reuse_address = True
+    draining = False
+    
+    def __init__(self, server_address, handler_class, max_workers=16, max_pending=64, reuse_port=False):
+        self.max_workers = max_workers
+        self.reuse_port = reuse_port
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='recipe-http')
+        # 🚦 Accepted-but-unfinished connections; the accept loop waits when all slots are taken
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        super().__init__(server_address, handler_class)
     
-    server_address = ('localhost', 8080)
-    httpd = HTTPServer(server_address, RecipeHandler)
+    def server_bind(self):
+        """🔌 Bind, sharing the port with sibling processes when prefork is enabled"""
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+    
+    def process_request(self, request, client_address):
+        """📥 Queue the connection on the worker pool"""
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._process_request_worker, request, client_address)
+        except RuntimeError:
+            # Pool already shut down - drop the connection
+            self._slots.release()
+            self.shutdown_request(request)
+    
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
     
+    def server_close(self):
+        """🔒 Stop listening, then drain in-flight requests"""
+        # Keep-alive connections close after their current request (or idle timeout)
+        self.draining = True
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+def _serve_until_signalled(httpd):
+    """⏳ Serve until SIGINT/SIGTERM, then drain gracefully"""
+    def request_shutdown(signum, frame):
+        # shutdown() blocks until serve_forever() returns, so it must run off the serving thread
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+    
+    signal.signal(signal.SIGINT, request_shutdown)
+    signal.signal(signal.SIGTERM, request_shutdown)
+    # 👀 Writes from other processes (prefork siblings, other hosts) invalidate this one's caches
+    manager = get_recipe_manager()
+    watcher = manager.watch_changes()
+    # 🔎 Build the full-text index now rather than inside the first search
+    manager.start_search_index_build()
     try:
         httpd.serve_forever()
-    except KeyboardInterrupt:
-        print("\n👋 Server stopped!")
+    finally:
+        if watcher:
+            watcher.stop()
         httpd.server_close()
 
+def _run_prefork(server_address, workers, threads):
+    """🍴 Fork worker processes that each accept on the same SO_REUSEPORT port"""
+    # The parent may already be connected (start.py seeds sample data first);
+    # a MongoClient must not be shared across fork()
+    release_shared_connection()
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            # 👶 Worker: own listening socket and its own MongoDB pool (created lazily after fork)
+            exit_code = 0
+            try:
+                httpd = PooledHTTPServer(server_address, RecipeHandler, max_workers=threads, reuse_port=True)
+                _serve_until_signalled(httpd)
+            except Exception as e:
+                print(f"❌ Worker {os.getpid()} failed: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        children.append(pid)
+    
+    def forward_shutdown(signum, frame):
+        for child in children:
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    signal.signal(signal.SIGINT, forward_shutdown)
+    signal.signal(signal.SIGTERM, forward_shutdown)
+    for child in children:
+        os.waitpid(child, 0)
+
+def run_server(mode=None, host=None, port=None, workers=None, threads=None):
+    """
+    🚀 Start the web server
+    
+    Args:
+        mode: 'single', 'threaded' (default), 'prefork' or 'async'
+        host: Interface to bind (default localhost)
+        port: Port to bind (default 8080)
+        workers: Number of processes in prefork mode (default: CPU count)
+        threads: Worker threads per process in threaded/prefork mode
+    """
+    mode = mode or os.getenv('SERVER_MODE', 'threaded')
+    host = host or os.getenv('SERVER_HOST', 'localhost')
+    port = int(port or os.getenv('SERVER_PORT', '8080'))
+    workers = int(workers or os.getenv('SERVER_WORKERS', str(os.cpu_count() or 1)))
+    threads = int(threads or os.getenv('SERVER_THREADS', '16'))
+    
+    if mode == 'prefork' and not (hasattr(os, 'fork') and hasattr(socket, 'SO_REUSEPORT')):
+        print("⚠️ Prefork needs fork() and SO_REUSEPORT - falling back to threaded mode")
+        mode = 'threaded'
+    
+    print("🍳 Starting Recipe Management Web Server...")
+    print(f"🌐 Server running at: http://{host}:{port}")
+    print("⚡ Press Ctrl+C to stop the server")
+    
+    server_address = (host, port)
+    
+    if mode == 'async':
+        from async_app import run_async_server
+        run_async_server(host, port)
+        return
+    
+    if mode == 'single':
+        httpd = HTTPServer(server_address, SingleRecipeHandler)
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            httpd.server_close()
+    elif mode == 'prefork':
+        print(f"🍴 Prefork mode: {workers} processes x {threads} threads")
+        _run_prefork(server_address, workers, threads)
+    else:
+        print(f"🧵 Threaded mode: {threads} worker threads")
+        httpd = PooledHTTPServer(server_address, RecipeHandler, max_workers=threads)
+        _serve_until_signalled(httpd)
+    
+    print("\n👋 Server stopped!")
+
 if __name__ == "__main__":
-    run_server()
\ No newline at end of file
+    run_server()
@@ -5,7 +5,7 @@ import os
 
 def install_basic_packages():
     """📦 Install only essential packages"""
-    packages = ["pymongo==4.6.1", "python-dotenv==1.0.0"]
+    packages = ["pymongo==4.6.1", "python-dotenv==1.0.0", "numpy>=1.24"]
     
     for package in packages:
         print(f"📦 Installing {package}...")
@@ -36,6 +36,130 @@ def check_mongodb():
         print("⚠️ MongoDB packages not installed yet")
         return False
 
+def run_migrations():
+    """🔧 Build missing indexes and apply pending schema migrations"""
+    try:
+        from migrations import run_migrations as apply_migrations
+        apply_migrations()
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not apply migrations: {e}")
+        return False
+
+def rebuild_stats():
+    """📈 Recount the materialized stats document from the recipes collection"""
+    try:
+        from database import db_connection
+        from recipe_stats import StatsStore
+        if not db_connection.connect():
+            print("❌ Database not connected!")
+            return False
+        StatsStore(db_connection.db).rebuild(db_connection.get_collection('recipes'))
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not rebuild stats: {e}")
+        return False
+
+def verify_stats():
+    """🔍 Check the materialized stats against a fresh count and rebuild on drift"""
+    try:
+        from database import db_connection
+        from recipe_stats import StatsStore
+        if not db_connection.connect():
+            print("❌ Database not connected!")
+            return False
+        problems = StatsStore(db_connection.db).verify(db_connection.get_collection('recipes'))
+        if not problems:
+            print("✅ Stats are in sync")
+            return True
+        print(f"⚠️ Stats drifted ({len(problems)} difference(s)):")
+        for problem in problems:
+            print(f"   - {problem}")
+        return rebuild_stats()
+    except Exception as e:
+        print(f"⚠️ Could not verify stats: {e}")
+        return False
+
+def audit_search_plans():
+    """🩺 Explain the common advanced_search filters and fail on any COLLSCAN or in-memory sort"""
+    try:
+        from recipe_manager import RecipeManager
+        reports = RecipeManager().audit_search_plans()
+        for report in reports:
+            marker = "❌" if report['collscan'] or report['in_memory_sort'] else "✅"
+            print(f"{marker} {report['filter']}{' (sorted in memory)' if report['in_memory_sort'] else ''}")
+            print(f"   {' -> '.join(report['stages'])} via {', '.join(report['indexes']) or 'no index'}: "
+                  f"{report['keys_examined']} keys / {report['docs_examined']} docs examined, "
+                  f"{report['returned']} returned")
+        return not any(report['collscan'] or report['in_memory_sort'] for report in reports)
+    except Exception as e:
+        print(f"⚠️ Could not explain searches: {e}")
+        return False
+
+def backfill_durations():
+    """⏱️ Re-parse prep/cook times into the numeric minute fields"""
+    try:
+        from database import db_connection
+        from migrations import backfill_durations as run_backfill
+        if not db_connection.connect():
+            print("❌ Database not connected!")
+            return False
+        run_backfill(db_connection.db)
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not backfill cooking times: {e}")
+        return False
+
+def backfill_ingredients():
+    """🥕 Re-parse ingredient lines into ingredient_names and the indexed ingredient_keys"""
+    try:
+        from database import db_connection
+        from migrations import backfill_ingredient_keys
+        if not db_connection.connect():
+            print("❌ Database not connected!")
+            return False
+        backfill_ingredient_keys(db_connection.db)
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not backfill ingredient keys: {e}")
+        return False
+
+def import_recipes(path=None):
+    """🚚 Bulk import a NDJSON/CSV feed (resumes an interrupted import)"""
+    if not path:
+        print("❌ Usage: python start.py import <feed.ndjson|feed.csv>")
+        return False
+    try:
+        from recipe_import import import_recipes as run_import
+        report = run_import(path)
+        return not report['interrupted']
+    except Exception as e:
+        print(f"⚠️ Could not import recipes: {e}")
+        return False
+
+def watch_changes(mode=None):
+    """👀 Print the invalidations the change watcher sees (Ctrl+C to stop)"""
+    watcher = None
+    try:
+        import time
+        from recipe_manager import get_recipe_manager
+        watcher = get_recipe_manager().watch_changes(mode)
+        if watcher is None:
+            print("❌ Database not connected!")
+            return False
+        watcher.register(lambda ids: print(f"🔄 {'everything' if ids is None else ids} ({watcher.active_mode})"))
+        print(f"👀 Watching recipes ({watcher.mode}) - make changes from another process")
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not watch changes: {e}")
+        return False
+    finally:
+        if watcher is not None:
+            watcher.stop()
+
 def generate_sample_data():
     """🎨 Add sample recipes"""
     try:
@@ -74,16 +198,38 @@ def main():
         print("⚠️ MongoDB not available. App will still work but data won't persist.")
         input("Press Enter to continue anyway, or Ctrl+C to exit...")
     
-    # Step 3: Generate sample data
-    print("\n3️⃣ Setting up sample data...")
+    # Step 3: Apply migrations
+    print("\n3️⃣ Applying database migrations...")
+    run_migrations()
+    
+    # Step 4: Generate sample data
+    print("\n4️⃣ Setting up sample data...")
     generate_sample_data()
     
-    # Step 4: Start app
-    print("\n4️⃣ Starting web application...")
+    # Step 5: Start app
+    print("\n5️⃣ Starting web application...")
     start_app()
 
+COMMANDS = {
+    'migrate': run_migrations,
+    'stats-rebuild': rebuild_stats,
+    'stats-verify': verify_stats,
+    'import': import_recipes,
+    'backfill-durations': backfill_durations,
+    'backfill-ingredients': backfill_ingredients,
+    'explain-searches': audit_search_plans,
+    'watch': watch_changes,
+}
+
 if __name__ == "__main__":
     try:
+        # 🛠️ Optional subcommand, e.g. `python start.py migrate` or `python start.py import feed.csv`
+        if len(sys.argv) > 1:
+            command = COMMANDS.get(sys.argv[1])
+            if command is None:
+                print(f"❌ Unknown command: {sys.argv[1]} (available: {', '.join(COMMANDS)})")
+                sys.exit(1)
+            sys.exit(0 if command(*sys.argv[2:]) else 1)
         main()
     except KeyboardInterrupt:
         print("\n👋 Setup cancelled by user")
@@ -0,0 +1,41 @@
+# test_async_app.py - HTTP request parsing of the asyncio front end
+import asyncio
+import unittest
+
+from async_app import AsyncRecipeApp
+
+class RequestParsingTest(unittest.TestCase):
+    def exchange(self, request: bytes) -> bytes:
+        """📨 Send one raw request to a fresh server and return the status line"""
+        async def run():
+            app = AsyncRecipeApp(manager=object(), idle_timeout=1)
+            server = await asyncio.start_server(app.handle_connection, '127.0.0.1', 0)
+            try:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                writer.write(request)
+                await writer.drain()
+                response = await asyncio.wait_for(reader.read(), 5)
+                writer.close()
+                return response
+            finally:
+                server.close()
+                await server.wait_closed()
+        
+        return asyncio.run(run()).split(b"\r\n", 1)[0]
+    
+    def test_chunked_body_without_length_is_refused(self):
+        self.assertEqual(self.exchange(b"POST /api/batch HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+                                       b"5\r\nhello\r\n0\r\n\r\n"), b"HTTP/1.1 411 Length Required")
+    
+    def test_bad_content_lengths_are_refused(self):
+        for length in (b"-5", b"abc"):
+            self.assertEqual(self.exchange(b"POST /api/batch HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n"),
+                             b"HTTP/1.1 400 Bad Request")
+        self.assertEqual(self.exchange(b"POST /api/batch HTTP/1.1\r\nContent-Length: 5\r\n"
+                                       b"Transfer-Encoding: chunked\r\n\r\n"), b"HTTP/1.1 400 Bad Request")
+    
+    def test_malformed_request_line_is_refused(self):
+        self.assertEqual(self.exchange(b"GARBAGE\r\n\r\n"), b"HTTP/1.1 400 Bad Request")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+# test_change_watcher.py - Polling fallback of the cross-process change watcher
+import contextlib
+import io
+import queue
+import unittest
+from datetime import datetime
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+from change_watcher import ChangeWatcher
+
+@unittest.skipIf(mongomock is None, "needs mongomock")
+class PollingWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.recipes = mongomock.MongoClient()['watcher_test']['recipes']
+        self.recipe_id = self.recipes.insert_one({'name': "Soup", 'metadata': {'updated_at': datetime.now()}}).inserted_id
+        self.changes = queue.Queue()
+        self.watcher = ChangeWatcher(self.recipes, mode='poll', poll_interval=0.02)
+        self.watcher.register(self.changes.put)
+        # The watcher thread reports errors with print
+        quiet = contextlib.ExitStack()
+        quiet.enter_context(contextlib.redirect_stdout(io.StringIO()))
+        self.addCleanup(quiet.close)
+        self.watcher.start()
+        self.addCleanup(self.watcher.stop)
+    
+    def next_change(self):
+        return self.changes.get(timeout=2)
+    
+    def test_updated_recipe_is_reported_once(self):
+        self.assertEqual(self.next_change(), [self.recipe_id])
+        self.recipes.update_one({'_id': self.recipe_id}, {'$set': {'metadata.updated_at': datetime.now()}})
+        self.assertEqual(self.next_change(), [self.recipe_id])
+        with self.assertRaises(queue.Empty):
+            self.changes.get(timeout=0.1)
+        self.assertEqual(self.watcher.active_mode, 'poll')
+    
+    def test_delete_invalidates_everything(self):
+        self.next_change()
+        self.recipes.delete_one({'_id': self.recipe_id})
+        self.assertIsNone(self.next_change())
+    
+    def test_poll_mark_is_persisted(self):
+        self.next_change()
+        state = self.recipes.database['watcher_state'].find_one({'_id': 'recipes'})
+        self.assertIsNotNone(state['polled_until'])
+
+if __name__ == "__main__":
+    unittest.main()
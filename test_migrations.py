@@ -0,0 +1,57 @@
+# test_migrations.py - Versioned schema migrations and backfills
+import contextlib
+import io
+import unittest
+from datetime import datetime
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+import migrations
+
+@unittest.skipIf(mongomock is None, "needs mongomock")
+class RunMigrationsTest(unittest.TestCase):
+    def setUp(self):
+        self.db = mongomock.MongoClient()['migrations_test']
+        self.addCleanup(setattr, migrations, '_cached_version', None)
+        # A recipe stored before any parsed fields existed
+        self.db['recipes'].insert_one({'name': "Stew", 'ingredients': ["500g ground beef", "2 bay leaves"],
+                                       'instructions': ["Simmer"],
+                                       'metadata': {'prep_time': "15 minutes", 'cook_time': "2 hours",
+                                                    'updated_at': datetime(2024, 1, 1)}})
+    
+    def migrate(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return migrations.run_migrations(self.db)
+    
+    def test_applies_every_migration_once(self):
+        self.assertEqual(self.migrate(), len(migrations.MIGRATIONS))
+        self.assertEqual(migrations.get_schema_version(self.db), migrations.LATEST_VERSION)
+        self.assertTrue(migrations.check_schema_version(self.db))
+        self.assertEqual(self.migrate(), 0)
+    
+    def test_indexes_are_created(self):
+        self.migrate()
+        indexes = self.db['recipes'].index_information()
+        self.assertTrue(indexes['name_1'].get('unique'))
+        self.assertIn('ingredient_keys', indexes)
+        self.assertIn('search_total_minutes_id', indexes)
+        self.assertNotIn('search_total_minutes', indexes)
+    
+    def test_existing_recipes_are_backfilled(self):
+        self.migrate()
+        recipe = self.db['recipes'].find_one({'name': "Stew"})
+        self.assertEqual(recipe['metadata']['total_minutes'], 135)
+        self.assertEqual(recipe['ingredient_names'], ['ground beef', 'bay leaf'])
+        self.assertIn('beef', recipe['ingredient_keys'])
+    
+    def test_behind_schema_is_reported(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertFalse(migrations.check_schema_version(self.db))
+        self.assertIn("python start.py migrate", output.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
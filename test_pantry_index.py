@@ -0,0 +1,79 @@
+# test_pantry_index.py - Ranking and incremental refresh of the "what can I cook?" index
+import unittest
+from datetime import datetime
+
+from bson import ObjectId
+
+try:
+    from pantry_index import PantryIndex
+except ImportError:  # NumPy not installed
+    PantryIndex = None
+
+class _Cursor(list):
+    def sort(self, key, direction):
+        return _Cursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+class _Recipes:
+    """📂 The two collection calls IncrementalSnapshot makes, over a list of documents"""
+    
+    def __init__(self, docs):
+        self.docs = docs
+    
+    def find(self, query, projection=None):
+        changed = query.get("metadata.updated_at", {}).get("$gt")
+        return _Cursor(doc for doc in self.docs
+                       if changed is None or doc['metadata']['updated_at'] > changed)
+    
+    def estimated_document_count(self):
+        return len(self.docs)
+
+def _doc(*ingredients):
+    return {'_id': ObjectId(), 'ingredients': list(ingredients),
+            'metadata': {'updated_at': datetime(2024, 1, 1)}}
+
+@unittest.skipIf(PantryIndex is None, "needs NumPy")
+class PantryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.recipes = _Recipes([
+            _doc("3 eggs", "1 cup flour", "1 pinch salt"),
+            _doc("200g cherry tomatoes", "2 eggs", "1 tbsp olive oil", "1 bay leaf"),
+            _doc("500g ground beef", "1 onion"),
+        ])
+        self.index = PantryIndex(max_age=0).refresh(self.recipes)
+        self.ids = [doc['_id'] for doc in self.recipes.docs]
+    
+    def match(self, pantry, **options):
+        return [(match['recipe_id'], match['matched'], match['total'])
+                for match in self.index.match(pantry, **options)]
+    
+    def test_best_coverage_first_with_staples_assumed(self):
+        self.assertEqual(self.match(["eggs", "flour"]), [(self.ids[0], 3, 3), (self.ids[1], 1, 4)])
+    
+    def test_staples_can_be_counted(self):
+        self.assertEqual(self.match(["eggs", "flour"], assume_staples=False)[0], (self.ids[0], 2, 3))
+    
+    def test_item_covers_more_specific_names(self):
+        matches = self.index.match(["tomato", "egg", "olive oil"])
+        self.assertEqual(matches[0]['recipe_id'], self.ids[1])
+        self.assertEqual(matches[0]['missing'], ['bay leaf'])
+    
+    def test_named_descriptors_match_exactly_or_by_head(self):
+        self.assertEqual(self.match(["ground beef"]), [(self.ids[2], 1, 2)])
+        self.assertEqual(self.match(["beef"]), [(self.ids[2], 1, 2)])
+        self.assertEqual(self.match(["ground pork"]), [])
+    
+    def test_only_listed_ingredients_score(self):
+        self.assertEqual(self.match(["salt"]), [])
+        self.assertEqual(self.match(["chocolate"]), [])
+    
+    def test_refresh_picks_up_changed_ingredients(self):
+        doc = self.recipes.docs[2]
+        doc['ingredients'] = ["2 eggs", "1 onion"]
+        doc['metadata']['updated_at'] = datetime.now()
+        self.index.refresh(self.recipes)
+        self.assertEqual(len(self.index), 3)
+        self.assertIn((self.ids[2], 1, 2), self.match(["eggs"]))
+        self.assertEqual(self.match(["ground beef"]), [])
+
+if __name__ == "__main__":
+    unittest.main()
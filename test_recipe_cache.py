@@ -0,0 +1,119 @@
+# test_recipe_cache.py - Invalidation and generations of the recipe and query caches
+import contextlib
+import io
+import unittest
+
+from bson import ObjectId
+
+from recipe_cache import QueryCache, RecipeCache, canonical_filter
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+class RecipeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = RecipeCache(maxsize=16, ttl=60)
+        self.recipe_id = str(ObjectId())
+        self.loads = 0
+    
+    def load(self, status='want_to_try'):
+        def load():
+            self.loads += 1
+            return {'_id': ObjectId(self.recipe_id), 'name': "Pancakes", 'status': status}
+        return load
+    
+    def test_hit_returns_a_private_copy(self):
+        self.cache.get_by_id(self.recipe_id, self.load())
+        doc = self.cache.get_by_id(self.recipe_id, self.load())
+        doc['status'] = 'tried'
+        self.assertEqual(self.cache.get_by_id(self.recipe_id, self.load())['status'], 'want_to_try')
+        self.assertEqual(self.loads, 1)
+    
+    def test_invalidate_accepts_any_id_form(self):
+        for form in (self.recipe_id.upper(), ObjectId(self.recipe_id), self.recipe_id):
+            self.cache.get_by_id(self.recipe_id, self.load())
+            self.cache.invalidate([form])
+            self.assertEqual(self.cache.get_by_id(self.recipe_id, self.load('tried'))['status'], 'tried')
+            self.cache.invalidate([self.recipe_id])
+    
+    def test_lookup_with_upper_case_id_shares_the_entry(self):
+        self.cache.get_by_id(self.recipe_id, self.load())
+        self.cache.get_by_id(self.recipe_id.upper(), self.load())
+        self.assertEqual(self.loads, 1)
+    
+    def test_fill_racing_an_invalidation_is_dropped(self):
+        def racing_load():
+            # A write lands while the document is being read
+            self.cache.invalidate([self.recipe_id])
+            return self.load()()
+        
+        self.cache.get_by_id(self.recipe_id, racing_load)
+        self.cache.get_by_id(self.recipe_id, self.load())
+        self.assertEqual(self.loads, 2)
+    
+    def test_renamed_recipe_misses_by_old_name(self):
+        self.cache.get_by_name("Pancakes", self.load())
+        self.cache.invalidate([self.recipe_id])
+        self.assertIsNone(self.cache.get_by_name("Pancakes", lambda: None))
+
+class QueryCacheTest(unittest.TestCase):
+    def test_bump_expires_every_entry(self):
+        cache = QueryCache(maxsize=16, ttl=60)
+        cache.put("a", [1], cache.generation)
+        self.assertEqual(cache.get("a"), [1])
+        cache.bump()
+        self.assertIsNone(cache.get("a"))
+    
+    def test_result_computed_before_a_write_is_not_stored(self):
+        cache = QueryCache(maxsize=16, ttl=60)
+        generation = cache.generation
+        cache.bump()
+        cache.put("a", [1], generation)
+        self.assertIsNone(cache.get("a"))
+    
+    def test_disabled_cache_stores_nothing(self):
+        cache = QueryCache(maxsize=0, ttl=60)
+        cache.put("a", [1], cache.generation)
+        self.assertIsNone(cache.get("a"))
+
+class CanonicalFilterTest(unittest.TestCase):
+    def test_key_and_clause_order_do_not_matter(self):
+        first = {"status": "tried", "$and": [{"a": 1}, {"b": 2}]}
+        second = {"$and": [{"b": 2}, {"a": 1}], "status": "tried"}
+        self.assertEqual(canonical_filter(first), canonical_filter(second))
+    
+    def test_array_order_matters_outside_logical_operators(self):
+        self.assertNotEqual(canonical_filter({"tags": {"$all": ["a", "b"]}}),
+                            canonical_filter({"tags": {"$all": ["b", "a"]}}))
+
+@unittest.skipIf(mongomock is None, "needs mongomock")
+class ManagerInvalidationTest(unittest.TestCase):
+    def setUp(self):
+        from database import db_connection
+        from models import Recipe
+        from recipe_manager import RecipeManager
+        db_connection.client = mongomock.MongoClient()
+        db_connection.db = db_connection.client['recipe_test']
+        self.addCleanup(setattr, db_connection, 'db', None)
+        self.addCleanup(setattr, db_connection, 'client', None)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.manager = RecipeManager()
+            self.recipe_id = self.manager.add_recipe(Recipe(name="Pancakes", ingredients=["2 eggs"],
+                                                            instructions=["Fry"]))
+    
+    def test_write_with_upper_case_id_evicts_the_cached_recipe(self):
+        from models import Recipe
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(self.manager.get_recipe_by_id(self.recipe_id).status, 'want_to_try')
+            self.manager.update_recipe_status(self.recipe_id.upper(), 'tried')
+            self.assertEqual(self.manager.get_recipe_by_id(self.recipe_id).status, 'tried')
+            self.manager.update_recipe(self.recipe_id.upper(), Recipe(name="Fluffy Pancakes", ingredients=["2 eggs"],
+                                                                      instructions=["Fry"]))
+            self.assertEqual(self.manager.get_recipe_by_id(self.recipe_id).name, "Fluffy Pancakes")
+            self.manager.delete_recipe(self.recipe_id.upper())
+            self.assertIsNone(self.manager.get_recipe_by_id(self.recipe_id))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# test_recipe_export.py - Streaming NDJSON / JSON serialization
+import gzip
+import json
+import unittest
+from datetime import datetime
+
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from recipe_export import json_ready, serialize
+
+class SerializeTest(unittest.TestCase):
+    def setUp(self):
+        self.docs = [{'_id': ObjectId(), 'name': f"Recipe {n}", 'ingredients': ["1 egg"],
+                      'metadata': {'updated_at': datetime(2024, 1, 1, n % 24)}} for n in range(50)]
+    
+    def export(self, docs, **options):
+        return b''.join(serialize(iter(docs), **options))
+    
+    def test_ndjson_is_one_object_per_line(self):
+        lines = self.export(self.docs, chunk_size=256).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 50)
+        self.assertEqual(json.loads(lines[0]), json_ready(self.docs[0]))
+        self.assertEqual(json.loads(lines[0])['metadata']['updated_at'], "2024-01-01T00:00:00")
+    
+    def test_json_is_a_single_array(self):
+        self.assertEqual(json.loads(self.export(self.docs, format_type='json')),
+                         [json_ready(doc) for doc in self.docs])
+        self.assertEqual(json.loads(self.export([], format_type='json')), [])
+    
+    def test_gzip_output_round_trips(self):
+        compressed = self.export(self.docs, compress=True, chunk_size=256)
+        self.assertEqual(gzip.decompress(compressed), self.export(self.docs))
+    
+    def test_raw_documents_export_like_dicts(self):
+        raw = [RawBSONDocument(bson.encode(doc)) for doc in self.docs[:3]]
+        self.assertEqual(self.export(raw), self.export(self.docs[:3]))
+    
+    def test_unknown_format_fails_before_streaming(self):
+        with self.assertRaises(ValueError):
+            serialize(iter(self.docs), format_type='xml')
+    
+    def test_json_ready_leaves_the_document_untouched(self):
+        doc = self.docs[0]
+        ready = json_ready(doc)
+        self.assertEqual(ready['_id'], str(doc['_id']))
+        self.assertIsInstance(doc['_id'], ObjectId)
+
+if __name__ == "__main__":
+    unittest.main()
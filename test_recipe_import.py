@@ -0,0 +1,98 @@
+# test_recipe_import.py - Feed parsing, validation and resumable bulk import
+import contextlib
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+from recipe_import import detect_format, import_recipes, normalize_record, read_records
+
+class NormalizeRecordTest(unittest.TestCase):
+    def test_csv_row_becomes_a_recipe_document(self):
+        doc = normalize_record({'name': " Pancakes ", 'ingredients': "2 eggs|1 cup flour",
+                                'instructions': "Mix|Fry", 'servings': "4", 'tags': "quick|sweet",
+                                'is_favorite': "yes", 'status': ""})
+        self.assertEqual(doc['name'], "Pancakes")
+        self.assertEqual(doc['ingredients'], ["2 eggs", "1 cup flour"])
+        self.assertEqual(doc['metadata']['servings'], 4)
+        self.assertEqual(doc['metadata']['tags'], ["quick", "sweet"])
+        self.assertIs(doc['is_favorite'], True)
+        self.assertEqual(doc['status'], 'want_to_try')
+        self.assertEqual(doc['ingredient_names'], ['egg', 'flour'])
+    
+    def test_invalid_records_are_rejected(self):
+        for record in ('[1, 2]', {'name': ""}, {'name': "Soup", 'ingredients': "water"},
+                       {'name': "Soup", 'ingredients': "water", 'instructions': "Boil", 'servings': "many"},
+                       {'name': "Soup", 'ingredients': "water", 'instructions': "Boil", 'status': "eaten"}):
+            with self.assertRaises(ValueError):
+                normalize_record(record)
+    
+    def test_format_from_extension(self):
+        self.assertEqual(detect_format("feed.csv.gz"), 'csv')
+        self.assertEqual(detect_format("feed.jsonl"), 'ndjson')
+        with self.assertRaises(ValueError):
+            detect_format("feed.xml")
+
+class ReadRecordsTest(unittest.TestCase):
+    def test_gzipped_csv_streams_rows(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "feed.csv.gz")
+            with gzip.open(path, 'wt', encoding='utf-8') as feed:
+                feed.write("name,ingredients,instructions\nToast,bread|butter,Toast|Spread\n")
+            self.assertEqual(list(read_records(path)),
+                             [{'name': "Toast", 'ingredients': "bread|butter", 'instructions': "Toast|Spread"}])
+
+@unittest.skipIf(mongomock is None, "needs mongomock")
+class ImportRecipesTest(unittest.TestCase):
+    def setUp(self):
+        from database import db_connection
+        from recipe_manager import RecipeManager
+        db_connection.client = mongomock.MongoClient()
+        db_connection.db = db_connection.client['import_test']
+        self.addCleanup(setattr, db_connection, 'db', None)
+        self.addCleanup(setattr, db_connection, 'client', None)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.manager = RecipeManager()
+        # Normally created by migration 1
+        self.manager.collection.create_index("name", unique=True)
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = os.path.join(folder.name, "feed.ndjson")
+        records = [{'name': f"Recipe {n}", 'ingredients': ["1 egg"], 'instructions': ["Cook"]} for n in range(5)]
+        records.insert(2, {'name': "Recipe 0", 'ingredients': ["1 egg"], 'instructions': ["Cook"]})
+        records.insert(4, {'name': "Broken"})
+        with open(self.path, 'w', encoding='utf-8') as feed:
+            feed.write('\n'.join(json.dumps(record) for record in records) + '\n')
+    
+    def run_import(self, **options):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return import_recipes(self.path, self.manager, batch_size=3, workers=1, **options)
+    
+    def test_duplicates_and_invalid_rows_are_reported(self):
+        report = self.run_import()
+        self.assertEqual(report['inserted'], 5)
+        self.assertEqual(report['duplicates'], 1)
+        self.assertEqual(report['invalid'], 1)
+        self.assertEqual(report['duplicate_names'], ["Recipe 0"])
+        self.assertEqual([position for position, _ in report['invalid_rows']], [5])
+        self.assertEqual(self.manager.collection.count_documents({}), 5)
+    
+    def test_interrupted_import_resumes_after_the_last_written_batch(self):
+        from recipe_import import ImportCheckpoint
+        checkpoint = ImportCheckpoint(self.manager.collection.database, self.path)
+        checkpoint.save(3, {"read": 3, "inserted": 2, "duplicates": 1, "invalid": 0})
+        report = self.run_import()
+        self.assertEqual(report['resumed_from'], 3)
+        self.assertEqual(report['read'], 7)
+        self.assertEqual(self.manager.collection.count_documents({}), 3)
+        self.assertEqual(self.run_import()['resumed_from'], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+# test_recipe_manager.py - RecipeManager behaviour against an in-memory MongoDB
+import contextlib
+import io
+import unittest
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+from models import Recipe
+
+def _manager():
+    """🧪 RecipeManager on a fresh mongomock database"""
+    from database import db_connection
+    from recipe_manager import RecipeManager
+    db_connection.client = mongomock.MongoClient()
+    db_connection.db = db_connection.client['recipe_test']
+    with contextlib.redirect_stdout(io.StringIO()):
+        return RecipeManager()
+
+def _recipe(name, **metadata):
+    return Recipe(name=name, ingredients=["2 eggs", "1 cup flour"], instructions=["Mix", "Bake"],
+                  metadata=metadata)
+
+@unittest.skipIf(mongomock is None, "needs mongomock")
+class ApplyBatchTest(unittest.TestCase):
+    def setUp(self):
+        from database import db_connection
+        self.addCleanup(setattr, db_connection, 'db', None)
+        self.addCleanup(setattr, db_connection, 'client', None)
+        self.manager = _manager()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.ids = [self.manager.add_recipe(_recipe(name, tags=["quick"])) for name in ("A", "B", "C", "D")]
+            self.manager.stats_store.rebuild(self.manager.collection)
+        self.bulk_writes = 0
+        bulk_write = self.manager.collection.bulk_write
+        
+        def counting_bulk_write(*args, **kwargs):
+            self.bulk_writes += 1
+            return bulk_write(*args, **kwargs)
+        
+        self.manager.collection.bulk_write = counting_bulk_write
+    
+    def apply(self, operations):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.manager.apply_batch(operations)
+    
+    def doc(self, recipe_id):
+        from bson import ObjectId
+        return self.manager.collection.find_one({"_id": ObjectId(recipe_id)})
+    
+    def test_results_per_operation_in_one_bulk_write(self):
+        a, b, c, d = self.ids
+        results = self.apply([
+            {"op": "toggle_favorite", "recipe_id": a.upper()},
+            {"op": "update_status", "recipe_id": b, "status": "tried"},
+            {"op": "add_tags", "recipe_id": c, "tags": ["vegan", "quick"]},
+            {"op": "delete", "recipe_id": d},
+            {"op": "delete", "recipe_id": "0" * 24},
+            {"op": "update_status", "recipe_id": b.upper(), "status": "made_before"},
+            {"op": "explode", "recipe_id": a},
+        ])
+        self.assertEqual(self.bulk_writes, 1)
+        self.assertEqual([result["ok"] for result in results], [True, True, True, True, False, False, False])
+        self.assertIs(results[0]["is_favorite"], True)
+        self.assertEqual(results[2]["tags"], ["quick", "vegan"])
+        self.assertEqual(results[4]["error"], "Recipe not found")
+        self.assertIn("already has an operation", results[5]["error"])
+        self.assertIs(self.doc(a)["is_favorite"], True)
+        self.assertEqual(self.doc(b)["status"], "tried")
+        self.assertEqual(self.doc(c)["metadata"]["tags"], ["quick", "vegan"])
+        self.assertIsNone(self.doc(d))
+        self.assertEqual(self.manager.stats_store.verify(self.manager.collection), [])
+    
+    def test_write_racing_another_writer_is_retried_on_a_fresh_read(self):
+        a = self.ids[0]
+        bulk_write = self.manager.collection.bulk_write
+        raced = []
+        
+        def racing_bulk_write(*args, **kwargs):
+            if not raced:
+                # Another process favorites the recipe between the read and the write
+                raced.append(self.manager.collection.update_one({"_id": self.doc(a)["_id"]},
+                                                               {"$set": {"is_favorite": True}}))
+            return bulk_write(*args, **kwargs)
+        
+        self.manager.collection.bulk_write = racing_bulk_write
+        results = self.apply([{"op": "toggle_favorite", "recipe_id": a},
+                              {"op": "update_status", "recipe_id": self.ids[1], "status": "tried"}])
+        # The toggle flips the value it actually found, not the stale one
+        self.assertTrue(results[0]["ok"])
+        self.assertIs(results[0]["is_favorite"], False)
+        self.assertIs(self.doc(a)["is_favorite"], False)
+        self.assertTrue(results[1]["ok"])
+        self.assertEqual(self.bulk_writes, 2)
+    
+    def test_operation_that_keeps_losing_is_reported(self):
+        a = self.ids[0]
+        bulk_write = self.manager.collection.bulk_write
+        
+        def always_racing_bulk_write(*args, **kwargs):
+            self.manager.collection.update_one({"_id": self.doc(a)["_id"]},
+                                               {"$set": {"status": "tried" if self.doc(a)["status"] != "tried"
+                                                         else "made_before"}})
+            return bulk_write(*args, **kwargs)
+        
+        self.manager.collection.bulk_write = always_racing_bulk_write
+        results = self.apply([{"op": "set_favorite", "recipe_id": a, "value": True}])
+        self.assertFalse(results[0]["ok"])
+        self.assertIn("changed concurrently", results[0]["error"])
+        self.assertIsNot(self.doc(a).get("is_favorite"), True)
+
+@unittest.skipIf(mongomock is None, "needs mongomock")
+class KeysetPaginationTest(unittest.TestCase):
+    def setUp(self):
+        from database import db_connection
+        self.addCleanup(setattr, db_connection, 'db', None)
+        self.addCleanup(setattr, db_connection, 'client', None)
+        self.manager = _manager()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.ids = [self.manager.add_recipe(_recipe(f"Recipe {n}")) for n in range(7)]
+    
+    def page(self, cursor=None, **options):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.manager.get_recipes_page(page_size=3, cursor=cursor, **options)
+    
+    def names(self, page):
+        return [recipe.name for recipe in page]
+    
+    def test_walk_forward_and_back(self):
+        first = self.page()
+        self.assertEqual(self.names(first), ["Recipe 0", "Recipe 1", "Recipe 2"])
+        self.assertIsNone(first.prev_cursor)
+        second = self.page(first.next_cursor)
+        self.assertEqual(self.names(second), ["Recipe 3", "Recipe 4", "Recipe 5"])
+        last = self.page(second.next_cursor)
+        self.assertEqual(self.names(last), ["Recipe 6"])
+        self.assertIsNone(last.next_cursor)
+        self.assertEqual(self.names(self.page(last.prev_cursor)), self.names(second))
+        self.assertEqual(self.names(self.page(second.prev_cursor)), self.names(first))
+    
+    def test_pages_stay_stable_when_earlier_recipes_are_deleted(self):
+        first = self.page()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.manager.delete_recipe(self.ids[0])
+        self.assertEqual(self.names(self.page(first.next_cursor)), ["Recipe 3", "Recipe 4", "Recipe 5"])
+    
+    def test_summary_cards(self):
+        cards = self.page(summary=True)
+        self.assertEqual([card.ingredients_count for card in cards], [2, 2, 2])
+    
+    def test_malformed_cursor_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.page("not-a-cursor")
+
+if __name__ == "__main__":
+    unittest.main()
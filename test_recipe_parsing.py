@@ -0,0 +1,63 @@
+# test_recipe_parsing.py - Cooking time and ingredient line parsing
+import unittest
+
+from recipe_parsing import (canonical_ingredient, duration_fields, ingredient_keys, ingredient_names,
+                            parse_duration, parse_ingredient)
+
+class ParseDurationTest(unittest.TestCase):
+    def test_free_text_times(self):
+        cases = {'1h30': 90, '45 mins': 45, '2 hrs': 120, '1 hour 15 minutes': 75, 'half an hour': 30}
+        for text, minutes in cases.items():
+            self.assertEqual(parse_duration(text), minutes, text)
+    
+    def test_range_counts_at_its_upper_bound(self):
+        self.assertEqual(parse_duration('20-25 minutes'), 25)
+    
+    def test_unreadable_times_are_unknown(self):
+        for text in ('', None, 'overnight'):
+            self.assertIsNone(parse_duration(text))
+    
+    def test_total_is_the_sum_of_the_known_parts(self):
+        self.assertEqual(duration_fields({'prep_time': '10 min'}),
+                         {'prep_minutes': 10, 'cook_minutes': None, 'total_minutes': 10})
+        self.assertIsNone(duration_fields({})['total_minutes'])
+
+class ParseIngredientTest(unittest.TestCase):
+    def assertParses(self, line, quantity, unit, names):
+        self.assertEqual(parse_ingredient(line), {'quantity': quantity, 'unit': unit, 'names': names}, line)
+    
+    def test_quantity_unit_and_name(self):
+        self.assertParses("500g pizza dough", 500.0, 'g', ['pizza dough'])
+        self.assertParses("2 tbsp olive oil", 2.0, 'tbsp', ['olive oil'])
+        self.assertParses("2-3 cloves garlic, minced", 3.0, 'clove', ['garlic'])
+    
+    def test_combined_lines_and_alternatives(self):
+        self.assertParses("Salt and pepper to taste", None, None, ['salt', 'pepper'])
+        self.assertParses("100g butter or margarine", 100.0, 'g', ['butter'])
+    
+    def test_descriptors_are_dropped(self):
+        self.assertEqual(canonical_ingredient("Fresh Basil Leaves"), 'basil')
+        self.assertEqual(canonical_ingredient("ground cumin"), 'cumin')
+    
+    def test_descriptor_words_that_are_part_of_the_name(self):
+        self.assertParses("1 bay leaf", 1.0, None, ['bay leaf'])
+        self.assertParses("2 bay leaves", 2.0, None, ['bay leaf'])
+        self.assertParses("500g ground beef", 500.0, 'g', ['ground beef'])
+    
+    def test_juice_and_zest_of_a_fruit(self):
+        self.assertParses("juice of 1 lemon", 1.0, None, ['lemon juice'])
+        self.assertParses("Juice of ½ lime, to taste", 0.5, None, ['lime juice'])
+        self.assertParses("grated zest of 2 oranges", 2.0, None, ['orange zest'])
+        self.assertEqual(parse_ingredient("2 tbsp lemon juice")['names'], ['lemon juice'])
+
+class IngredientKeysTest(unittest.TestCase):
+    def test_names_are_distinct_in_recipe_order(self):
+        self.assertEqual(ingredient_names(["2 eggs", "1 cup flour", "1 egg yolk", "3 eggs"]),
+                         ['egg', 'flour', 'egg yolk'])
+    
+    def test_keys_include_each_word(self):
+        self.assertEqual(ingredient_keys(['cherry tomato', 'basil']),
+                         ['basil', 'cherry', 'cherry tomato', 'tomato'])
+
+if __name__ == "__main__":
+    unittest.main()
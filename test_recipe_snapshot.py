@@ -0,0 +1,80 @@
+# test_recipe_snapshot.py - Filters, group-bys and incremental refresh of the catalog snapshot
+import unittest
+from datetime import datetime
+
+from bson import ObjectId
+
+try:
+    from recipe_snapshot import CatalogSnapshot
+except ImportError:  # NumPy not installed
+    CatalogSnapshot = None
+
+class _Cursor(list):
+    def sort(self, key, direction):
+        return _Cursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+class _Recipes:
+    """📂 The two collection calls IncrementalSnapshot makes, over a list of documents"""
+    
+    def __init__(self, docs):
+        self.docs = docs
+    
+    def find(self, query, projection=None):
+        changed = query.get("metadata.updated_at", {}).get("$gt")
+        return _Cursor(doc for doc in self.docs
+                       if changed is None or doc['metadata']['updated_at'] > changed)
+    
+    def estimated_document_count(self):
+        return len(self.docs)
+
+def _doc(cuisine, difficulty, minutes=None, servings=None, is_favorite=False, status='want_to_try'):
+    metadata = {'cuisine': cuisine, 'difficulty': difficulty, 'updated_at': datetime(2024, 1, 1)}
+    if minutes is not None:
+        metadata['total_minutes'] = minutes
+    if servings is not None:
+        metadata['servings'] = servings
+    return {'_id': ObjectId(), 'metadata': metadata, 'is_favorite': is_favorite, 'status': status}
+
+@unittest.skipIf(CatalogSnapshot is None, "needs NumPy")
+class CatalogSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.recipes = _Recipes([
+            _doc('italian', 'easy', minutes=20, servings=4, is_favorite=True),
+            _doc('italian', 'hard', minutes=90, servings=6),
+            _doc('japanese', 'easy', minutes=45, servings=2, status='tried'),
+            _doc('mexican', 'medium'),
+        ])
+        self.snapshot = CatalogSnapshot(max_age=0).refresh(self.recipes)
+        self.ids = [doc['_id'] for doc in self.recipes.docs]
+    
+    def test_filters_match_advanced_search(self):
+        self.assertEqual(self.snapshot.select(cuisine='italian'), self.ids[:2])
+        self.assertEqual(self.snapshot.select(difficulty='easy', max_total_minutes=30), self.ids[:1])
+        self.assertEqual(self.snapshot.select(is_favorite=False, min_servings=3), self.ids[1:2])
+        self.assertEqual(self.snapshot.select(status='tried'), self.ids[2:3])
+        self.assertEqual(self.snapshot.count(cuisine='french'), 0)
+    
+    def test_order_by_puts_missing_values_last(self):
+        self.assertEqual(self.snapshot.select(order_by='total_minutes'),
+                         [self.ids[0], self.ids[2], self.ids[1], self.ids[3]])
+        with self.assertRaises(ValueError):
+            self.snapshot.select(order_by='cuisine')
+    
+    def test_group_by(self):
+        self.assertEqual(self.snapshot.group_by('cuisine'), {'italian': 2, 'japanese': 1, 'mexican': 1})
+        self.assertEqual(self.snapshot.group_by('cuisine', difficulty='easy'), {'italian': 1, 'japanese': 1})
+        with self.assertRaises(ValueError):
+            self.snapshot.group_by('alive')
+    
+    def test_refresh_picks_up_edits_and_deletes(self):
+        edited = self.recipes.docs[3]
+        edited['metadata'].update(cuisine='italian', updated_at=datetime.now())
+        deleted = self.recipes.docs.pop(2)
+        self.snapshot.touch([deleted['_id']])
+        self.snapshot.refresh(self.recipes)
+        self.assertEqual(len(self.snapshot), 3)
+        self.assertEqual(self.snapshot.select(cuisine='italian'), [self.ids[0], self.ids[1], self.ids[3]])
+        self.assertEqual(self.snapshot.count(cuisine='japanese'), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# test_recipe_stats.py - Incremental upkeep and verification of the materialized stats
+import contextlib
+import io
+import unittest
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+from recipe_stats import StatsStore, decode_key, encode_key
+
+def _recipe(name, cuisine, status='want_to_try', is_favorite=False, ingredients=("2 eggs",)):
+    return {'name': name, 'ingredients': list(ingredients), 'instructions': ["Mix"],
+            'metadata': {'cuisine': cuisine, 'difficulty': 'easy'}, 'status': status, 'is_favorite': is_favorite}
+
+class KeyEncodingTest(unittest.TestCase):
+    def test_dots_and_dollars_round_trip(self):
+        for value in ("tex.mex", "$pecial", "plain"):
+            key = encode_key(value)
+            self.assertNotIn('.', key)
+            self.assertFalse(key.startswith('$'))
+            self.assertEqual(decode_key(key), value)
+
+@unittest.skipIf(mongomock is None, "needs mongomock")
+class StatsStoreTest(unittest.TestCase):
+    def setUp(self):
+        db = mongomock.MongoClient()['stats_test']
+        self.recipes = db['recipes']
+        self.store = StatsStore(db)
+        self.recipes.insert_many([_recipe("A", 'italian', is_favorite=True), _recipe("B", 'tex.mex')])
+        self.rebuild()
+    
+    def rebuild(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.store.rebuild(self.recipes)
+    
+    def test_rebuild_counts_everything(self):
+        stats = self.store.read()
+        self.assertEqual(stats['total_recipes'], 2)
+        self.assertEqual(stats['favorites_count'], 1)
+        self.assertEqual(self.store.verify(self.recipes), [])
+    
+    def test_recorded_changes_stay_in_sync(self):
+        added = _recipe("C", 'italian', ingredients=("1 cup flour",))
+        self.recipes.insert_one(added)
+        before = self.recipes.find_one({"name": "A"})
+        after = dict(before, status='tried', is_favorite=False)
+        self.recipes.replace_one({"_id": before['_id']}, after)
+        deleted = self.recipes.find_one_and_delete({"name": "B"})
+        self.assertTrue(self.store.record_many([(None, added), (before, after), (deleted, None)]))
+        self.assertEqual(self.store.verify(self.recipes), [])
+        self.assertEqual(self.store.read()['total_recipes'], 2)
+    
+    def test_verify_reports_drift(self):
+        self.recipes.insert_one(_recipe("D", 'thai'))
+        problems = self.store.verify(self.recipes)
+        self.assertIn("total: stored 2, actual 3", problems)
+        self.assertIn("cuisine.thai: stored 0, actual 1", problems)
+        self.rebuild()
+        self.assertEqual(self.store.verify(self.recipes), [])
+    
+    def test_deltas_wait_for_the_first_build(self):
+        store = StatsStore(self.recipes.database, 'never_built')
+        self.assertFalse(store.record(after=_recipe("E", 'thai')))
+        self.assertIsNone(store.read())
+
+if __name__ == "__main__":
+    unittest.main()
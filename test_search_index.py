@@ -0,0 +1,73 @@
+# test_search_index.py - Ranking and champion-list upkeep of the in-memory search index
+import unittest
+
+from bson import ObjectId
+
+from search_index import SearchIndex, tokenize
+
+def _doc(name, ingredients=(), tags=()):
+    return {'_id': ObjectId(), 'name': name, 'ingredients': list(ingredients),
+            'instructions': [], 'metadata': {'tags': list(tags)}}
+
+class TokenizeTest(unittest.TestCase):
+    def test_plurals_accents_and_stopwords(self):
+        self.assertEqual(tokenize("Tomatoes and Crème fraîche, 2 cherries"),
+                         ["tomato", "creme", "fraiche", "cherry"])
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex(champion_size=3)
+        self.docs = [_doc(f"Soup {n}", ["water"] * (n + 1)) for n in range(8)]
+        for doc in self.docs:
+            self.index.add_document(doc['_id'], doc)
+    
+    def search(self, query):
+        return [doc_id for doc_id, _ in self.index.search(query)]
+    
+    def champions(self, term):
+        return self.index._champions[term]
+    
+    def test_name_hit_outranks_instruction_hit(self):
+        name_hit = _doc("Garlic bread")
+        instruction_hit = dict(_doc("Toast"), instructions=["Rub with garlic"])
+        for doc in (name_hit, instruction_hit):
+            self.index.add_document(doc['_id'], doc)
+        self.assertEqual(self.search("garlic"), [str(name_hit['_id']), str(instruction_hit['_id'])])
+    
+    def test_prefix_expansion(self):
+        doc = _doc("Tomato tart")
+        self.index.add_document(doc['_id'], doc)
+        self.assertEqual(self.search("tom"), [str(doc['_id'])])
+    
+    def test_frequent_term_scores_only_its_champions(self):
+        self.assertEqual(len(self.search("soup")), 3)
+    
+    def test_new_document_joins_the_champion_list_in_place(self):
+        self.search("water")
+        champions = self.champions("water")
+        strong = _doc("Water", ["water"] * 20)
+        weak = _doc("Stew", ["water", "beef", "onion", "carrot", "potato", "celery"])
+        for doc in (strong, weak):
+            self.index.add_document(doc['_id'], doc)
+        self.assertIs(self.champions("water"), champions)
+        self.assertIn(str(strong['_id']), champions.members)
+        self.assertNotIn(str(weak['_id']), champions.members)
+        self.assertEqual(len(champions.members), 3)
+        self.assertEqual(self.search("water")[0], str(strong['_id']))
+    
+    def test_removing_a_non_champion_keeps_the_list(self):
+        self.search("water")
+        champions = self.champions("water")
+        outsider = next(doc['_id'] for doc in self.docs if str(doc['_id']) not in champions.members)
+        self.index.remove_document(outsider)
+        self.assertIs(self.champions("water"), champions)
+    
+    def test_removing_a_champion_rebuilds_the_list(self):
+        best = self.search("water")[0]
+        self.index.remove_document(best)
+        self.assertNotIn("water", self.index._champions)
+        self.assertNotIn(best, self.search("water"))
+        self.assertEqual(len(self.champions("water").members), 3)
+
+if __name__ == "__main__":
+    unittest.main()
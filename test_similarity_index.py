@@ -0,0 +1,79 @@
+# test_similarity_index.py - Refresh behaviour of the "you might also like" index
+import unittest
+from datetime import datetime
+
+from bson import ObjectId
+
+try:
+    from similarity_index import SimilarityIndex
+except ImportError:  # NumPy not installed
+    SimilarityIndex = None
+
+class _Cursor(list):
+    def sort(self, key, direction):
+        return _Cursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+class _Recipes:
+    """📂 The two collection calls IncrementalSnapshot makes, over a list of documents"""
+    
+    def __init__(self, docs):
+        self.docs = docs
+    
+    def find(self, query, projection=None):
+        changed = query.get("metadata.updated_at", {}).get("$gt")
+        return _Cursor(doc for doc in self.docs
+                       if changed is None or doc['metadata']['updated_at'] > changed)
+    
+    def estimated_document_count(self):
+        return len(self.docs)
+
+@unittest.skipIf(SimilarityIndex is None, "needs NumPy")
+class SimilarityIndexRefreshTest(unittest.TestCase):
+    def setUp(self):
+        updated_at = datetime(2024, 1, 1)
+        self.recipes = _Recipes([
+            {'_id': ObjectId(), 'ingredients': ["500g spaghetti", "2 eggs", "100g pancetta"],
+             'metadata': {'tags': ["pasta"], 'updated_at': updated_at}},
+            {'_id': ObjectId(), 'ingredients': ["500g spaghetti", "3 eggs", "100g guanciale"],
+             'metadata': {'tags': ["pasta"], 'updated_at': updated_at}},
+            # Staples only, no tags: nothing to compare on
+            {'_id': ObjectId(), 'ingredients': ["1 tsp salt", "1 cup water"],
+             'metadata': {'updated_at': updated_at}},
+        ])
+        self.index = SimilarityIndex(max_age=0)
+        self.builds = 0
+        build = self.index.build
+        
+        def counting_build(collection):
+            self.builds += 1
+            return build(collection)
+        
+        self.index.build = counting_build
+    
+    def test_featureless_recipes_are_counted(self):
+        self.index.refresh(self.recipes)
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.similar(self.recipes.docs[2]['_id']), [])
+    
+    def test_refresh_without_changes_does_not_rebuild(self):
+        self.index.refresh(self.recipes)
+        self.assertEqual(self.builds, 1)
+        for _ in range(5):
+            self.index.refresh(self.recipes, force=True)
+        self.assertEqual(self.builds, 1)
+        first, second = (doc['_id'] for doc in self.recipes.docs[:2])
+        self.assertEqual([match['recipe_id'] for match in self.index.similar(first)], [second])
+    
+    def test_recipe_losing_its_features_stays_counted(self):
+        self.index.refresh(self.recipes)
+        doc = self.recipes.docs[0]
+        doc['ingredients'], doc['metadata']['tags'] = ["a pinch of salt"], []
+        doc['metadata']['updated_at'] = datetime.now()
+        self.index.touch([doc['_id']])
+        self.index.refresh(self.recipes)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.similar(self.recipes.docs[1]['_id']), [])
+
+if __name__ == "__main__":
+    unittest.main()